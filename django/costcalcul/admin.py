@@ -1,12 +1,14 @@
 from django.contrib import admin
-from .models import Recipe, RecipeItem
+from .models import PERCENT_SCALE, Recipe, RecipeItem
+from livflow.fixedpoint import MONEY_SCALE, QUANTITY_SCALE, from_fixed
+from .images import variant_urls
 from django.utils.html import format_html
 
 # ✅ 레시피(Recipe) 관리
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
     list_display = (
-        "id", "name", "store", "sales_price_per_item",
+        "id", "name", "store", "sales_price_display",
         "production_quantity_per_batch", "total_material_cost_display",
         "cost_ratio_display" , "recipe_img_preview"
     )
@@ -17,35 +19,54 @@ class RecipeAdmin(admin.ModelAdmin):
     # ✅ 상세 페이지에서 수정 가능하도록 설정
     fields = ("name", "store", "sales_price_per_item", "production_quantity_per_batch", "recipe_img")  
 
+    def get_queryset(self, request):
+        """ ✅ 원가 컬럼을 SQL 에서 계산 (레시피마다 재료 조회하는 N+1 방지) """
+        return super().get_queryset(request).with_costs().select_related("store")
+
+    # ✅ 판매가 (1/100 원 단위 정수 → 원)
+    def sales_price_display(self, obj):
+        return f"{from_fixed(obj.sales_price_per_item, MONEY_SCALE):,.0f} 원" if obj.sales_price_per_item is not None else "-"
+    sales_price_display.short_description = "판매가"
+
     # ✅ 총 원가(total_material_cost) 계산하여 표시
     def total_material_cost_display(self, obj):
-        return f"{obj.total_material_cost:,.0f} 원" if obj.total_material_cost else "0 원"
+        return f"{from_fixed(obj.total_material_cost, MONEY_SCALE):,.0f} 원" if obj.total_material_cost else "0 원"
     total_material_cost_display.short_description = "총 원가"
 
     # ✅ 원가 비율(cost_ratio) 계산하여 표시
     def cost_ratio_display(self, obj):
-        return f"{obj.cost_ratio:.1f} %" if obj.cost_ratio else "0 %"
+        return f"{from_fixed(obj.cost_ratio, PERCENT_SCALE):.1f} %" if obj.cost_ratio else "0 %"
     cost_ratio_display.short_description = "원가 비율"
 
     # ✅ 이미지 미리보기 추가
     def recipe_img_preview(self, obj):
         if obj.recipe_img and hasattr(obj.recipe_img, 'url'):
-            return format_html('<img src="{}" width="50" height="50" style="object-fit: cover; border-radius: 5px;"/>', obj.recipe_img.url)
+            thumb = variant_urls(obj).get("thumb", {}).get("jpeg")  # 🔹 변형이 있으면 원본 대신 썸네일
+            return format_html('<img src="{}" width="50" height="50" style="object-fit: cover; border-radius: 5px;"/>', thumb or obj.recipe_img.url)
         return "No Image"
     recipe_img_preview.short_description = "이미지"
 
 # ✅ 레시피-재료 관계(RecipeItem) 관리
 @admin.register(RecipeItem)
 class RecipeItemAdmin(admin.ModelAdmin):
-    list_display = ("id", "recipe", "ingredient", "quantity_used", "unit", "material_cost_display")
+    list_display = ("id", "recipe", "ingredient", "component", "quantity_used_display", "unit", "material_cost_display")
     list_filter = ("recipe__store", "recipe", "ingredient")
     search_fields = ("recipe__name", "ingredient__name")
     ordering = ("id",)
 
     # ✅ RecipeItem에 존재하지 않는 필드를 fields에서 제거
-    fields = ("recipe", "ingredient", "quantity_used", "unit")  # ✅ store, sales_price_per_item 등 제거
+    fields = ("recipe", "ingredient", "component", "quantity_used", "unit")  # ✅ store, sales_price_per_item 등 제거 (재료 또는 하위 레시피)
+    list_select_related = ("recipe", "ingredient", "component")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_costs()
+
+    # ✅ 사용량 (1/1000 단위 정수 → 실제 값)
+    def quantity_used_display(self, obj):
+        return from_fixed(obj.quantity_used, QUANTITY_SCALE)
+    quantity_used_display.short_description = "사용량"
 
     # ✅ 개별 재료 원가 계산하여 표시
     def material_cost_display(self, obj):
-        return f"{obj.material_cost:,.0f} 원" if obj.material_cost else "0 원"
+        return f"{from_fixed(obj.material_cost, MONEY_SCALE):,.0f} 원" if obj.material_cost else "0 원"
     material_cost_display.short_description = "개별 원가"
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CostcalculConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'costcalcul'
+
+    def ready(self):
+        import costcalcul.signals  # noqa: F401
@@ -0,0 +1,93 @@
+# costcalcul/graph.py
+
+from collections import defaultdict
+from costcalcul.models import RecipeItem
+
+
+class RecipeCycleError(ValueError):
+    """ 하위 레시피 구성에 순환이 있음 (A 가 B 를 쓰고 B 가 다시 A 를 씀) """
+
+    def __init__(self, recipe_ids):
+        self.recipe_ids = list(recipe_ids)
+        super().__init__("🚨 하위 레시피 구성에 순환이 있습니다. (레시피가 자기 자신을 직접 / 간접적으로 사용할 수 없습니다)")
+
+
+def component_edges(store_ids=None):
+    """
+    ✅ 하위 레시피 관계 {recipe_id: {component_id, ...}} (쿼리 1번).
+    하위 레시피는 같은 가게 레시피만 가능하므로 가게 단위로 전체 관계를 읽어 메모리에서 탐색한다.
+    """
+    items = RecipeItem.objects.filter(component__isnull=False)
+    if store_ids is not None:
+        items = items.filter(recipe__store_id__in=list(store_ids))
+
+    edges = defaultdict(set)
+    for recipe_id, component_id in items.values_list("recipe_id", "component_id"):
+        edges[recipe_id].add(component_id)
+    return edges
+
+
+def topological_levels(recipe_ids, edges):
+    """
+    ✅ 하위 레시피가 먼저 오도록 레시피를 단계별로 나눔 (Kahn 알고리즘, O(레시피 + 관계)).
+    [[하위 레시피가 없는 레시피], [앞 단계만 쓰는 레시피], ...]
+    recipe_ids 밖의 하위 레시피는 이미 계산된 것으로 본다. 순환이 있으면 RecipeCycleError.
+    """
+    recipe_ids = set(recipe_ids)
+    pending = {}
+    dependents = defaultdict(list)
+    for recipe_id in recipe_ids:
+        components = [component_id for component_id in edges.get(recipe_id, ()) if component_id in recipe_ids]
+        pending[recipe_id] = len(components)
+        for component_id in components:
+            dependents[component_id].append(recipe_id)
+
+    levels = []
+    level = [recipe_id for recipe_id, count in pending.items() if count == 0]
+    while level:
+        levels.append(level)
+        next_level = []
+        for recipe_id in level:
+            for parent_id in dependents[recipe_id]:
+                pending[parent_id] -= 1
+                if pending[parent_id] == 0:
+                    next_level.append(parent_id)
+        level = next_level
+
+    if sum(len(level) for level in levels) != len(recipe_ids):
+        raise RecipeCycleError(recipe_id for recipe_id, count in pending.items() if count > 0)
+    return levels
+
+
+def topological_order(recipe_ids, edges):
+    """ ✅ 하위 레시피 → 상위 레시피 순서의 평평한 목록 """
+    return [recipe_id for level in topological_levels(recipe_ids, edges) for recipe_id in level]
+
+
+def downstream_recipe_ids(recipe_ids, edges):
+    """
+    ✅ 주어진 레시피 + 이를 직접 / 간접적으로 하위 레시피로 쓰는 레시피 전체.
+    기본 레시피 하나가 바뀌면 이 레시피들만 다시 계산하면 된다. (메모리 탐색, O(레시피 + 관계))
+    """
+    parents = defaultdict(list)
+    for recipe_id, components in edges.items():
+        for component_id in components:
+            parents[component_id].append(recipe_id)
+
+    found = set(recipe_ids)
+    stack = list(found)
+    while stack:
+        for parent_id in parents.get(stack.pop(), ()):
+            if parent_id not in found:
+                found.add(parent_id)
+                stack.append(parent_id)
+    return found
+
+
+def check_components(recipe, component_ids):
+    """ ✅ recipe 가 component_ids 를 하위 레시피로 써도 순환이 생기지 않는지 확인 (recipe 를 쓰는 레시피는 하위가 될 수 없음) """
+    if not component_ids:
+        return
+    cycle = set(component_ids) & downstream_recipe_ids([recipe.pk], component_edges([recipe.store_id]))
+    if cycle:
+        raise RecipeCycleError(cycle)
@@ -0,0 +1,237 @@
+# costcalcul/images.py
+
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.timezone import now
+from PIL import Image, ImageOps, UnidentifiedImageError
+from costcalcul.models import Recipe
+from costcalcul.storage import is_content_addressed
+from store.cache import schedule_store_version_bump
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MAX_SIZE = getattr(settings, "RECIPE_IMAGE_MAX_SIZE", 2048)  # 🔹 원본 이미지 긴 변 최대 픽셀
+IMAGE_VARIANT_SIZES = getattr(settings, "RECIPE_IMAGE_VARIANT_SIZES", {"medium": 960, "thumb": 320})  # 🔹 큰 것부터
+IMAGE_QUALITY = {"jpeg": 85, "webp": 80}
+VARIANT_FORMATS = {"webp": ("WEBP", "webp"), "jpeg": ("JPEG", "jpg")}
+
+# 🔹 리사이즈 / 인코딩은 요청 스레드 밖에서 (Pillow 는 연산 중 GIL 을 풀어 스레드로 충분, 동시 작업 수는 제한)
+_executor = ThreadPoolExecutor(max_workers=getattr(settings, "RECIPE_IMAGE_WORKERS", 2), thread_name_prefix="recipe-img")
+
+
+def _image_storage():
+    return Recipe._meta.get_field("recipe_img").storage
+
+
+def _has_alpha(image):
+    return image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+
+
+def _flatten(image):
+    """ ✅ JPEG 는 투명도를 지원하지 않으므로 흰 배경 위에 합성 """
+    if not _has_alpha(image):
+        return image.convert("RGB")
+    image = image.convert("RGBA")
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == "WEBP":
+        image.save(buffer, "WEBP", quality=IMAGE_QUALITY["webp"], method=4)
+    elif fmt == "PNG":
+        image.save(buffer, "PNG", optimize=True)
+    else:
+        image.save(buffer, "JPEG", quality=IMAGE_QUALITY["jpeg"], optimize=True, progressive=True)
+    return buffer.getvalue()  # 🔹 exif 인자를 넘기지 않으므로 EXIF(GPS 등)는 저장되지 않음
+
+
+def open_image(file, max_size=IMAGE_MAX_SIZE):
+    """
+    ✅ 이미지 1장 디코딩 → EXIF 방향 적용 → 긴 변 max_size 이하로 축소.
+    JPEG 는 draft 로 디코딩 단계에서 바로 1/2~1/8 크기로 읽어 큰 사진도 빠르게 처리.
+    """
+    if hasattr(file, "seek"):
+        file.seek(0)
+    image = Image.open(file)
+    if image.format == "JPEG":
+        image.draft("RGB", (max_size, max_size))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_size, max_size), Image.LANCZOS)
+    return image
+
+
+def needs_normalization(file, max_size=IMAGE_MAX_SIZE):
+    """ ✅ 헤더만 읽어 원본 정규화가 필요한지 확인 (크기 초과 또는 EXIF 포함) """
+    if hasattr(file, "seek"):
+        file.seek(0)
+    image = Image.open(file)
+    return max(image.size) > max_size or bool(image.info.get("exif")) or image.format not in ("JPEG", "PNG")
+
+
+def normalize_upload(file):
+    """
+    업로드된 이미지를 EXIF 없는 JPEG(투명 이미지는 PNG)로 다시 인코딩하고 크기를 제한한 ContentFile 반환.
+    이미지가 아니면 None (원본 그대로 저장).
+    """
+    try:
+        image = open_image(file)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        logger.warning(f"⚠️ 레시피 이미지 정규화 실패, 원본 저장: {e}")
+        return None
+
+    stem = os.path.splitext(os.path.basename(getattr(file, "name", "") or "recipe"))[0]
+    if _has_alpha(image):
+        return ContentFile(_encode(image.convert("RGBA"), "PNG"), name=f"{stem}.png")
+    return ContentFile(_encode(image.convert("RGB"), "JPEG"), name=f"{stem}.jpg")
+
+
+def variant_file_names(variants):
+    """ ✅ recipe_img_variants 에 기록된 파일 경로 목록 """
+    return [
+        name
+        for variant in (variants or {}).values()
+        for fmt, name in variant.items()
+        if fmt in VARIANT_FORMATS and name
+    ]
+
+
+def delete_variant_files(variants):
+    storage = _image_storage()
+    for name in variant_file_names(variants):
+        try:
+            storage.delete(name)
+        except Exception as e:
+            logger.warning(f"⚠️ 레시피 이미지 변형 파일 삭제 실패 ({name}): {e}")
+
+
+def recipe_image_reference_count(name):
+    """ ✅ 이 파일을 원본 또는 변형으로 참조하는 레시피 수 (공유 파일 삭제 여부 판단, 쿼리 1번) """
+    references = Q(recipe_img=name)
+    for label in IMAGE_VARIANT_SIZES:
+        for key in VARIANT_FORMATS:
+            references |= Q(**{f"recipe_img_variants__{label}__{key}": name})
+    return Recipe.objects.filter(references).count()
+
+
+def variant_urls(recipe):
+    """ ✅ 응답용 변형 이미지 URL {"thumb": {"webp": url, "jpeg": url, "width": w, "height": h}, ...} (생성 전이면 {}) """
+    if not recipe.recipe_img or not recipe.recipe_img_variants:
+        return {}
+
+    storage = _image_storage()
+    urls = {}
+    for label, variant in recipe.recipe_img_variants.items():
+        urls[label] = {
+            key: storage.url(value) if key in VARIANT_FORMATS else value
+            for key, value in variant.items()
+        }
+    return urls
+
+
+def _variant_names(name):
+    """ ✅ 원본 경로 기준 변형 경로 {label: {key: name}} (크기를 이름에 포함해 설정이 바뀌어도 내용이 다른 같은 이름이 생기지 않음) """
+    base = os.path.splitext(name)[0]
+    return {
+        label: {key: f"{base}_{label}{size}.{ext}" for key, (fmt, ext) in VARIANT_FORMATS.items()}
+        for label, size in IMAGE_VARIANT_SIZES.items()
+    }
+
+
+def _existing_variants(name):
+    """ ✅ 같은 내용의 원본을 다른 레시피가 이미 변환했으면 디코딩 없이 재사용 (내용 해시 원본만 이름이 겹침) """
+    if not is_content_addressed(name):
+        return None
+
+    storage = _image_storage()
+    names = _variant_names(name)
+    if not all(storage.exists(path) for variant in names.values() for path in variant.values()):
+        return None
+
+    variants = {}
+    for label, variant in names.items():
+        with storage.open(variant["jpeg"], "rb") as file:
+            width, height = Image.open(file).size  # 🔹 헤더만 읽음
+        variants[label] = {"width": width, "height": height, **variant}
+    return variants
+
+
+def build_variants(name):
+    """ ✅ 저장된 원본(name)을 1번 디코딩해 크기별 WebP / JPEG 파일 저장 (큰 변형을 줄여 작은 변형 생성) """
+    existing = _existing_variants(name)
+    if existing:
+        return existing
+
+    storage = _image_storage()
+    with storage.open(name, "rb") as file:
+        image = open_image(file, max(IMAGE_VARIANT_SIZES.values()))
+        image.load()
+
+    names = _variant_names(name)
+    variants = {}
+    for label, size in sorted(IMAGE_VARIANT_SIZES.items(), key=lambda item: -item[1]):
+        image.thumbnail((size, size), Image.LANCZOS)
+        variant = {"width": image.width, "height": image.height}
+        for key, (fmt, ext) in VARIANT_FORMATS.items():
+            source = _flatten(image) if fmt == "JPEG" else image
+            variant[key] = storage.save(names[label][key], ContentFile(_encode(source, fmt)))
+        variants[label] = variant
+    return variants
+
+
+def generate_recipe_image_variants(recipe_id):
+    """
+    레시피 이미지의 변형(thumb / medium)을 생성해 recipe_img_variants 에 기록.
+    생성하는 동안 이미지가 교체 / 삭제됐으면 결과를 버린다 (조건부 UPDATE).
+    반환값: 기록된 variants 또는 None
+    """
+    row = Recipe.objects.filter(pk=recipe_id).values_list("recipe_img", "recipe_img_variants", "store_id").first()
+    if not row or not row[0]:
+        return None
+    name, previous, store_id = row
+
+    try:
+        variants = build_variants(name)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        logger.warning(f"⚠️ 레시피 이미지 변형 생성 실패 ({recipe_id}): {e}")
+        return None
+
+    updated = Recipe.objects.filter(pk=recipe_id, recipe_img=name).update(
+        recipe_img_variants=variants, updated_at=now()
+    )
+    if not updated:
+        delete_variant_files(variants)
+        return None
+
+    new_names = set(variant_file_names(variants))
+    delete_variant_files({
+        label: {key: value for key, value in variant.items() if value not in new_names}
+        for label, variant in (previous or {}).items()
+    })
+    schedule_store_version_bump(store_id)  # 🔹 목록 / 상세 캐시가 변형 URL 을 포함하도록
+    return variants
+
+
+def _run_in_thread(recipe_id):
+    try:
+        generate_recipe_image_variants(recipe_id)
+    except Exception as e:
+        logger.error(f"❌ 레시피 이미지 변형 작업 실패 ({recipe_id}): {e}")
+    finally:
+        connection.close()
+
+
+def schedule_image_variants(recipe_id):
+    """ ✅ 커밋 후 백그라운드에서 변형 생성 (RECIPE_IMAGE_VARIANTS_IN_BACKGROUND=False 면 커밋 직후 동기 실행) """
+    if getattr(settings, "RECIPE_IMAGE_VARIANTS_IN_BACKGROUND", True):
+        transaction.on_commit(lambda: _executor.submit(_run_in_thread, recipe_id))
+    else:
+        transaction.on_commit(lambda: generate_recipe_image_variants(recipe_id))
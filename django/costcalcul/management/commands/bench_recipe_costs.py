@@ -0,0 +1,76 @@
+import random
+import timeit
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from livflow.fixedpoint import MONEY_SCALE, QUANTITY_SCALE, div_round
+
+
+def decimal_recipe_cost(lines, production_quantity):
+    """ ✅ 예전 방식: Decimal 단가 × 사용량을 소수 둘째 자리로 반올림해 합산 """
+    total = Decimal("0")
+    for quantity_used, purchase_price, purchase_quantity in lines:
+        unit_price = purchase_price / purchase_quantity if purchase_quantity else Decimal("0")
+        total += round(quantity_used * unit_price, 2)
+    return total, round(total / production_quantity, 2)
+
+
+def fixed_point_recipe_cost(lines, production_quantity):
+    """ ✅ 정수 방식: 사용량(1/1000) × 구매가(1/100 원) / 구매량(1/1000) 반올림 나눗셈 1번 """
+    total = 0
+    for quantity_used, purchase_price, purchase_quantity in lines:
+        total += div_round(quantity_used * purchase_price, purchase_quantity)
+    return total, div_round(total, production_quantity)
+
+
+def sample_recipes(count, lines_per_recipe, seed=0):
+    """ ✅ 같은 값을 Decimal / 정수 두 형식으로 만든 가상 레시피 [(decimal_lines, fixed_lines, 생산량)] """
+    rng = random.Random(seed)
+    recipes = []
+    for _ in range(count):
+        decimal_lines, fixed_lines = [], []
+        for _ in range(lines_per_recipe):
+            quantity_used = Decimal(rng.randint(1, 50000)) / 100  # 0.01 ~ 500
+            purchase_price = Decimal(rng.randint(100, 10000000)) / 100  # 1 ~ 100,000 원
+            purchase_quantity = Decimal(rng.randint(100, 500000)) / 100  # 1 ~ 5,000
+            decimal_lines.append((quantity_used, purchase_price, purchase_quantity))
+            fixed_lines.append((
+                int(quantity_used * QUANTITY_SCALE), int(purchase_price * MONEY_SCALE), int(purchase_quantity * QUANTITY_SCALE),
+            ))
+        recipes.append((decimal_lines, fixed_lines, rng.randint(1, 20)))
+    return recipes
+
+
+class Command(BaseCommand):
+    help = "레시피 원가 계산 마이크로벤치마크: Decimal 연산과 고정 소수점 정수 연산 속도를 비교합니다. (DB 사용 안 함)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipes", type=int, default=1000)
+        parser.add_argument("--lines", type=int, default=10, help="레시피당 재료 수")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        recipes = sample_recipes(options["recipes"], options["lines"])
+
+        # 🔹 두 방식의 결과가 같은지 먼저 확인 (1/100 원 단위 반올림 차이는 재료 1줄당 최대 1)
+        mismatched = sum(
+            1 for decimal_lines, fixed_lines, production_quantity in recipes
+            if abs(int(decimal_recipe_cost(decimal_lines, production_quantity)[0] * MONEY_SCALE)
+                   - fixed_point_recipe_cost(fixed_lines, production_quantity)[0]) > len(fixed_lines)
+        )
+
+        def run_decimal():
+            for decimal_lines, _, production_quantity in recipes:
+                decimal_recipe_cost(decimal_lines, production_quantity)
+
+        def run_fixed_point():
+            for _, fixed_lines, production_quantity in recipes:
+                fixed_point_recipe_cost(fixed_lines, production_quantity)
+
+        decimal_time = min(timeit.repeat(run_decimal, number=1, repeat=options["repeat"]))
+        fixed_time = min(timeit.repeat(run_fixed_point, number=1, repeat=options["repeat"]))
+
+        rows = len(recipes) * options["lines"]
+        self.stdout.write(f"🔹 레시피 {len(recipes)}개 × 재료 {options['lines']}개 ({rows}줄), {options['repeat']}회 중 최솟값")
+        self.stdout.write(f"   Decimal : {decimal_time * 1000:8.2f} ms ({decimal_time / rows * 1e9:6.0f} ns/줄)")
+        self.stdout.write(f"   정수    : {fixed_time * 1000:8.2f} ms ({fixed_time / rows * 1e9:6.0f} ns/줄)")
+        self.stdout.write(self.style.SUCCESS(f"✅ {decimal_time / fixed_time:.1f}배 빠름 (결과 불일치 레시피 {mismatched}개)"))
@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from costcalcul.models import Recipe, RecipeItem
+from ingredients.models import Ingredient
+from inventory.models import Inventory
+
+# 🔹 실수(DECIMAL / FLOAT)로 저장되던 수량 / 금액 컬럼 → 정수(BIGINT, 값 × scale)
+FIXED_POINT_COLUMNS = [
+    (Ingredient, "purchase_price"),
+    (Ingredient, "purchase_quantity"),
+    (Ingredient, "original_stock_before_edit"),
+    (Inventory, "remaining_stock"),
+    (Recipe, "sales_price_per_item"),
+    (Recipe, "total_ingredient_cost"),
+    (Recipe, "production_cost"),
+    (RecipeItem, "quantity_used"),
+]
+
+
+def legacy_columns():
+    """ ✅ 아직 정수로 바뀌지 않은 컬럼 [(모델, 필드)] (테이블이 없거나 이미 BIGINT 면 제외) """
+    tables = set(connection.introspection.table_names())
+    pending = []
+    with connection.cursor() as cursor:
+        descriptions = {}
+        for model, field_name in FIXED_POINT_COLUMNS:
+            table = model._meta.db_table
+            if table not in tables:
+                continue
+            if table not in descriptions:
+                descriptions[table] = {
+                    row.name: connection.introspection.get_field_type(row.type_code, row)
+                    for row in connection.introspection.get_table_description(cursor, table)
+                }
+            column = model._meta.get_field(field_name).column
+            if descriptions[table].get(column) not in (None, "BigIntegerField"):
+                pending.append((model, field_name))
+    return pending
+
+
+def convert_column(cursor, model, field_name):
+    """
+    ✅ 컬럼 1개를 값 × scale 반올림 정수로 변환.
+    PostgreSQL 은 ALTER ... TYPE bigint USING 으로 한 번에, SQLite 는 새 컬럼에 복사 후 교체 (DROP / RENAME COLUMN, 3.35+).
+    """
+    field = model._meta.get_field(field_name)
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(field.column)
+
+    if connection.vendor == "postgresql":
+        cursor.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE bigint USING ROUND({column} * {int(field.scale)})::bigint"
+        )
+        return
+
+    temp = connection.ops.quote_name(f"{field.column}__fixed")
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {temp} bigint NULL")
+    cursor.execute(f"UPDATE {table} SET {temp} = CAST(ROUND({column} * {int(field.scale)}) AS INTEGER)")
+    cursor.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+    cursor.execute(f"ALTER TABLE {table} RENAME COLUMN {temp} TO {column}")
+
+
+class Command(BaseCommand):
+    help = (
+        "수량 / 금액 컬럼을 실수(DECIMAL / FLOAT)에서 고정 소수점 정수(수량 1/1000, 금액 1/100 단위)로 변환합니다. "
+        "migrate 전에 실행해야 하며 (자동 생성되는 AlterField 는 값을 배율 없이 자르므로), 이미 변환된 컬럼은 건너뜁니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="변환할 컬럼만 출력")
+
+    def handle(self, *args, **options):
+        pending = legacy_columns()
+        if not pending:
+            self.stdout.write(self.style.SUCCESS("✅ 변환할 컬럼이 없습니다."))
+            return
+
+        for model, field_name in pending:
+            self.stdout.write(f"🔹 {model._meta.db_table}.{field_name} (× {model._meta.get_field(field_name).scale})")
+        if options["dry_run"]:
+            return
+
+        # 🔹 전체를 트랜잭션 1개로 (중간에 실패하면 변환 전 상태 그대로 → 다시 실행)
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model, field_name in pending:
+                convert_column(cursor, model, field_name)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(pending)}개 컬럼을 정수로 변환했습니다."))
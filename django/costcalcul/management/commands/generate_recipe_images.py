@@ -0,0 +1,42 @@
+import os
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from costcalcul.images import generate_recipe_image_variants, needs_normalization
+from costcalcul.models import Recipe
+from costcalcul.storage import is_content_addressed
+
+
+class Command(BaseCommand):
+    help = "레시피 이미지 원본을 정규화(EXIF 제거 / 크기 제한)하고 썸네일 / 중간 크기 변형을 생성합니다. (기본: 변형이 없는 레시피만)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="이미 변형이 있는 레시피도 다시 생성")
+        parser.add_argument("--store", help="특정 가게 id 만 처리")
+        parser.add_argument("--rehash", action="store_true", help="예전 uuid 이름 원본도 내용 해시 경로로 옮김 (중복 이미지 통합)")
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(recipe_img="").exclude(recipe_img__isnull=True).order_by("id")
+        if not options["all"]:
+            recipes = recipes.filter(recipe_img_variants={})
+        if options["store"]:
+            recipes = recipes.filter(store_id=options["store"])
+
+        done = failed = 0
+        for recipe in recipes.iterator():
+            try:
+                with recipe.recipe_img.storage.open(recipe.recipe_img.name, "rb") as file:
+                    rehash = options["rehash"] and not is_content_addressed(recipe.recipe_img.name)
+                    if rehash or needs_normalization(file):
+                        # 🔹 다시 할당하면 pre_save 시그널이 정규화 / 해시 경로 저장, django-cleanup 이 기존 원본 삭제
+                        recipe._skip_image_variants = True
+                        recipe.recipe_img = File(file, name=os.path.basename(recipe.recipe_img.name))
+                        recipe.save(update_fields=["recipe_img", "recipe_img_variants", "updated_at"])
+            except Exception as e:
+                self.stderr.write(f"⚠️ {recipe.id}: 원본 정규화 실패 ({e})")
+
+            if generate_recipe_image_variants(recipe.id):
+                done += 1
+            else:
+                failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"✅ 레시피 이미지 변형 {done}건 생성 (실패 {failed}건)"))
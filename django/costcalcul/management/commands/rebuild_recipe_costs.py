@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from costcalcul.utils import rebuild_all_recipe_costs, RECIPE_COST_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "모든 레시피의 저장된 총 재료비 / 개당 원가를 현재 재료 가격으로 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=RECIPE_COST_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        updated = rebuild_all_recipe_costs(
+            batch_size=options["batch_size"],
+            progress=lambda count: self.stdout.write(f"🔹 {count}개 레시피 재계산"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ 레시피 원가 {updated}건 재계산 완료"))
@@ -0,0 +1,206 @@
+# costcalcul/matrix.py
+
+import logging
+import math
+import threading
+from collections import OrderedDict, defaultdict
+import numpy as np
+from django.conf import settings
+from redis.exceptions import RedisError
+from costcalcul.graph import topological_order
+from costcalcul.models import Recipe
+from livflow.fixedpoint import MONEY_SCALE, QUANTITY_SCALE
+from store.cache import get_versions, store_version_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TARGET_COST_RATIO = 30.0  # 🔹 목표 원가율(%) 기본값
+
+
+class CostMatrix:
+    """
+    가게 1곳의 레시피 × 재료 사용량 희소 행렬 (COO: rows, cols, quantities).
+    재료 단가 벡터만 바꿔 끼우면 전체 레시피 원가를 한 번에 계산할 수 있다.
+    """
+
+    def __init__(self, recipes, ingredients, entries):
+        # recipes: [(id, name, sales_price, production_quantity)], ingredients: [(id, name, unit_cost)]
+        # entries: [(recipe_index, ingredient_index, quantity_used)]
+        self.recipe_ids = [row[0] for row in recipes]
+        self.recipe_index = {recipe_id: i for i, recipe_id in enumerate(self.recipe_ids)}
+        self.recipe_names = [row[1] for row in recipes]
+        self.sales_prices = np.array([row[2] if row[2] is not None else np.nan for row in recipes], dtype=np.float64)
+        self.production_quantities = np.array([row[3] or 0 for row in recipes], dtype=np.float64)
+
+        self.ingredient_ids = [row[0] for row in ingredients]
+        self.ingredient_names = [row[1] for row in ingredients]
+        self.ingredient_index = {ingredient_id: i for i, ingredient_id in enumerate(self.ingredient_ids)}
+        self.unit_costs = np.array([row[2] for row in ingredients], dtype=np.float64)
+
+        self.rows = np.array([entry[0] for entry in entries], dtype=np.intp)
+        self.cols = np.array([entry[1] for entry in entries], dtype=np.intp)
+        self.quantities = np.array([entry[2] for entry in entries], dtype=np.float64)
+
+    @classmethod
+    def build(cls, store_id):
+        """
+        ✅ 레시피 LEFT JOIN 재료 쿼리 1번으로 행렬 생성.
+        하위 레시피는 재료 단위로 펼친다 (하위 → 상위 순서로 한 번씩, 펼친 결과를 메모해 재사용).
+        시뮬레이션은 실수 벡터 연산이므로 정수(1/1000 단위, 1/100 원) 값은 여기서 한 번 실제 값으로 바꾼다.
+        """
+        rows = Recipe.objects.filter(store_id=store_id).order_by("created_at", "id").values_list(
+            "id", "name", "sales_price_per_item", "production_quantity_per_batch",
+            "recipe_items__ingredient_id", "recipe_items__quantity_used",
+            "recipe_items__ingredient__name",
+            "recipe_items__ingredient__purchase_price", "recipe_items__ingredient__purchase_quantity",
+            "recipe_items__component_id",
+        )
+
+        recipe_index, ingredient_index = {}, {}
+        recipes, ingredients = [], []
+        direct = defaultdict(dict)  # 🔹 {recipe_index: {ingredient_index: 사용량}}
+        components = defaultdict(list)  # 🔹 {recipe_id: [(component_id, 사용량)]}
+        for (recipe_id, name, sales_price, production_quantity, ingredient_id, quantity_used,
+             ingredient_name, purchase_price, purchase_quantity, component_id) in rows.iterator():
+            if recipe_id not in recipe_index:
+                recipe_index[recipe_id] = len(recipes)
+                recipes.append((recipe_id, name, sales_price / MONEY_SCALE if sales_price is not None else None, production_quantity))
+            if component_id is not None:
+                components[recipe_id].append((component_id, quantity_used / QUANTITY_SCALE))
+                continue
+            if ingredient_id is None:
+                continue  # 🔹 재료가 없는 레시피 (원가 0)
+
+            if ingredient_id not in ingredient_index:
+                ingredient_index[ingredient_id] = len(ingredients)
+                unit_cost = (purchase_price / MONEY_SCALE) / (purchase_quantity / QUANTITY_SCALE) if purchase_quantity else 0.0
+                ingredients.append((ingredient_id, ingredient_name, unit_cost))
+            usage = direct[recipe_index[recipe_id]]
+            column = ingredient_index[ingredient_id]
+            usage[column] = usage.get(column, 0.0) + quantity_used / QUANTITY_SCALE
+
+        if components:
+            cls._expand_components(recipes, recipe_index, direct, components)
+
+        entries = [(row, col, quantity) for row, usage in direct.items() for col, quantity in usage.items()]
+        return cls(recipes, ingredients, entries)
+
+    @staticmethod
+    def _expand_components(recipes, recipe_index, direct, components):
+        """ ✅ 상위 레시피 사용량 += 하위 레시피 사용량 × (사용 개수 / 하위 레시피 생산량) """
+        edges = {recipe_id: {component_id for component_id, _ in lines} for recipe_id, lines in components.items()}
+        for recipe_id in topological_order(recipe_index, edges):
+            usage = direct[recipe_index[recipe_id]]
+            for component_id, quantity_used in components.get(recipe_id, ()):
+                index = recipe_index.get(component_id)
+                production_quantity = recipes[index][3] if index is not None else 0
+                if not production_quantity:
+                    continue  # 🔹 생산량 0 인 하위 레시피는 개당 원가 0
+                scale = quantity_used / production_quantity
+                for column, quantity in direct[index].items():
+                    usage[column] = usage.get(column, 0.0) + quantity * scale
+
+    def material_costs(self, unit_costs=None):
+        """ ✅ 레시피별 총 재료비 = Σ 사용량 × 단가 (희소 행렬 × 벡터) """
+        unit_costs = self.unit_costs if unit_costs is None else unit_costs
+        # 🔹 행이 비어 있으면 bincount 가 int64 를 돌려주므로 float 로 고정
+        return np.bincount(
+            self.rows, weights=self.quantities * unit_costs[self.cols], minlength=len(self.recipe_ids)
+        ).astype(np.float64, copy=False)
+
+    def costs_per_item(self, unit_costs=None):
+        """ ✅ 개당 재료비 (Recipe.objects.with_costs() 와 같게 생산량 0 이면 0) """
+        totals = self.material_costs(unit_costs)
+        quantities = self.production_quantities
+        return np.divide(totals, quantities, out=np.zeros_like(totals), where=quantities != 0)
+
+    def shocked_unit_costs(self, price_changes):
+        """ ✅ {ingredient_id: 변동률(%)} → 새 단가 벡터 (행렬에 없는 재료는 어떤 레시피에도 영향 없음) """
+        multipliers = np.ones_like(self.unit_costs)
+        for ingredient_id, percent in price_changes.items():
+            index = self.ingredient_index.get(ingredient_id)
+            if index is not None:
+                multipliers[index] = 1 + percent / 100
+        return self.unit_costs * multipliers
+
+    def simulate(self, price_changes, target_cost_ratio=DEFAULT_TARGET_COST_RATIO, target_cost_ratios=None):
+        """
+        재료 가격 변동 시 전체 레시피의 원가 / 원가율 / 마진 / 권장 판매가 계산.
+        target_cost_ratios: 레시피별 목표 원가율(%) (없으면 target_cost_ratio)
+        """
+        current = self.costs_per_item()
+        simulated = self.costs_per_item(self.shocked_unit_costs(price_changes))
+
+        targets = np.full(len(self.recipe_ids), float(target_cost_ratio))
+        for recipe_id, ratio in (target_cost_ratios or {}).items():
+            index = self.recipe_index.get(recipe_id)
+            if index is not None:
+                targets[index] = ratio
+
+        prices = self.sales_prices
+        has_price = ~np.isnan(prices) & (prices != 0)
+        safe_prices = np.where(has_price, prices, 1.0)
+        current_ratio = np.where(has_price, current / safe_prices * 100, np.nan)
+        new_ratio = np.where(has_price, simulated / safe_prices * 100, np.nan)
+        margin = np.where(has_price, prices - simulated, np.nan)
+        suggested = simulated / (targets / 100)
+
+        def to_list(values):
+            return [None if math.isnan(v) else v for v in np.round(values, 2).tolist()]
+
+        columns = zip(
+            self.recipe_ids, self.recipe_names, to_list(prices), to_list(current), to_list(simulated),
+            to_list(simulated - current), to_list(current_ratio), to_list(new_ratio), to_list(margin),
+            to_list(targets), to_list(suggested),
+        )
+        keys = (
+            "recipe_id", "recipe_name", "sales_price", "current_cost", "new_cost",
+            "cost_change", "current_cost_ratio", "new_cost_ratio", "margin",
+            "target_cost_ratio", "suggested_price",
+        )
+        results = [dict(zip(keys, row)) for row in columns]
+        for row in results:
+            row["recipe_id"] = str(row["recipe_id"])
+
+        return {
+            "recipe_count": len(results),
+            "total_cost_change": round(float((simulated - current).sum()), 2),
+            "recipes": results,
+        }
+
+
+class CostMatrixCache:
+    """ ✅ 프로세스 내 LRU 캐시 (가게 캐시 버전이 바뀌면 = 레시피/재료가 바뀌면 다시 생성) """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, store_id):
+        try:
+            version = get_versions([store_version_name(store_id)])[0]
+        except RedisError as e:
+            logger.warning(f"⚠️ 원가 행렬 캐시 버전 조회 실패, 캐시 없이 생성: {e}")
+            return CostMatrix.build(store_id)
+
+        with self._lock:
+            cached = self._items.get(store_id)
+            if cached and cached[0] == version:
+                self._items.move_to_end(store_id)
+                return cached[1]
+
+        matrix = CostMatrix.build(store_id)
+        with self._lock:
+            self._items[store_id] = (version, matrix)
+            self._items.move_to_end(store_id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return matrix
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+cost_matrix_cache = CostMatrixCache(getattr(settings, "RECIPE_COST_MATRIX_CACHE_SIZE", 64))
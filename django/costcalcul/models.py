@@ -1,15 +1,76 @@
 from django.db import models
+from django.db.models import BigIntegerField, Case, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from store.models import Store
+from livflow.fixedpoint import FixedPointField, MONEY_SCALE, QUANTITY_SCALE, div_round, div_round_expression
+from .storage import recipe_image_storage
 import os
 from uuid import uuid4
-from decimal import Decimal
 from django.utils.timezone import now
 
+PERCENT_SCALE = 100  # 🔹 원가율 / 재료 비율(%)은 1/100 % 단위 정수
+COST_FIELD = BigIntegerField()  # 🔹 원가 계산 결과 (1/100 원 단위 정수)
+
 def recipe_image_upload_path(instance, filename):
-    """이미지를 저장할 경로 설정"""
-    ext = filename.split('.')[-1]
-    new_filename = f"{uuid4().hex}.{ext}"
-    return os.path.join("recipe_images", new_filename)
+    """이미지를 저장할 경로 설정 (파일 이름은 RecipeImageStorage 가 내용 해시로 정함)"""
+    ext = filename.split('.')[-1].lower()
+    return os.path.join("recipe_images", f"upload.{ext}")
+
+
+def material_cost_expression(prefix=""):
+    """
+    ✅ 재료 원가 = 사용량 × 구매가 / 구매량 (Ingredient.material_cost 와 동일, 구매량 0 이면 0).
+    하위 레시피(component)는 사용량 × 하위 레시피의 저장된 개당 원가 (costcalcul/graph.py 순서로 먼저 계산됨).
+    정수(1/1000 단위 × 1/100 원)끼리 곱한 뒤 반올림 나눗셈 1번 → 1/100 원 단위 정수.
+    """
+    return Case(
+        When(**{f"{prefix}component__isnull": False}, then=div_round_expression(
+            F(f"{prefix}quantity_used") * F(f"{prefix}component__production_cost"), Value(QUANTITY_SCALE),
+        )),
+        When(**{f"{prefix}ingredient__purchase_quantity": 0}, then=Value(0)),
+        default=div_round_expression(
+            F(f"{prefix}quantity_used") * F(f"{prefix}ingredient__purchase_price"),
+            F(f"{prefix}ingredient__purchase_quantity"),
+        ),
+        output_field=COST_FIELD,
+    )
+
+
+def recipe_total_cost_subquery(recipe_ref):
+    """ ✅ 레시피 1개의 총 재료비 (상관 서브쿼리, 재료가 없으면 0) """
+    totals = RecipeItem.objects.filter(recipe=recipe_ref).order_by().values("recipe").annotate(
+        total=Sum(material_cost_expression())
+    ).values("total")
+    return Coalesce(Subquery(totals, output_field=COST_FIELD), Value(0), output_field=COST_FIELD)
+
+
+class RecipeQuerySet(models.QuerySet):
+    def with_costs(self):
+        """
+        총 재료비 / 개당 재료비 / 원가 비율을 SQL 로 계산해 annotate (모두 정수).
+        프로퍼티(total_material_cost 등)가 이 값을 그대로 사용하므로 목록 조회가 쿼리 1번으로 끝난다.
+        """
+        return self.annotate(
+            annotated_total_material_cost=recipe_total_cost_subquery(OuterRef("pk")),
+        ).annotate(
+            annotated_material_cost_per_item=Case(
+                When(production_quantity_per_batch=0, then=Value(0)),
+                default=div_round_expression(F("annotated_total_material_cost"), F("production_quantity_per_batch")),
+                output_field=COST_FIELD,
+            ),
+        ).annotate(
+            annotated_cost_ratio=Case(
+                When(
+                    Q(sales_price_per_item__isnull=True) | Q(sales_price_per_item=0) | Q(production_quantity_per_batch=0),
+                    then=Value(0),
+                ),
+                default=div_round_expression(
+                    F("annotated_total_material_cost") * (100 * PERCENT_SCALE),
+                    F("sales_price_per_item") * F("production_quantity_per_batch"),
+                ),
+                output_field=COST_FIELD,
+            ),
+        )
 
 
 # 레시피(Recipe) 모델
@@ -17,55 +78,115 @@ class Recipe(models.Model):
     id = models.UUIDField(default=uuid4, primary_key=True, editable=False)
     store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="recipes", default=1)
     name = models.CharField(max_length=255)
-    sales_price_per_item = models.FloatField(null=True, blank=True) # 레시피 1개당 판매가격
+    sales_price_per_item = FixedPointField(scale=MONEY_SCALE, null=True, blank=True) # 레시피 1개당 판매가격 (1/100 원 단위 정수)
     production_quantity_per_batch = models.IntegerField(default=1) # 한번에 만드는 메뉴 갯수
-    recipe_img = models.ImageField(upload_to=recipe_image_upload_path, null=True, blank=True)  # 이미지 필드 추가
+    recipe_img = models.ImageField(
+        upload_to=recipe_image_upload_path, storage=recipe_image_storage, null=True, blank=True, db_index=True
+    )  # 이미지 필드 추가 (내용 해시 경로, 같은 이미지는 레시피 / 가게 간에 파일 1개를 공유)
+    recipe_img_variants = models.JSONField(default=dict, blank=True, editable=False)  # 썸네일 / 중간 크기 변형 경로 (costcalcul/images.py)
     is_favorites = models.BooleanField(default=False)
-    total_ingredient_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # 총 재료비
-    production_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # 개당 원가
+    total_ingredient_cost = FixedPointField(scale=MONEY_SCALE, default=0)  # 총 재료비 (1/100 원 단위 정수)
+    production_cost = FixedPointField(scale=MONEY_SCALE, default=0)  # 개당 원가 (1/100 원 단위 정수)
     created_at = models.DateTimeField(default=now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)    
+
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["store", "created_at", "id"], name="recipe_store_created_idx"),  # cursor 페이지네이션
+        ]
     
     def __str__(self):
         return self.name
 
     @property
     def total_material_cost(self):
-        return sum(item.material_cost for item in self.recipe_items.all()) if self.recipe_items.exists() else 0
+        """ ✅ 총 재료비 (with_costs() annotate 값 → prefetch 된 재료 → 집계 쿼리 1번 순으로 사용) """
+        if hasattr(self, "annotated_total_material_cost"):
+            return self.annotated_total_material_cost
+        if "recipe_items" in getattr(self, "_prefetched_objects_cache", {}):
+            return sum(item.material_cost for item in self.recipe_items.all())
+        return self.recipe_items.aggregate(total=Sum(material_cost_expression()))["total"] or 0
 
     @property
     def material_cost_per_item(self):
-        if self.production_quantity_per_batch and self.total_material_cost:
-            return self.total_material_cost / self.production_quantity_per_batch
-        return 0
+        if hasattr(self, "annotated_material_cost_per_item"):
+            return self.annotated_material_cost_per_item
+        return div_round(self.total_material_cost, self.production_quantity_per_batch)
 
     @property
     def cost_ratio(self):
-        """ ✅ 원가 비율 계산 (Decimal 변환) """
-        if self.sales_price_per_item and self.material_cost_per_item:
-            return (self.material_cost_per_item / Decimal(self.sales_price_per_item)) * 100  # ✅ Decimal 변환
-        return 0
+        """ ✅ 원가 비율 (1/100 % 단위 정수) """
+        if hasattr(self, "annotated_cost_ratio"):
+            return self.annotated_cost_ratio
+        if not self.sales_price_per_item:
+            return 0
+        return div_round(
+            self.total_material_cost * 100 * PERCENT_SCALE,
+            self.sales_price_per_item * self.production_quantity_per_batch,
+        )
+
+
+class RecipeItemQuerySet(models.QuerySet):
+    def with_costs(self):
+        """ ✅ 재료별 원가와 소속 레시피 총 재료비를 annotate (material_ratio 가 레시피 총액을 매번 다시 계산하지 않도록) """
+        return self.annotate(
+            annotated_material_cost=material_cost_expression(),
+            annotated_recipe_total_cost=recipe_total_cost_subquery(OuterRef("recipe_id")),
+        )
 
 
 # 레시피-재료 관계 모델 (RecipeItem)
 class RecipeItem(models.Model):
     recipe = models.ForeignKey(Recipe, related_name='recipe_items', on_delete=models.CASCADE)
-    ingredient = models.ForeignKey("ingredients.Ingredient", on_delete=models.CASCADE)
-    quantity_used = models.DecimalField(max_digits=10, decimal_places=2)
+    ingredient = models.ForeignKey("ingredients.Ingredient", on_delete=models.CASCADE, null=True, blank=True)
+    component = models.ForeignKey(
+        Recipe, related_name="used_in_items", on_delete=models.CASCADE, null=True, blank=True
+    )  # 하위 레시피 (시럽, 베이스, 반죽 등), 사용량 = 하위 레시피 완성품 개수
+    quantity_used = FixedPointField(scale=QUANTITY_SCALE)  # 1/1000 단위 정수
     unit = models.CharField(max_length=2, choices=[('mg', 'Milligram'), ('ml', 'Milliliter'), ('ea', 'Each')])
+
+    objects = RecipeItemQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(ingredient__isnull=False, component__isnull=True) | Q(ingredient__isnull=True, component__isnull=False),
+                name="recipe_item_ingredient_xor_component",
+            ),
+        ]
+
     def __str__(self):
-        return f"{self.ingredient.name} in {self.recipe.name}"
+        source = self.component if self.component_id else self.ingredient
+        return f"{source.name} in {self.recipe.name}"
+
+    def clean(self):
+        """ ✅ 관리자 화면 등에서 하위 레시피 지정 시 다른 가게 / 순환 구성 방지 """
+        from django.core.exceptions import ValidationError
+        from .graph import RecipeCycleError, check_components  # 🔹 graph → models 순환 import 방지
+
+        if self.component_id and self.recipe_id:
+            if self.component.store_id != self.recipe.store_id:
+                raise ValidationError({"component": "같은 가게의 레시피만 하위 레시피로 쓸 수 있습니다."})
+            try:
+                check_components(self.recipe, [self.component_id])
+            except RecipeCycleError as e:
+                raise ValidationError({"component": str(e)})
 
     @property
     def material_cost(self):
-        """ ✅ 개별 재료 원가 계산 """
-        if self.ingredient.unit_cost and self.quantity_used:
-            return self.ingredient.unit_cost * self.quantity_used
-        return 0
+        """ ✅ 개별 재료 원가 (1/100 원 단위 정수, 하위 레시피는 개당 원가 × 사용량) """
+        if hasattr(self, "annotated_material_cost"):
+            return self.annotated_material_cost
+        if self.component_id:
+            return div_round(self.component.production_cost * self.quantity_used, QUANTITY_SCALE)
+        return self.ingredient.material_cost(self.quantity_used)
 
     @property
     def material_ratio(self):
-        total_cost = self.recipe.total_material_cost
-        if total_cost:
-            return (self.material_cost / total_cost) * 100
-        return 0
+        """ ✅ 레시피 총 재료비 중 이 재료 비율 (1/100 % 단위 정수) """
+        total_cost = getattr(self, "annotated_recipe_total_cost", None)
+        if total_cost is None:
+            total_cost = self.recipe.total_material_cost
+        return div_round(self.material_cost * 100 * PERCENT_SCALE, total_cost)
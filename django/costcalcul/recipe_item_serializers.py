@@ -2,20 +2,30 @@ from rest_framework import serializers
 from django.shortcuts import get_object_or_404
 from ingredients.models import Ingredient  # ✅ Ingredient 모델 import
 from .models import RecipeItem
+from livflow.fixedpoint import FixedPointSerializerField, MAX_QUANTITY, MONEY_SCALE, QUANTITY_SCALE, from_fixed
 
 # ✅ 레시피 재료(RecipeItem) 시리얼라이저
 class RecipeItemSerializer(serializers.ModelSerializer):
-    ingredient_id = serializers.UUIDField(write_only=True)
-    required_amount = serializers.DecimalField(source="quantity_used", max_digits=10, decimal_places=2)  
+    ingredient_id = serializers.UUIDField(write_only=True, required=False)
+    component_recipe_id = serializers.UUIDField(write_only=True, required=False)  # 하위 레시피 (재료 대신)
+    required_amount = FixedPointSerializerField(QUANTITY_SCALE, source="quantity_used", max_digits=11, max_value=MAX_QUANTITY)  # 정수(1/1000 단위)로 변환
     unit_price = serializers.SerializerMethodField()  
 
     class Meta:
         model = RecipeItem
-        fields = ['id', 'ingredient_id', 'required_amount', 'unit_price']
+        fields = ['id', 'ingredient_id', 'component_recipe_id', 'required_amount', 'unit_price']
         read_only_fields = ['id']
 
+    def validate(self, data):
+        if bool(data.get("ingredient_id")) == bool(data.get("component_recipe_id")):
+            raise serializers.ValidationError("ingredient_id 와 component_recipe_id 중 하나만 보내야 합니다.")
+        return data
+
     def get_unit_price(self, obj):
         """🚀 unit_price를 반환할 때 `dict` 타입이 아닌 모델 인스턴스를 사용하도록 수정"""
+        if not isinstance(obj, dict) and obj.component_id:
+            return from_fixed(obj.component.production_cost, MONEY_SCALE)  # 하위 레시피 개당 원가
+
         if isinstance(obj, dict):  
             ingredient_id = obj.get("ingredient_id")
             ingredient = get_object_or_404(Ingredient, id=ingredient_id)  # Ingredient 모델에서 가져오기
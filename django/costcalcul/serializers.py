@@ -2,13 +2,16 @@ from rest_framework import serializers
 from .models import Recipe, RecipeItem
 from inventory.models import Inventory
 from ingredients.models import Ingredient  
-from django.shortcuts import get_object_or_404
-from decimal import Decimal
 from .utils import calculate_recipe_cost
+from livflow.fixedpoint import FixedPointSerializerField, MAX_MONEY, MONEY_SCALE, QUANTITY_SCALE, from_fixed
 import logging
+import uuid
 from django.db import transaction
 from rest_framework import serializers
 from .recipe_item_serializers import RecipeItemSerializer
+from store.cache import schedule_store_version_bump
+from .matrix import DEFAULT_TARGET_COST_RATIO
+from .images import variant_urls
 
 
 
@@ -17,23 +20,27 @@ logger = logging.getLogger(__name__)
 #  레시피(Recipe) 시리얼라이저
 class RecipeSerializer(serializers.ModelSerializer):
     recipe_name = serializers.CharField(source="name", allow_blank=False)  #  필수 값 
-    recipe_cost = serializers.DecimalField(source="sales_price_per_item", max_digits=10, decimal_places=2, required=False)  # ✅ 선택 값
+    recipe_cost = FixedPointSerializerField(MONEY_SCALE, source="sales_price_per_item", max_digits=10, max_value=MAX_MONEY, required=False)  # ✅ 선택 값
     recipe_img = serializers.ImageField(required=False, allow_null=True)  #  선택 값
+    recipe_img_variants = serializers.SerializerMethodField()  # 썸네일 / 중간 크기 URL (업로드 후 백그라운드 생성)
     ingredients = RecipeItemSerializer(many=True, required=False)  # 재료
     production_quantity = serializers.IntegerField(source="production_quantity_per_batch", required=False)  #  선택 값
-    total_ingredient_cost = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True) # 총 재료가격
-    production_cost = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    total_ingredient_cost = FixedPointSerializerField(MONEY_SCALE, max_digits=None, read_only=True) # 총 재료가격 (계산값이라 자릿수 제한 없음)
+    production_cost = FixedPointSerializerField(MONEY_SCALE, max_digits=None, read_only=True)
 
 
     class Meta:
         model = Recipe
         fields = [
-                'id', 'recipe_name', 'recipe_cost', 'recipe_img', 
+                'id', 'recipe_name', 'recipe_cost', 'recipe_img', 'recipe_img_variants',
                 'is_favorites', 'ingredients', 'production_quantity', 
                 'total_ingredient_cost', 'production_cost'
         ]
         read_only_fields = ['id']
         
+    def get_recipe_img_variants(self, obj):
+        return variant_urls(obj)
+
     def get_ingredients(self, obj):
         from .serializers import RecipeItemSerializer  # 지연 임포트
         recipe_items = RecipeItem.objects.filter(recipe=obj)
@@ -59,95 +66,82 @@ class RecipeSerializer(serializers.ModelSerializer):
             instance.recipe_img = validated_data["recipe_img"]
             # print(f" 이미지 저장됨: {instance.recipe_img}")
 
-        #  재료 구매량 변경 시, 기존 값 백업 (프론트에서 purchase_quantity 없이도 작동)
-        ingredients_data = validated_data.get("ingredients", [])
-        for ing in ingredients_data:
-            ingredient_id = ing.get("ingredient_id")
-            required_amount = Decimal(str(ing.get("required_amount", 0)))
-
-            if ingredient_id:
-                ingredient = get_object_or_404(Ingredient, id=ingredient_id)
-
-                # DB에서 최신 값을 불러와 비교
-                latest_ingredient = Ingredient.objects.get(id=ingredient_id)
-                old_qty = latest_ingredient.original_stock_before_edit
-                current_qty = latest_ingredient.purchase_quantity
-
-                if old_qty and current_qty < old_qty:
-                    # print("original_stock 감소 감지, used_stock 초기화 적용")
-                    required_amount = Decimal("0.0")
-
-                # required_amount 반영
-                ing["required_amount"] = float(required_amount)
+        #  재료(RecipeItem) 반영과 구매량 백업은 StoreRecipeDetailView.put 에서 일괄 처리
 
         instance.save()
         return instance
 
         
     def create(self, validated_data):
-        ingredients_data = validated_data.pop('ingredients', [])  
-        # print(f" [validated_data]: {validated_data}")
-        # print(f" [ingredients_data]: {ingredients_data}")
-        recipe = Recipe.objects.create(**validated_data)
-
-        # print(f" [레시피 생성] 이름: {recipe.name}, 총 재료 수: {len(ingredients_data)}")
-
-        ingredient_costs = []
-
-        for idx, ingredient_data in enumerate(ingredients_data, 1):
-            # print(f"\n [#{idx}] ingredient_data:", ingredient_data)
-
-            try:
-                ingredient = get_object_or_404(Ingredient, id=ingredient_data["ingredient_id"])
-                # print(f" Ingredient 조회 성공: {ingredient.name}")
-            except:
-                # print(f" Ingredient 조회 실패: ID = {ingredient_data.get('ingredient_id')}")
+        """ ✅ 레시피 생성 (재료 수와 상관없이 일정한 쿼리 수: 재료 일괄 조회 + bulk_create) """
+        ingredients_data = validated_data.pop('ingredients', [])
+        component_data = [data for data in ingredients_data if data.get("component_recipe_id")]
+        ingredients_data = [data for data in ingredients_data if not data.get("component_recipe_id")]
+
+        # 재료 / 하위 레시피를 한 번에 조회 (존재하지 않는 재료는 기존처럼 건너뜀, 하위 레시피는 같은 가게만)
+        ingredient_map = Ingredient.objects.in_bulk([data["ingredient_id"] for data in ingredients_data])
+        component_map = Recipe.objects.filter(store_id=validated_data.get("store_id")).in_bulk(
+            [data["component_recipe_id"] for data in component_data]
+        ) if component_data else {}
+
+        lines = []
+        for ingredient_data in ingredients_data:
+            ingredient = ingredient_map.get(ingredient_data["ingredient_id"])
+            if ingredient is None:
                 continue
-
-            required_amount = Decimal(str(ingredient_data.get("quantity_used", 0)))
             unit = ingredient_data.get("unit", ingredient.unit)
-
-            inventory, created = Inventory.objects.get_or_create(
-                ingredient=ingredient,
-                defaults={"remaining_stock": ingredient.purchase_quantity}
+            lines.append((ingredient, ingredient_data.get("quantity_used") or 0, unit))
+
+        # 🔹 하위 레시피는 건너뛰면 원가가 틀려지므로 없는 / 다른 가게 레시피는 거부 (PUT 과 동일)
+        missing_components = sorted({
+            str(data["component_recipe_id"]) for data in component_data if data["component_recipe_id"] not in component_map
+        })
+        if missing_components:
+            raise serializers.ValidationError(
+                {"ingredients": [f"이 가게에 없는 하위 레시피입니다: {', '.join(missing_components)}"]}
             )
 
-            RecipeItem.objects.create(
-                recipe=recipe,
-                ingredient=ingredient,
-                quantity_used=required_amount,
-                unit=unit
-            )
-            # print(f" RecipeItem 생성 완료: {ingredient.name}, 사용량: {required_amount}, 단위: {unit}")
-
-            ingredient_costs.append({
-                "ingredient_id": str(ingredient.id),
-                "ingredient_name": ingredient.name,
-                "unit_price": ingredient.unit_cost,  
-                "quantity_used": required_amount,
-                "unit": unit
-            })
+        # 🔹 새 레시피는 아직 아무도 쓰지 않으므로 순환 확인 불필요, 원가는 하위 레시피의 저장된 개당 원가
+        component_lines = [
+            (component_map[data["component_recipe_id"]], data.get("quantity_used") or 0) for data in component_data
+        ]
 
-        #  원가 계산 후 DB에 저장
+        #  원가는 메모리의 재료 값으로 정수 계산해서 레시피 INSERT 에 함께 저장 (사용량은 시리얼라이저에서 이미 정수로 변환됨)
         cost_data = calculate_recipe_cost(
-            ingredients=ingredient_costs,
-            sales_price_per_item=recipe.sales_price_per_item,  
-            production_quantity_per_batch=recipe.production_quantity_per_batch  
+            [(ingredient, required_amount) for ingredient, required_amount, unit in lines] + component_lines,
+            sales_price_per_item=validated_data.get("sales_price_per_item"),
+            production_quantity_per_batch=validated_data.get("production_quantity_per_batch")
         )
 
-
-        recipe.total_ingredient_cost = Decimal(str(cost_data["total_material_cost"]))
-        recipe.production_cost = Decimal(str(cost_data["cost_per_item"]))
-
         with transaction.atomic():
-            Recipe.objects.filter(id=recipe.id).update(
-                total_ingredient_cost=recipe.total_ingredient_cost,
-                production_cost=recipe.production_cost
+            recipe = Recipe.objects.create(
+                **validated_data,
+                total_ingredient_cost=cost_data["total_material_cost"],
+                production_cost=cost_data["cost_per_item"],
             )
 
-        updated_recipe = Recipe.objects.get(id=recipe.id)
-
-        return updated_recipe  # 시리얼라이저에 반영
+            # 재고(Inventory)가 없는 재료만 한 번에 생성
+            with_inventory = set(
+                Inventory.objects.filter(ingredient_id__in=ingredient_map).values_list("ingredient_id", flat=True)
+            )
+            missing = [ingredient for ingredient in ingredient_map.values() if ingredient.id not in with_inventory]
+            if missing:
+                Inventory.objects.bulk_create(
+                    [Inventory(ingredient=ingredient, remaining_stock=ingredient.purchase_quantity) for ingredient in missing]
+                )
+                # 🔹 bulk_create 는 post_save 시그널이 없으므로 재고 목록 캐시 직접 무효화
+                for store_id in {ingredient.store_id for ingredient in missing}:
+                    schedule_store_version_bump(store_id)
+
+            RecipeItem.objects.bulk_create([
+                RecipeItem(recipe=recipe, ingredient=ingredient, quantity_used=required_amount, unit=unit)
+                for ingredient, required_amount, unit in lines
+            ] + [
+                RecipeItem(recipe=recipe, component=component, quantity_used=required_amount, unit="ea")
+                for component, required_amount in component_lines
+            ])
+
+        return recipe  # 시리얼라이저에 반영
 
     def get_total_ingredient_cost(self, obj):
         """ 응답에 `total_ingredient_cost` 추가 (None 방지)"""
@@ -161,17 +155,45 @@ class RecipeSerializer(serializers.ModelSerializer):
         data = super().to_representation(instance)
         data["recipe_cost"] = data["recipe_cost"] if data["recipe_cost"] is not None else 0
 
-        recipe_items = RecipeItem.objects.filter(recipe=instance)
-        # print(f" [to_representation] 연결된 RecipeItem 개수: {recipe_items.count()}")
-        for item in recipe_items:
-            print(f" {item.ingredient.name} - {item.quantity_used}")
-
+        # 🔹 prefetch 되어 있으면 추가 쿼리 없음, ingredient 객체 대신 ingredient_id 사용
         data["ingredients"] = [
             {
-                "ingredient_id": str(item.ingredient.id),
-                "required_amount": item.quantity_used
+                "component_recipe_id": str(item.component_id),
+                "required_amount": from_fixed(item.quantity_used, QUANTITY_SCALE)
+            } if item.component_id else {
+                "ingredient_id": str(item.ingredient_id),
+                "required_amount": from_fixed(item.quantity_used, QUANTITY_SCALE)
             }
-            for item in recipe_items
+            for item in instance.recipe_items.all()
         ]
 
         return data
+
+
+# ✅ 재료 가격 변동 시뮬레이션 요청
+class CostSimulationSerializer(serializers.Serializer):
+    price_changes = serializers.DictField(
+        child=serializers.FloatField(min_value=-100), required=False, default=dict,
+        help_text="{ingredient_id: 가격 변동률(%)} 예) {\"<우유 id>\": 15, \"<설탕 id>\": 8}"
+    )
+    target_cost_ratio = serializers.FloatField(
+        min_value=0.1, max_value=100, required=False, default=DEFAULT_TARGET_COST_RATIO,
+        help_text="권장 판매가 계산에 쓰는 목표 원가율(%)"
+    )
+    target_cost_ratios = serializers.DictField(
+        child=serializers.FloatField(min_value=0.1, max_value=100), required=False, default=dict,
+        help_text="{recipe_id: 목표 원가율(%)} 레시피별 목표 (없으면 target_cost_ratio)"
+    )
+
+    @staticmethod
+    def _uuid_keys(value):
+        try:
+            return {uuid.UUID(str(key)): item for key, item in value.items()}
+        except ValueError:
+            raise serializers.ValidationError("키는 UUID 여야 합니다.")
+
+    def validate_price_changes(self, value):
+        return self._uuid_keys(value)
+
+    def validate_target_cost_ratios(self, value):
+        return self._uuid_keys(value)
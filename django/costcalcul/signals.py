@@ -0,0 +1,110 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from ingredients.models import Ingredient
+from costcalcul.models import Recipe, RecipeItem
+from costcalcul.utils import recompute_costs_for_ingredients, recompute_recipe_costs
+from costcalcul.images import delete_variant_files, normalize_upload, schedule_image_variants
+
+COST_FIELDS = ("purchase_price", "purchase_quantity")  # 🔹 레시피 원가에 영향을 주는 재료 필드
+
+
+@receiver(pre_save, sender=Ingredient)
+def remember_previous_ingredient_cost(sender, instance, raw=False, **kwargs):
+    """ ✅ 수정 전 구매가/구매량을 보관 (post_save 에서 바뀐 경우에만 레시피 재계산) """
+    if raw or instance._state.adding:
+        instance._previous_cost = None
+        return
+
+    instance._previous_cost = Ingredient.objects.filter(pk=instance.pk).values_list(*COST_FIELDS).first()
+
+
+@receiver(post_save, sender=Ingredient)
+def recompute_recipes_on_ingredient_save(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, "_previous_cost", None)
+    instance._previous_cost = None
+    if raw or previous is None:
+        return  # 🔹 새 재료는 아직 어떤 레시피에도 쓰이지 않음
+
+    current = tuple(getattr(instance, field) for field in COST_FIELDS)
+    if tuple(previous) != current:
+        recompute_costs_for_ingredients([instance.pk])
+
+
+@receiver(pre_delete, sender=Ingredient)
+def remember_recipes_on_ingredient_delete(sender, instance, **kwargs):
+    """ ✅ 재료 삭제 시 RecipeItem 이 CASCADE 로 사라지므로 영향받는 레시피를 미리 기록 """
+    instance._affected_recipe_ids = list(
+        RecipeItem.objects.filter(ingredient=instance).values_list("recipe_id", flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Ingredient)
+def recompute_recipes_on_ingredient_delete(sender, instance, **kwargs):
+    recipe_ids = getattr(instance, "_affected_recipe_ids", None)
+    if recipe_ids:
+        recompute_recipe_costs(Recipe.objects.filter(id__in=recipe_ids))
+
+
+@receiver(pre_delete, sender=Recipe)
+def remember_parents_on_recipe_delete(sender, instance, **kwargs):
+    """ ✅ 하위 레시피로 쓰이던 레시피를 삭제하면 상위 레시피의 해당 행이 CASCADE 로 사라지므로 미리 기록 """
+    instance._parent_recipe_ids = list(
+        RecipeItem.objects.filter(component=instance).exclude(recipe=instance).values_list("recipe_id", flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def recompute_parents_on_recipe_delete(sender, instance, **kwargs):
+    parent_ids = getattr(instance, "_parent_recipe_ids", None)
+    if parent_ids:
+        recompute_recipe_costs(Recipe.objects.filter(id__in=parent_ids))
+
+
+@receiver(pre_save, sender=Recipe)
+def normalize_recipe_image(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    ✅ 새로 업로드된 이미지는 저장 전에 EXIF 제거 + 크기 제한 후 다시 인코딩.
+    이미지가 바뀌거나 삭제되면 기존 변형 경로를 비우고 post_save 에서 파일 정리 / 새 변형 생성.
+    """
+    instance._previous_img_variants = None
+    if raw or (update_fields is not None and "recipe_img" not in update_fields):
+        return
+
+    image = instance.recipe_img
+    if image and not image._committed:
+        normalized = normalize_upload(image.file)
+        if normalized is not None:
+            instance.recipe_img = normalized
+
+    previous = None
+    if not instance._state.adding:
+        previous = Recipe.objects.filter(pk=instance.pk).values_list("recipe_img", "recipe_img_variants").first()
+
+    previous_name, previous_variants = previous or ("", {})
+    if (previous_name or "") != (instance.recipe_img.name or "") or not instance.recipe_img._committed:
+        instance._previous_img_variants = previous_variants or {}
+        instance.recipe_img_variants = {}
+    elif previous is not None:
+        instance.recipe_img_variants = previous_variants  # 🔹 메모리의 예전 값이 백그라운드에서 기록된 변형을 덮어쓰지 않도록
+
+
+@receiver(post_save, sender=Recipe)
+def schedule_recipe_image_variants(sender, instance, raw=False, **kwargs):
+    previous_variants = getattr(instance, "_previous_img_variants", None)
+    instance._previous_img_variants = None
+    if raw or previous_variants is None:
+        return  # 🔹 이미지가 바뀌지 않음
+
+    if previous_variants:
+        transaction.on_commit(lambda: delete_variant_files(previous_variants))
+    if instance.recipe_img and not getattr(instance, "_skip_image_variants", False):
+        schedule_image_variants(instance.pk)
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_recipe_image_variants(sender, instance, **kwargs):
+    """ ✅ 원본 이미지는 django-cleanup 이 지우고, 변형 파일은 여기서 정리 """
+    if instance.recipe_img_variants:
+        variants = instance.recipe_img_variants
+        transaction.on_commit(lambda: delete_variant_files(variants))
@@ -0,0 +1,55 @@
+# costcalcul/storage.py
+
+import hashlib
+import os
+import re
+from django.core.files.storage import FileSystemStorage
+
+CONTENT_HASH_NAME = re.compile(r"^[0-9a-f]{64}")  # 🔹 sha256 로 시작하는 파일 이름 (원본 / 원본에서 만든 변형)
+
+
+def content_hash(content):
+    """ ✅ 파일 내용 sha256 (청크 단위로 읽어 큰 파일도 메모리에 올리지 않음) """
+    hasher = hashlib.sha256()
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+def is_content_addressed(name):
+    return bool(CONTENT_HASH_NAME.match(os.path.basename(name or "")))
+
+
+def content_addressed_name(name, digest):
+    """ ✅ recipe_images/photo.jpg → recipe_images/ab/ab12...ef.jpg (디렉터리당 파일 수 분산) """
+    directory, filename = os.path.split(name)
+    ext = os.path.splitext(filename)[1].lower()
+    return os.path.join(directory, digest[:2], f"{digest}{ext}")
+
+
+class RecipeImageStorage(FileSystemStorage):
+    """
+    레시피 이미지 저장소 (MEDIA_ROOT).
+    - 저장: 내용 해시 경로에 저장하고, 같은 내용이 이미 있으면 쓰지 않고 기존 이름 반환 (중복 제거)
+    - 삭제: 아직 이 파일을 참조하는 레시피가 있으면 지우지 않음 (django-cleanup / 가게 삭제 작업 모두 여기로 옴)
+    이름이 내용으로 정해지므로 같은 URL 의 내용은 바뀌지 않는다 → nginx 에서 immutable 캐시.
+    """
+
+    def save(self, name, content, max_length=None):
+        if not is_content_addressed(name):
+            name = content_addressed_name(name, content_hash(content))
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def delete(self, name):
+        from costcalcul.images import recipe_image_reference_count  # 🔹 models → storage 순환 import 방지
+
+        if name and recipe_image_reference_count(name):
+            return
+        super().delete(name)
+
+
+def recipe_image_storage():
+    return RecipeImageStorage()
@@ -1,3 +1,661 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.test import APIClient
+from users.models import CustomUser
+from store.models import Store
+from ingredients.models import Ingredient
+from inventory.models import Inventory
+from costcalcul.models import Recipe, RecipeItem
+from costcalcul.management.commands.convert_fixed_point import legacy_columns
+from costcalcul.images import (
+    IMAGE_MAX_SIZE, IMAGE_VARIANT_SIZES, VARIANT_FORMATS, build_variants, delete_variant_files,
+    generate_recipe_image_variants, variant_file_names,
+)
+from costcalcul.matrix import cost_matrix_cache
+from costcalcul.utils import calculate_recipe_cost, stored_cost_expressions
+from livflow.fixedpoint import MAX_MONEY, MAX_QUANTITY, MONEY_SCALE, QUANTITY_SCALE, to_fixed
 
-# Create your tests here.
+
+class CostcalculTestCase(TestCase):
+    """ ✅ 사용자 / 가게 / 인증된 API 클라이언트 + 재료 / 레시피 생성 도우미 """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="owner@test.com", password="password")
+        self.store = Store.objects.create(user=self.user, name="테스트 가게")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        cost_matrix_cache.clear()
+
+    def add_ingredient(self, name, price, quantity, unit="g", store=None):
+        """ 🔹 price(원) / quantity(g, ml, ea) 는 실제 값 """
+        return Ingredient.objects.create(
+            store=store or self.store, name=name, unit=unit,
+            purchase_price=to_fixed(price, MONEY_SCALE), purchase_quantity=to_fixed(quantity, QUANTITY_SCALE),
+        )
+
+    def post_recipe(self, name, lines, price=3000, production_quantity=1, store=None):
+        """ 🔹 lines: [(재료 또는 하위 레시피, 사용량), ...] """
+        return self.client.post(f"/api/costcalcul/{(store or self.store).id}/", {
+            "recipe_name": name,
+            "recipe_cost": price,
+            "production_quantity": production_quantity,
+            "is_favorites": False,
+            "ingredients": [self.line(source, amount) for source, amount in lines],
+        }, format="json")
+
+    def put_recipe(self, recipe, lines, **data):
+        return self.client.put(f"/api/costcalcul/{self.store.id}/{recipe.id}/", {
+            "ingredients": [self.line(source, amount) for source, amount in lines], **data,
+        }, format="json")
+
+    @staticmethod
+    def line(source, amount):
+        key = "component_recipe_id" if isinstance(source, Recipe) else "ingredient_id"
+        return {key: str(source.id), "required_amount": amount}
+
+    def create_recipe(self, name, lines, **kwargs):
+        response = self.post_recipe(name, lines, **kwargs)
+        self.assertEqual(response.status_code, 201, response.content)
+        return Recipe.objects.get(pk=response.json()["id"])
+
+
+class RecipeCreateQueryCountTests(CostcalculTestCase):
+    """ ✅ 레시피 생성 (POST /api/costcalcul/<store>/) 쿼리 수는 재료 줄 수와 무관 """
+
+    EXPECTED_QUERIES = 8  # 🔹 재료 조회 / 레시피 INSERT / 재고 조회 / 재료 줄 bulk INSERT + savepoint 4개
+
+    def setUp(self):
+        super().setUp()
+        self.ingredients = Ingredient.objects.bulk_create([
+            Ingredient(store=self.store, name=f"재료{i}", purchase_price=1000 + i, purchase_quantity=1000, unit="g")
+            for i in range(20)
+        ])
+        Inventory.objects.bulk_create([
+            Inventory(ingredient=ingredient, remaining_stock=10) for ingredient in self.ingredients[:10]  # 🔹 절반만 재고 있음
+        ])
+
+    def create_recipe_lines(self, line_count, expected_queries=EXPECTED_QUERIES):
+        lines = [
+            {"ingredient_id": str(ingredient.id), "required_amount": index + 1}
+            for index, ingredient in enumerate(self.ingredients[:line_count])
+        ]
+        with self.assertNumQueries(expected_queries):
+            response = self.client.post(f"/api/costcalcul/{self.store.id}/", {
+                "recipe_name": f"레시피 {line_count}",
+                "recipe_cost": 3000,
+                "production_quantity": 2,
+                "is_favorites": False,
+                "ingredients": lines,
+            }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Recipe.objects.get(pk=response.json()["id"]).recipe_items.count(), line_count)
+
+    def test_single_ingredient_line(self):
+        self.create_recipe_lines(1)
+
+    def test_many_ingredient_lines(self):
+        self.create_recipe_lines(10)
+
+    def test_missing_inventories_are_created_in_one_query(self):
+        self.create_recipe_lines(20, expected_queries=self.EXPECTED_QUERIES + 1)
+        self.assertEqual(Inventory.objects.filter(ingredient__store=self.store).count(), 20)
+
+
+class RecipeUpdateQueryCountTests(CostcalculTestCase):
+    """ ✅ 레시피 수정 (PUT) 은 sync_recipe_items 로 바뀐 줄만 반영, 쿼리 수는 재료 줄 수와 무관 """
+
+    # 🔹 레시피 / 재료 / 재고 / 총 사용량 조회, 구매량 백업 UPDATE, 레시피 저장 2번 (이미지 확인 SELECT 포함),
+    #    기존 줄 조회 + DELETE / bulk UPDATE / bulk INSERT 각 1번, 원가 재계산 3번, refresh, 응답 재료 목록 + savepoint 2개
+    EXPECTED_QUERIES = 20
+
+    def setUp(self):
+        super().setUp()
+        self.ingredients = [self.add_ingredient(f"재료{i}", 1000 + i, 1000) for i in range(20)]
+
+    def put_changes(self, count):
+        """ 🔹 재료 줄 count 개씩 유지 / 사용량 변경 / 삭제 / 추가 """
+        kept, changed, removed, added = (self.ingredients[i * count:(i + 1) * count] for i in range(4))
+        recipe = self.create_recipe("라떼", [(ingredient, 1) for ingredient in kept + changed + removed])
+        kept_ids = set(recipe.recipe_items.filter(ingredient__in=kept + changed).values_list("id", flat=True))
+
+        lines = [(ingredient, 1) for ingredient in kept] + [(ingredient, 2) for ingredient in changed + added]
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.put_recipe(recipe, lines)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        rows = {item.ingredient_id: item for item in recipe.recipe_items.all()}
+        self.assertEqual(
+            {ingredient_id: item.quantity_used for ingredient_id, item in rows.items()},
+            {ingredient.id: to_fixed(amount, QUANTITY_SCALE) for ingredient, amount in lines},
+        )
+        self.assertTrue(kept_ids <= {item.id for item in rows.values()})  # 🔹 유지 / 변경 줄은 같은 행을 UPDATE
+
+        recipe.refresh_from_db()
+        expected = sum(ingredient.material_cost(to_fixed(amount, QUANTITY_SCALE)) for ingredient, amount in lines)
+        self.assertEqual(recipe.total_ingredient_cost, expected)
+
+    def test_single_line_of_each_change(self):
+        self.put_changes(1)
+
+    def test_many_lines_of_each_change(self):
+        self.put_changes(5)
+
+
+class RecipeReadQueryCountTests(CostcalculTestCase):
+    """ ✅ 레시피 목록 (재료 / 원가 포함) / 상세 조회 쿼리 수는 레시피 / 재료 줄 수와 무관 """
+
+    LIST_QUERIES = 5  # 🔹 ETag (가게 확인 / 레시피 집계 / 재료 집계) + 목록 (원가 annotate) + 재료 prefetch (재료 / 재고 JOIN)
+    DETAIL_QUERIES = 2  # 🔹 레시피 + 재료 줄 (재료 / 재고 JOIN)
+
+    def setUp(self):
+        super().setUp()
+        self.ingredients = Ingredient.objects.bulk_create([
+            Ingredient(store=self.store, name=f"재료{i}", purchase_price=1000 + i, purchase_quantity=1000, unit="g")
+            for i in range(10)
+        ])
+        Inventory.objects.bulk_create([Inventory(ingredient=ingredient, remaining_stock=10) for ingredient in self.ingredients])
+
+    def make_recipes(self, count, line_count):
+        recipes = Recipe.objects.bulk_create([
+            Recipe(store=self.store, name=f"레시피{i}", sales_price_per_item=300000) for i in range(count)
+        ])
+        RecipeItem.objects.bulk_create([
+            RecipeItem(recipe=recipe, ingredient=ingredient, quantity_used=1000, unit="g")
+            for recipe in recipes for ingredient in self.ingredients[:line_count]
+        ] + [
+            RecipeItem(recipe=recipe, component=recipes[0], quantity_used=1000, unit="ea") for recipe in recipes[1:]
+        ])
+        return recipes
+
+    def get_list(self, count, line_count):
+        self.make_recipes(count, line_count)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get(
+                f"/api/costcalcul/{self.store.id}/", {"include_ingredients": "true", "include_costs": "true"}
+            )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data), count)
+        self.assertEqual(sum(len(row["ingredients"]) for row in data), count * line_count + count - 1)
+
+    def get_detail(self, line_count):
+        recipe = self.make_recipes(2, line_count)[1]
+        with self.assertNumQueries(self.DETAIL_QUERIES):
+            response = self.client.get(f"/api/costcalcul/{self.store.id}/{recipe.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["ingredients"]), line_count + 1)
+
+    def test_list_single_recipe(self):
+        self.get_list(1, 1)
+
+    def test_list_many_recipes(self):
+        self.get_list(20, 10)
+
+    def test_detail_single_line(self):
+        self.get_detail(1)
+
+    def test_detail_many_lines(self):
+        self.get_detail(10)
+
+
+class RecipeCostSimulationTests(CostcalculTestCase):
+    """ ✅ 재료 가격 변동 시뮬레이션 (POST /api/costcalcul/<store>/simulate/) """
+
+    def simulate(self, data=None):
+        return self.client.post(f"/api/costcalcul/{self.store.id}/simulate/", data or {}, format="json")
+
+    def test_store_without_recipes(self):
+        response = self.simulate()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["recipes"], [])
+
+    def test_recipes_without_ingredient_lines(self):
+        Ingredient.objects.create(store=self.store, name="우유", purchase_price=3000, purchase_quantity=1000, unit="ml")
+        recipe = Recipe.objects.create(store=self.store, name="빈 레시피", sales_price_per_item=3000, production_quantity_per_batch=2)
+
+        response = self.simulate()
+
+        self.assertEqual(response.status_code, 200)
+        recipes = response.json()["recipes"]
+        self.assertEqual([row["recipe_id"] for row in recipes], [str(recipe.id)])
+        self.assertEqual(recipes[0]["new_cost"], 0)
+
+
+class RecipeComponentCreateTests(CostcalculTestCase):
+    """ ✅ 레시피 생성 시 하위 레시피 검증 (없는 / 다른 가게 레시피는 400) """
+
+    def setUp(self):
+        super().setUp()
+        self.milk = self.add_ingredient("우유", 3000, 1000, unit="ml")
+        self.syrup = self.create_recipe("시럽", [(self.milk, 100)])
+
+    def test_component_from_same_store(self):
+        latte = self.create_recipe("라떼", [(self.milk, 200), (self.syrup, 2)])
+
+        self.assertEqual(latte.total_ingredient_cost, to_fixed(600 + 300 * 2, MONEY_SCALE))
+
+    def test_component_from_another_store_is_rejected(self):
+        other_store = Store.objects.create(user=self.user, name="다른 가게")
+        other_syrup = self.create_recipe("시럽", [], store=other_store)
+
+        response = self.post_recipe("라떼", [(self.milk, 200), (other_syrup, 2)])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Recipe.objects.filter(store=self.store, name="라떼").exists())
+
+    def test_missing_component_is_rejected(self):
+        missing = Recipe(store=self.store, name="삭제된 레시피")
+
+        response = self.post_recipe("라떼", [(missing, 2)])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ingredients", response.json())
+
+
+class RecipeComponentGraphTests(CostcalculTestCase):
+    """ ✅ 하위 레시피 구성 (순환 거부 / 재료 가격 변경 시 하위 → 상위 단계별 재계산 / 하위 레시피 삭제) """
+
+    def setUp(self):
+        super().setUp()
+        self.milk = self.add_ingredient("우유", 3000, 1000, unit="ml")
+        self.beans = self.add_ingredient("원두", 20000, 1000)
+        self.syrup = self.create_recipe("시럽", [(self.milk, 100)], production_quantity=4)  # 300원 / 4개
+        self.base = self.create_recipe("베이스", [(self.syrup, 2), (self.milk, 50)])
+        self.latte = self.create_recipe("라떼", [(self.base, 1), (self.beans, 20)])
+        self.americano = self.create_recipe("아메리카노", [(self.beans, 20)])
+
+    def cost(self, recipe):
+        recipe.refresh_from_db()
+        return recipe.production_cost
+
+    def test_put_creating_cycle_is_rejected(self):
+        response = self.put_recipe(self.syrup, [(self.milk, 100), (self.latte, 1)])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+        self.assertFalse(self.syrup.recipe_items.filter(component__isnull=False).exists())
+
+    def test_put_using_itself_is_rejected(self):
+        response = self.put_recipe(self.base, [(self.base, 1)])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.base.recipe_items.count(), 2)
+
+    def test_ingredient_price_change_recomputes_downstream_by_level(self):
+        Recipe.objects.filter(pk=self.americano.pk).update(production_cost=1)  # 🔹 재계산되면 덮어써지는 표시 값
+
+        with CaptureQueriesContext(connection) as queries:
+            self.milk.purchase_price = to_fixed(6000, MONEY_SCALE)
+            self.milk.save()
+
+        recipe_updates = [q for q in queries if q["sql"].startswith(f'UPDATE "{Recipe._meta.db_table}"')]
+        self.assertEqual(len(recipe_updates), 3)  # 🔹 시럽 → 베이스 → 라떼, 단계마다 1번
+
+        self.assertEqual(self.cost(self.syrup), to_fixed(150, MONEY_SCALE))  # 🔹 600원 / 4개
+        self.assertEqual(self.cost(self.base), to_fixed(150 * 2 + 300, MONEY_SCALE))
+        self.assertEqual(self.cost(self.latte), to_fixed(600 + 400, MONEY_SCALE))
+        self.assertEqual(self.cost(self.americano), 1)
+
+    def test_deleting_component_recomputes_parents(self):
+        self.assertEqual(self.cost(self.latte), to_fixed(75 * 2 + 150 + 400, MONEY_SCALE))
+
+        response = self.client.delete(f"/api/costcalcul/{self.store.id}/{self.syrup.id}/")
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.cost(self.base), to_fixed(150, MONEY_SCALE))
+        self.assertEqual(self.cost(self.latte), to_fixed(150 + 400, MONEY_SCALE))
+
+
+def jpeg_bytes(size, color=(200, 120, 40), exif=None):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG", exif=exif.tobytes() if exif else b"")
+    return buffer.getvalue()
+
+
+@override_settings(RECIPE_IMAGE_VARIANTS_IN_BACKGROUND=False)
+class RecipeImageTestCase(CostcalculTestCase):
+    """ ✅ 임시 MEDIA_ROOT + 변형 생성은 커밋 직후 동기 실행 """
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.storage = Recipe._meta.get_field("recipe_img").storage
+
+    def create_with_image(self, name, content, filename="photo.jpg"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Recipe.objects.create(store=self.store, name=name, recipe_img=SimpleUploadedFile(filename, content))
+
+    def delete_recipe(self, recipe):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+
+
+class RecipeImageTests(RecipeImageTestCase):
+    """ ✅ 업로드 이미지 정규화 (EXIF 제거 / 크기 제한) 와 thumb / medium 변형 생성 """
+
+    def test_oversized_exif_jpeg_is_reencoded(self):
+        exif = Image.Exif()
+        exif[0x010F] = "Phone"  # 🔹 Make
+        exif[0x0112] = 6  # 🔹 Orientation: 90도 회전
+
+        recipe = self.create_with_image("라떼", jpeg_bytes((3000, 1000), exif=exif))
+
+        with self.storage.open(recipe.recipe_img.name, "rb") as file:
+            image = Image.open(file)
+            image.load()
+        self.assertEqual(image.format, "JPEG")
+        self.assertNotIn("exif", image.info)
+        self.assertLessEqual(max(image.size), IMAGE_MAX_SIZE)
+        self.assertGreater(image.height, image.width)  # 🔹 EXIF 방향이 픽셀에 적용됨
+
+    def test_variants_are_written_and_recorded(self):
+        recipe = self.create_with_image("라떼", jpeg_bytes((1200, 800)))
+
+        recipe.refresh_from_db()
+        self.assertEqual(set(recipe.recipe_img_variants), set(IMAGE_VARIANT_SIZES))
+        for label, size in IMAGE_VARIANT_SIZES.items():
+            variant = recipe.recipe_img_variants[label]
+            self.assertEqual(max(variant["width"], variant["height"]), size)
+            for key in VARIANT_FORMATS:
+                self.assertTrue(self.storage.exists(variant[key]), variant[key])
+
+    def test_replaced_image_discards_stale_variants(self):
+        recipe = self.create_with_image("라떼", jpeg_bytes((1200, 800)))
+        recipe.refresh_from_db()
+        Recipe.objects.filter(pk=recipe.pk).update(recipe_img_variants={})
+        delete_variant_files(recipe.recipe_img_variants)  # 🔹 변형을 새로 만들도록 기존 파일 정리
+        built = {}
+
+        def replace_during_build(name):
+            built.update(build_variants(name))
+            Recipe.objects.filter(pk=recipe.pk).update(recipe_img="recipe_images/replaced.jpg")  # 🔹 생성 도중 교체
+            return built
+
+        with mock.patch("costcalcul.images.build_variants", side_effect=replace_during_build):
+            self.assertIsNone(generate_recipe_image_variants(recipe.pk))
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.recipe_img_variants, {})
+        self.assertTrue(built)
+        for name in variant_file_names(built):
+            self.assertFalse(self.storage.exists(name), name)
+
+
+class RecipeImageStorageTests(RecipeImageTestCase):
+    """ ✅ 내용 해시 저장소: 같은 이미지는 파일 1개 공유, 마지막 레시피가 삭제될 때만 파일 삭제 """
+
+    def setUp(self):
+        super().setUp()
+        content = jpeg_bytes((800, 600))
+        self.first = self.create_with_image("라떼", content, "latte.jpg")
+        self.second = self.create_with_image("모카", content, "mocha.jpg")
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()  # 🔹 변형 경로는 커밋 후 UPDATE 로 기록됨
+        self.name = self.first.recipe_img.name
+        self.files = [self.name, *variant_file_names(self.first.recipe_img_variants)]
+
+    def assertFilesExist(self, exist):
+        for name in self.files:
+            self.assertEqual(self.storage.exists(name), exist, name)
+
+    def test_identical_images_share_one_file(self):
+        self.assertEqual(self.second.recipe_img.name, self.name)
+        self.assertEqual(self.second.recipe_img_variants, self.first.recipe_img_variants)
+        directory = os.path.dirname(self.storage.path(self.name))
+        self.assertEqual([name for name in os.listdir(directory) if "_" not in name], [os.path.basename(self.name)])
+
+    def test_deleting_one_recipe_keeps_shared_file(self):
+        self.delete_recipe(self.first)
+
+        self.assertFilesExist(True)
+
+    def test_deleting_last_recipe_removes_original_and_variants(self):
+        self.assertEqual(len(self.files), 1 + len(IMAGE_VARIANT_SIZES) * len(VARIANT_FORMATS))
+
+        self.delete_recipe(self.first)
+        self.delete_recipe(self.second)
+
+        self.assertFilesExist(False)
+
+
+class RecipeCostAnnotationTests(CostcalculTestCase):
+    """ ✅ with_costs() annotate 값과 프로퍼티(집계 / prefetch 경로)가 같은 값 """
+
+    def setUp(self):
+        super().setUp()
+        self.milk = self.add_ingredient("우유", 2999, 1000, unit="ml")
+        self.beans = self.add_ingredient("원두", 17333.33, 1000)
+        self.syrup = self.create_recipe("시럽", [(self.milk, 33.333)], production_quantity=7)
+
+    def assertAnnotationsMatch(self, recipe):
+        plain = Recipe.objects.get(pk=recipe.pk)
+        prefetched = Recipe.objects.prefetch_related("recipe_items__ingredient", "recipe_items__component").get(pk=recipe.pk)
+        annotated = Recipe.objects.with_costs().get(pk=recipe.pk)
+
+        for source in (plain, prefetched):
+            self.assertEqual(annotated.total_material_cost, source.total_material_cost)
+            self.assertEqual(annotated.material_cost_per_item, source.material_cost_per_item)
+            self.assertEqual(annotated.cost_ratio, source.cost_ratio)
+
+        items = {item.pk: item for item in RecipeItem.objects.filter(recipe=recipe).with_costs()}
+        for item in RecipeItem.objects.filter(recipe=recipe):
+            self.assertEqual(items[item.pk].material_cost, item.material_cost)
+            self.assertEqual(items[item.pk].material_ratio, item.material_ratio)
+        return annotated
+
+    def test_ingredient_and_component_lines(self):
+        latte = self.create_recipe(
+            "라떼", [(self.milk, 201.5), (self.beans, 18.75), (self.syrup, 2.5)], price=4500, production_quantity=3,
+        )
+
+        annotated = self.assertAnnotationsMatch(latte)
+        self.assertGreater(annotated.cost_ratio, 0)
+
+    def test_no_items(self):
+        annotated = self.assertAnnotationsMatch(self.create_recipe("빈 레시피", [], price=1000))
+
+        self.assertEqual((annotated.total_material_cost, annotated.material_cost_per_item, annotated.cost_ratio), (0, 0, 0))
+
+    def test_zero_production_quantity(self):
+        recipe = self.create_recipe("라떼", [(self.milk, 200), (self.syrup, 1)], price=4500)
+        Recipe.objects.filter(pk=recipe.pk).update(production_quantity_per_batch=0)
+
+        annotated = self.assertAnnotationsMatch(recipe)
+        self.assertEqual((annotated.material_cost_per_item, annotated.cost_ratio), (0, 0))
+
+    def test_without_sales_price(self):
+        recipe = self.create_recipe("라떼", [(self.milk, 200)])
+        Recipe.objects.filter(pk=recipe.pk).update(sales_price_per_item=None)
+
+        self.assertEqual(self.assertAnnotationsMatch(recipe).cost_ratio, 0)
+
+
+class IngredientCostSignalTests(CostcalculTestCase):
+    """ ✅ 재료 구매가 / 구매량 변경 시 저장된 레시피 원가 재계산, 다른 필드 변경은 재계산 쿼리 없음 """
+
+    def setUp(self):
+        super().setUp()
+        self.milk = self.add_ingredient("우유", 3000, 1000, unit="ml")
+        self.beans = self.add_ingredient("원두", 20000, 1000)
+        self.latte = self.create_recipe("라떼", [(self.milk, 200), (self.beans, 20)], production_quantity=2)
+        self.americano = self.create_recipe("아메리카노", [(self.beans, 20)])
+
+    def stored(self, recipe):
+        recipe.refresh_from_db()
+        return recipe.total_ingredient_cost, recipe.production_cost
+
+    def recipe_queries(self, queries):
+        return [q["sql"] for q in queries if Recipe._meta.db_table in q["sql"] or RecipeItem._meta.db_table in q["sql"]]
+
+    def test_purchase_price_change(self):
+        self.milk.purchase_price = to_fixed(4500, MONEY_SCALE)
+        self.milk.save()
+
+        self.assertEqual(self.stored(self.latte), (to_fixed(900 + 400, MONEY_SCALE), to_fixed(650, MONEY_SCALE)))
+        self.assertEqual(self.stored(self.americano), (to_fixed(400, MONEY_SCALE), to_fixed(400, MONEY_SCALE)))
+
+    def test_purchase_quantity_change(self):
+        self.beans.purchase_quantity = to_fixed(500, QUANTITY_SCALE)
+        self.beans.save()
+
+        self.assertEqual(self.stored(self.latte), (to_fixed(600 + 800, MONEY_SCALE), to_fixed(700, MONEY_SCALE)))
+        self.assertEqual(self.stored(self.americano), (to_fixed(800, MONEY_SCALE), to_fixed(800, MONEY_SCALE)))
+
+    def test_other_fields_do_not_recompute(self):
+        before = self.stored(self.latte)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.milk.name = "저지방 우유"
+            self.milk.unit = "g"
+            self.milk.save()
+
+        self.assertEqual(self.recipe_queries(queries), [])
+        self.assertEqual(self.stored(self.latte), before)
+
+    def test_ingredient_delete_recomputes(self):
+        self.milk.delete()
+
+        self.assertEqual(self.stored(self.latte), (to_fixed(400, MONEY_SCALE), to_fixed(200, MONEY_SCALE)))
+
+
+class FixedPointLimitTests(CostcalculTestCase):
+    """ ✅ 입력값 상한 (SQL 원가 계산의 사용량 × 구매가 × 2 가 BIGINT 범위를 넘지 않도록) """
+
+    def post_ingredient(self, price, capacity):
+        return self.client.post(f"/api/ingredients/{self.store.id}/", {
+            "ingredient_name": "원두", "ingredient_cost": price, "capacity": capacity, "unit": "g",
+        }, format="json")
+
+    def test_ingredient_over_limit_is_rejected(self):
+        self.assertEqual(self.post_ingredient(MAX_MONEY + 1, 1000).status_code, 400)
+        self.assertEqual(self.post_ingredient(3000, MAX_QUANTITY + 1).status_code, 400)
+        self.assertEqual(self.post_ingredient(MAX_MONEY, MAX_QUANTITY).status_code, 201)
+
+    def test_required_amount_over_limit_is_rejected(self):
+        beans = self.add_ingredient("원두", MAX_MONEY, 1000)
+
+        response = self.post_recipe("커피", [(beans, MAX_QUANTITY + 1)])
+        self.assertEqual(response.status_code, 400)
+
+        recipe = self.create_recipe("커피", [(beans, 1)])
+        response = self.put_recipe(recipe, [(beans, MAX_QUANTITY + 1)])
+        self.assertEqual(response.status_code, 400)
+
+    def test_costs_at_limit(self):
+        beans = self.add_ingredient("원두", MAX_MONEY, 1000)
+        recipe = self.create_recipe("커피", [(beans, 1)])
+
+        response = self.put_recipe(recipe, [(beans, MAX_QUANTITY)])
+
+        self.assertEqual(response.status_code, 200, response.content)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.total_ingredient_cost, to_fixed(MAX_MONEY * MAX_QUANTITY // 1000, MONEY_SCALE))
+
+
+class ConvertFixedPointTests(TestCase):
+    """ ✅ convert_fixed_point: 실수 컬럼을 값 × scale 반올림 정수로 변환, 두 번째 실행은 변경 없음 """
+
+    def setUp(self):
+        user = CustomUser.objects.create_user(email="owner@test.com", password="password")
+        store = Store.objects.create(user=user, name="테스트 가게")
+        milk = Ingredient.objects.create(store=store, name="우유", purchase_price=300000, purchase_quantity=1000000, unit="ml")
+        recipe = Recipe.objects.create(store=store, name="라떼")
+        self.item = RecipeItem.objects.create(recipe=recipe, ingredient=milk, quantity_used=0, unit="ml")
+
+    def make_legacy_column(self, values):
+        """ 🔹 RecipeItem.quantity_used 를 변환 전 상태(실수 컬럼, 실제 값)로 되돌림 """
+        table = connection.ops.quote_name(RecipeItem._meta.db_table)
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"ALTER TABLE {table} ALTER COLUMN quantity_used TYPE numeric(10, 4)")
+            else:
+                cursor.execute(f"ALTER TABLE {table} DROP COLUMN quantity_used")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN quantity_used real NULL")
+            for pk, value in values.items():
+                cursor.execute(f"UPDATE {table} SET quantity_used = %s WHERE id = %s", [value, pk])
+
+    def convert(self):
+        output = StringIO()
+        call_command("convert_fixed_point", stdout=output)
+        return output.getvalue()
+
+    def test_legacy_column_is_scaled_once(self):
+        self.make_legacy_column({self.item.pk: 2.2505})
+        self.assertEqual(legacy_columns(), [(RecipeItem, "quantity_used")])
+
+        self.assertIn("1개 컬럼", self.convert())
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity_used, 2251)  # 🔹 2.2505 × 1000 반올림
+
+        self.assertEqual(legacy_columns(), [])
+        self.assertIn("변환할 컬럼이 없습니다", self.convert())
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity_used, 2251)
+
+    def test_dry_run_keeps_column(self):
+        self.make_legacy_column({self.item.pk: 1.5})
+
+        call_command("convert_fixed_point", "--dry-run", stdout=StringIO())
+
+        self.assertEqual(legacy_columns(), [(RecipeItem, "quantity_used")])
+
+
+class RecipeCostConsistencyTests(CostcalculTestCase):
+    """ ✅ calculate_recipe_cost (파이썬) / stored_cost_expressions (저장 원가) / with_costs() (annotate) 가 같은 값 """
+
+    def setUp(self):
+        super().setUp()
+        # 🔹 반올림이 생기도록 나누어떨어지지 않는 구매가 / 구매량
+        self.milk = self.add_ingredient("우유", 2999, 1000, unit="ml")
+        self.beans = self.add_ingredient("원두", 17333.33, 1000)
+        self.syrup = self.create_recipe("시럽", [(self.milk, 33.333)], production_quantity=7)
+        self.latte = self.create_recipe(
+            "라떼", [(self.milk, 201.5), (self.beans, 18.75), (self.syrup, 2.5)], price=4500, production_quantity=3,
+        )
+        self.empty = self.create_recipe("빈 레시피", [], price=1000)
+
+    def assertConsistent(self, recipe):
+        recipe.refresh_from_db()
+        lines = [
+            (item.component or item.ingredient, item.quantity_used)
+            for item in recipe.recipe_items.select_related("ingredient", "component")
+        ]
+        expected = calculate_recipe_cost(lines, recipe.sales_price_per_item, recipe.production_quantity_per_batch)
+
+        stored = Recipe.objects.filter(pk=recipe.pk).values(**{
+            f"sql_{name}": expression for name, expression in stored_cost_expressions().items()
+        }).get()
+        annotated = Recipe.objects.with_costs().get(pk=recipe.pk)
+
+        self.assertEqual(recipe.total_ingredient_cost, expected["total_material_cost"])
+        self.assertEqual(recipe.production_cost, expected["cost_per_item"])
+        self.assertEqual(stored["sql_total_ingredient_cost"], expected["total_material_cost"])
+        self.assertEqual(stored["sql_production_cost"], expected["cost_per_item"])
+        self.assertEqual(annotated.total_material_cost, expected["total_material_cost"])
+        self.assertEqual(annotated.material_cost_per_item, expected["cost_per_item"])
+        self.assertEqual(annotated.cost_ratio, expected["cost_ratio"])
+
+    def test_ingredient_and_component_lines(self):
+        for recipe in (self.syrup, self.latte, self.empty):
+            self.assertConsistent(recipe)
+
+    def test_after_price_change(self):
+        self.milk.purchase_price = to_fixed(3123.45, MONEY_SCALE)
+        self.milk.save()
+
+        for recipe in (self.syrup, self.latte):
+            self.assertConsistent(recipe)
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import StoreRecipeListView, StoreRecipeDetailView
+from .views import StoreRecipeListView, StoreRecipeDetailView, RecipeCostSimulationView
 
 urlpatterns = [
     path('<uuid:store_id>/', StoreRecipeListView.as_view(), name='store-recipes'),  # ✅ GET, POST
+    path('<uuid:store_id>/simulate/', RecipeCostSimulationView.as_view(), name='recipe-cost-simulation'),  # ✅ POST
     path('<uuid:store_id>/<uuid:recipe_id>/', StoreRecipeDetailView.as_view(), name='recipe-detail'),  # ✅ GET, PUT, DELETE
 ]
\ No newline at end of file
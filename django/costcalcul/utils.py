@@ -1,13 +1,30 @@
 import logging
-from decimal import Decimal, InvalidOperation
-from .models import Recipe, RecipeItem  # ✅ 기존 DB 값 가져오기 위해 추가
-from django.db.models import Sum
+from .models import PERCENT_SCALE, Recipe, RecipeItem, COST_FIELD, material_cost_expression  # ✅ 기존 DB 값 가져오기 위해 추가
+from .graph import component_edges, downstream_recipe_ids, topological_levels
+from livflow.fixedpoint import QUANTITY_SCALE, div_round, div_round_expression
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+from store.cache import schedule_store_version_bump
+
+RECIPE_COST_BATCH_SIZE = 1000
 
 logger = logging.getLogger(__name__)
 
-def calculate_recipe_cost(ingredients, sales_price_per_item, production_quantity_per_batch, recipe_id=None):
-    # print(f"🛠️ [DEBUG] Received Ingredients: {ingredients}") 
 
+def line_material_cost(source, quantity_used):
+    """ ✅ 재료 1줄 원가 (1/100 원 단위 정수): 재료는 구매가 / 구매량 기준, 하위 레시피는 저장된 개당 원가 기준 """
+    if isinstance(source, Recipe):
+        return div_round(quantity_used * source.production_cost, QUANTITY_SCALE)
+    return source.material_cost(quantity_used)
+
+
+def calculate_recipe_cost(lines, sales_price_per_item, production_quantity_per_batch, recipe_id=None):
+    """
+    ✅ 레시피 원가 계산 (정수 연산만, 값 변환은 API 경계에서).
+    lines: [(재료 또는 하위 레시피, 사용량 1/1000 단위), ...], sales_price_per_item: 1/100 원 단위
+    재료별 원가를 1/100 원 단위로 반올림한 뒤 합산 (stored_cost_expressions 와 같은 결과).
+    """
     # ✅ 기존 DB 값 유지
     if recipe_id:
         try:
@@ -15,49 +32,25 @@ def calculate_recipe_cost(ingredients, sales_price_per_item, production_quantity
             sales_price_per_item = sales_price_per_item or existing_recipe.sales_price_per_item
             production_quantity_per_batch = production_quantity_per_batch or existing_recipe.production_quantity_per_batch
         except Recipe.DoesNotExist:
-            pass  
-
-    # ✅ Decimal 변환 및 예외 처리 (InvalidOperation 방지)
-    try:
-        sales_price = Decimal(str(sales_price_per_item or "0"))  
-        production_quantity = Decimal(str(production_quantity_per_batch or "1"))
-    except InvalidOperation:
-        raise ValueError("🚨 판매 가격 또는 생산량이 올바른 숫자가 아닙니다!")
-
-    total_material_cost = Decimal("0")
-    ingredient_costs = []
-
-    for ingredient in ingredients:
-        try:
-            quantity_used = Decimal(str(ingredient.get("quantity_used", "0")))
-            unit_price = Decimal(str(ingredient.get("unit_price", "0"))) if ingredient.get("unit_price") is not None else Decimal("0")
-        except InvalidOperation:
-            raise ValueError(f"🚨 재료 {ingredient}에 잘못된 값이 포함됨!")
-
-        cost = round(quantity_used * unit_price, 2)
-        ingredient_costs.append({
-            "ingredient_name": ingredient.get("ingredient_name", "Unknown"),
-            "unit_price": float(unit_price),
-            "required_amount": float(quantity_used),
-            "cost": float(cost)
-        })
-        total_material_cost += cost
+            pass
 
+    sales_price = sales_price_per_item or 0
+    production_quantity = 1 if production_quantity_per_batch is None else production_quantity_per_batch
     if production_quantity == 0:
         raise ValueError("🚨 생산량은 0이 될 수 없습니다!")
 
-    cost_per_item = round(total_material_cost / production_quantity, 2)
-
-    total_sales_revenue = sales_price * production_quantity
-    material_ratio = round(total_material_cost / total_sales_revenue, 2) if total_sales_revenue != 0 else 0  
-
-    # print(f"🛠️ [DEBUG] Cost Per Item: {cost_per_item}, Material Ratio: {material_ratio}")
+    ingredient_costs = []
+    total_material_cost = 0
+    for source, quantity_used in lines:
+        cost = line_material_cost(source, quantity_used)
+        ingredient_costs.append({"ingredient_name": source.name, "required_amount": quantity_used, "cost": cost})
+        total_material_cost += cost
 
     return {
         "ingredient_costs": ingredient_costs,
-        "total_material_cost": float(total_material_cost),
-        "cost_per_item": float(cost_per_item),
-        "material_ratio": float(material_ratio)
+        "total_material_cost": total_material_cost,
+        "cost_per_item": div_round(total_material_cost, production_quantity),
+        "cost_ratio": div_round(total_material_cost * 100 * PERCENT_SCALE, sales_price * production_quantity),
     }
 
 def get_total_used_quantity(ingredient):
@@ -66,6 +59,131 @@ def get_total_used_quantity(ingredient):
     """
     total_used = RecipeItem.objects.filter(ingredient=ingredient).aggregate(
         total=Sum('quantity_used')
-    )["total"] or Decimal("0")
+    )["total"] or 0
+
+    return total_used
+
+
+def get_total_used_quantities(ingredient_ids):
+    """ ✅ 여러 재료의 총 사용량을 GROUP BY 쿼리 1번으로 조회 ({ingredient_id: 합계}, 사용 안 된 재료는 0) """
+    totals = RecipeItem.objects.filter(ingredient_id__in=ingredient_ids).values("ingredient_id").annotate(
+        total=Sum("quantity_used")
+    ).order_by()
+    used = {row["ingredient_id"]: row["total"] or 0 for row in totals}
+    return {ingredient_id: used.get(ingredient_id, 0) for ingredient_id in ingredient_ids}
+
+
+def sync_recipe_items(recipe, lines):
+    """
+    제출된 재료 목록 [(ingredient 또는 하위 레시피, quantity_used), ...] 과 기존 RecipeItem 을 비교해 바뀐 행만 반영.
+    - 같은 재료의 기존 행은 사용량이 달라졌을 때만 bulk_update
+    - 새 재료는 bulk_create, 빠진 재료는 한 번에 delete
+    반환값: (생성, 수정, 삭제) 행 수
+    """
+    existing = {}
+    for item in RecipeItem.objects.filter(recipe=recipe).order_by("id"):
+        key = ("component", item.component_id) if item.component_id else ("ingredient", item.ingredient_id)
+        existing.setdefault(key, []).append(item)
+
+    to_create, to_update = [], []
+    for source, quantity_used in lines:
+        is_component = isinstance(source, Recipe)
+        matches = existing.get(("component" if is_component else "ingredient", source.id))
+        if matches:
+            item = matches.pop(0)
+            if item.quantity_used != quantity_used:
+                item.quantity_used = quantity_used
+                to_update.append(item)
+        elif is_component:
+            to_create.append(RecipeItem(recipe=recipe, component=source, quantity_used=quantity_used, unit="ea"))
+        else:
+            to_create.append(RecipeItem(recipe=recipe, ingredient=source, quantity_used=quantity_used, unit=source.unit))
+
+    to_delete = [item.id for items in existing.values() for item in items]
+
+    if to_delete:
+        # 🔹 Collector 로 지우면 행마다 post_delete 시그널(가게 캐시 버전 → 행마다 store_id 조회)이 발생하므로
+        #    store/purge.py 처럼 DELETE 1번 후 캐시 버전은 한 번만 증가 (bulk_update / bulk_create 도 시그널 없음)
+        RecipeItem.objects.filter(id__in=to_delete)._raw_delete(RecipeItem.objects.db)
+        schedule_store_version_bump(recipe.store_id)
+    if to_update:
+        RecipeItem.objects.bulk_update(to_update, ["quantity_used"])
+    if to_create:
+        RecipeItem.objects.bulk_create(to_create)
+
+    return len(to_create), len(to_update), len(to_delete)
+
+
+def stored_cost_expressions():
+    """
+    ✅ Recipe.total_ingredient_cost / production_cost 를 SQL 정수 연산으로 계산하는 식.
+    calculate_recipe_cost 와 같게 재료별 원가를 1/100 원 단위로 반올림한 뒤 합산.
+    """
+    totals = RecipeItem.objects.filter(recipe=OuterRef("pk")).order_by().values("recipe").annotate(
+        total=Sum(material_cost_expression())
+    ).values("total")
+    total = Coalesce(Subquery(totals, output_field=COST_FIELD), Value(0), output_field=COST_FIELD)
+
+    return {
+        "total_ingredient_cost": total,
+        "production_cost": Case(
+            When(production_quantity_per_batch=0, then=Value(0)),
+            default=div_round_expression(total, F("production_quantity_per_batch")),
+            output_field=COST_FIELD,
+        ),
+    }
+
+
+def _recompute_in_order(recipe_ids, edges, batch_size=RECIPE_COST_BATCH_SIZE, progress=None, updated=0):
+    """
+    ✅ 하위 레시피 → 상위 레시피 단계 순서로 UPDATE (단계 / 청크마다 1번).
+    상위 레시피는 SQL 에서 하위 레시피의 저장된 개당 원가를 읽으므로 각 레시피는 한 번씩만 계산된다.
+    """
+    for level in topological_levels(recipe_ids, edges):
+        for i in range(0, len(level), batch_size):
+            updated += Recipe.objects.filter(id__in=level[i:i + batch_size]).update(**stored_cost_expressions(), updated_at=now())
+            if progress:
+                progress(updated)
+    return updated
+
+
+def recompute_recipe_costs(recipes):
+    """
+    ✅ 주어진 레시피 queryset 과 이를 하위 레시피로 쓰는 상위 레시피의 저장된 원가를 다시 계산.
+    하위 레시피 관계는 가게 단위로 쿼리 1번, 이후 단계마다 UPDATE 1번 (반환값: 갱신된 행 수)
+    """
+    rows = list(recipes.values_list("id", "store_id"))
+    if not rows:
+        return 0
+    edges = component_edges({store_id for _, store_id in rows})
+    return _recompute_in_order(downstream_recipe_ids([recipe_id for recipe_id, _ in rows], edges), edges)
+
+
+def recompute_costs_for_ingredients(ingredient_ids):
+    """ ✅ 재료 가격/용량이 바뀌었을 때 그 재료를 쓰는 레시피만 다시 계산 """
+    recipe_ids = RecipeItem.objects.filter(ingredient_id__in=ingredient_ids).values("recipe_id")
+    return recompute_recipe_costs(Recipe.objects.filter(id__in=recipe_ids))
+
+
+def rebuild_all_recipe_costs(batch_size=RECIPE_COST_BATCH_SIZE, progress=None):
+    """
+    ✅ 전체 레시피 원가를 id 순 청크 단위로 재계산 (청크마다 UPDATE 1번, 긴 잠금 방지).
+    하위 레시피를 쓰는 레시피는 마지막에 하위 → 상위 순서로 한 번 더 계산 (전체 작업량은 레시피 + 관계 수에 비례).
+    """
+    updated = 0
+    last_id = None
+    while True:
+        recipes = Recipe.objects.order_by("id")
+        if last_id is not None:
+            recipes = recipes.filter(id__gt=last_id)
+        ids = list(recipes.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            edges = component_edges()
+            if edges:
+                updated = _recompute_in_order(set(edges), edges, batch_size, progress, updated)
+            return updated
 
-    return total_used
\ No newline at end of file
+        updated += recompute_recipe_costs(Recipe.objects.filter(id__in=ids))
+        last_id = ids[-1]
+        if progress:
+            progress(updated)
@@ -1,40 +1,141 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Recipe, RecipeItem
-from .serializers import RecipeSerializer
+from .models import PERCENT_SCALE, Recipe, RecipeItem
+from .serializers import RecipeSerializer, CostSimulationSerializer
+from .matrix import cost_matrix_cache
+from .images import variant_urls
+from store.models import Store
+from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.http import Http404
 from ingredients.models import Ingredient  
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from inventory.models import Inventory
 from django.db import transaction
 from drf_yasg.utils import swagger_auto_schema
-from decimal import Decimal
+from drf_yasg import openapi
 import json
-from .utils import get_total_used_quantity
+import uuid
+from .utils import get_total_used_quantities, recompute_recipe_costs, sync_recipe_items
+from .graph import RecipeCycleError, check_components
+from django.db.models import F, Max, Count, Prefetch
+from django.utils.timezone import now
+from store.cache import cache_store_response, conditional_get, make_etag, schedule_store_version_bump
+from livflow.pagination import is_paginated, paginate_keyset, paginated_data, PAGINATION_PARAMETERS
+from livflow.fixedpoint import MONEY_SCALE, QUANTITY_SCALE, from_fixed, to_fixed
 # from pprint import pprint
 
 
+def _is_true(value):
+    return str(value).lower() == "true"
+
+
+def recipe_list_etag(request, store_id):
+    """ ✅ 레시피 목록 ETag (레시피 수 + 마지막 수정 시각, 재료 포함 시 재료 마지막 수정 시각까지) """
+    if not Store.objects.filter(id=store_id, user=request.user).exists():
+        return None  # 🔹 다른 사용자의 가게는 조건부 응답 없음
+
+    stats = Recipe.objects.filter(store_id=store_id).aggregate(last=Max("updated_at"), count=Count("id"))
+    ingredient_last = None
+    if _is_true(request.GET.get("include_ingredients")):
+        ingredient_last = Ingredient.objects.filter(store_id=store_id).aggregate(last=Max("updated_at"))["last"]
+    return make_etag(
+        "recipes", store_id, stats["last"], stats["count"], ingredient_last, sorted(request.query_params.lists())
+    )
+
+
+def recipe_ingredient_line(item):
+    """ ✅ 레시피 재료 1줄 응답 (item.ingredient / ingredient.inventory 는 select_related 로 미리 로드) """
+    if item.component_id:
+        return {
+            "component_recipe_id": str(item.component_id),  # 하위 레시피
+            "required_amount": float(from_fixed(item.quantity_used, QUANTITY_SCALE))
+        }
+
+    ingredient = item.ingredient
+    required_amount = item.quantity_used
+
+    # 재고가 있는 재료의 구매량이 수정 전보다 줄었으면 사용량 0 으로 표시
+    if hasattr(ingredient, "inventory") and ingredient.purchase_quantity < ingredient.original_stock_before_edit:
+        required_amount = 0
+
+    return {
+        "ingredient_id": str(ingredient.id),
+        "required_amount": float(from_fixed(required_amount, QUANTITY_SCALE))
+    }
+
+
+def recipe_items_prefetch():
+    """ ✅ 레시피 재료 + 재료 + 재고를 쿼리 1번으로 미리 로드 """
+    return Prefetch(
+        "recipe_items",
+        queryset=RecipeItem.objects.select_related("ingredient", "ingredient__inventory").order_by("id"),
+    )
+
+
+def _round_cost(value, scale=MONEY_SCALE):
+    """ ✅ 정수 원가 / 원가율 → 응답 숫자 """
+    return float(from_fixed(value, scale)) if value is not None else 0
+
+
 # ✅ 특정 상점의 모든 레시피 조회
 class StoreRecipeListView(APIView):
     parser_classes = (JSONParser,MultiPartParser, FormParser)
     
     @swagger_auto_schema(
         operation_summary="특정 상점의 모든 레시피 조회",
+        operation_description="include_costs / include_ingredients 로 원가와 재료 목록을 함께 조회 (레시피 수와 무관하게 쿼리 최대 2번)",
+        manual_parameters=[
+            openapi.Parameter("is_favorites", openapi.IN_QUERY, description="true 면 즐겨찾기만, false 면 즐겨찾기 제외", type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter("name", openapi.IN_QUERY, description="레시피 이름 검색 (부분 일치)", type=openapi.TYPE_STRING),
+            openapi.Parameter("include_costs", openapi.IN_QUERY, description="true 면 총 재료비 / 개당 원가 / 원가율 포함", type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter("include_ingredients", openapi.IN_QUERY, description="true 면 재료 목록 포함 (상세 조회와 같은 형식)", type=openapi.TYPE_BOOLEAN),
+        ] + PAGINATION_PARAMETERS,
         responses={200: "레시피 목록 반환"}
     )
+    @conditional_get(recipe_list_etag)
+    @cache_store_response("recipes")
     def get(self, request, store_id):
         recipes = Recipe.objects.filter(store_id=store_id).order_by("created_at")
-        recipe_data = [
-            {
+
+        # ✅ 필터는 SQL 에서 처리
+        if request.GET.get("is_favorites") is not None:
+            recipes = recipes.filter(is_favorites=_is_true(request.GET["is_favorites"]))
+        if request.GET.get("name"):
+            recipes = recipes.filter(name__icontains=request.GET["name"])
+
+        include_costs = _is_true(request.GET.get("include_costs"))
+        include_ingredients = _is_true(request.GET.get("include_ingredients"))
+        if include_costs:
+            recipes = recipes.with_costs()
+        if include_ingredients:
+            recipes = recipes.prefetch_related(recipe_items_prefetch())
+
+        next_cursor = None
+        if is_paginated(request):
+            recipes, next_cursor = paginate_keyset(request, recipes)
+
+        recipe_data = []
+        for recipe in recipes:
+            row = {
                 "recipe_id": str(recipe.id),  # UUID 문자열 변환
                 "recipe_name": recipe.name,
-                "recipe_cost": recipe.sales_price_per_item if recipe.sales_price_per_item else None,
+                "recipe_cost": from_fixed(recipe.sales_price_per_item, MONEY_SCALE) if recipe.sales_price_per_item else None,
                 "recipe_img": recipe.recipe_img.url if recipe.recipe_img and hasattr(recipe.recipe_img, 'url') else None, 
+                "recipe_img_variants": variant_urls(recipe),  # 목록 화면은 thumb 사용 (생성 전이면 빈 값)
                 "is_favorites": recipe.is_favorites,  
             }
-            for recipe in recipes
-        ]
+            if include_costs:
+                row["total_ingredient_cost"] = _round_cost(recipe.total_material_cost)
+                row["production_cost"] = _round_cost(recipe.material_cost_per_item)
+                row["cost_ratio"] = _round_cost(recipe.cost_ratio, PERCENT_SCALE)
+            if include_ingredients:
+                row["ingredients"] = [recipe_ingredient_line(item) for item in recipe.recipe_items.all()]
+            recipe_data.append(row)
+
+        if is_paginated(request):
+            return Response(paginated_data(recipe_data, next_cursor), status=status.HTTP_200_OK)
         return Response(recipe_data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -84,6 +185,11 @@ class StoreRecipeListView(APIView):
                     'ingredient_id': str(ing['ingredient_id']),
                     'required_amount': ing['required_amount']
                 })
+            elif 'component_recipe_id' in ing and 'required_amount' in ing:
+                cleaned_ingredients.append({
+                    'component_recipe_id': str(ing['component_recipe_id']),
+                    'required_amount': ing['required_amount']
+                })
 
         # 최종 serializer 데이터 구성
         serializer_input = {
@@ -111,12 +217,13 @@ class StoreRecipeListView(APIView):
                 return Response({
                     "id": str(recipe.id),
                     "recipe_name": recipe.name,
-                    "recipe_cost": recipe.sales_price_per_item,
+                    "recipe_cost": from_fixed(recipe.sales_price_per_item, MONEY_SCALE),
                     "recipe_img": recipe_img_url,
+                    "recipe_img_variants": variant_urls(recipe),
                     "is_favorites": recipe.is_favorites,
                     "production_quantity": recipe.production_quantity_per_batch,
-                    "total_ingredient_cost": float(recipe.total_ingredient_cost),
-                    "production_cost": float(recipe.production_cost),
+                    "total_ingredient_cost": _round_cost(recipe.total_ingredient_cost),
+                    "production_cost": _round_cost(recipe.production_cost),
                     "ingredients": cleaned_ingredients,
                 }, status=201)
 
@@ -137,35 +244,10 @@ class StoreRecipeDetailView(APIView):
         # print(" [레시피 GET] 요청 들어옴:", store_id, recipe_id)
         """ 특정 레시피 상세 조회 """
         recipe = get_object_or_404(Recipe, id=recipe_id, store_id=store_id)
-        ingredients = RecipeItem.objects.filter(recipe=recipe)
-        # print(f" 연결된 재료 개수: {ingredients.count()}")
-
-        ingredients_data = []
-        for item in ingredients:
-            ingredient = item.ingredient
-            required_amount = item.quantity_used
-
-            # print(f" 재료: {ingredient.name}, 저장된 사용량: {required_amount}")
-            # print(f" 구매량: {ingredient.purchase_quantity}, 기존 구매량: {ingredient.original_stock_before_edit}")
-
-            inventory = Inventory.objects.filter(ingredient=ingredient).first()
-            if inventory:
-                original_stock = Decimal(str(ingredient.purchase_quantity))
-                remaining_stock = Decimal(str(inventory.remaining_stock))
-                used_stock = original_stock - remaining_stock
-
-                # print(f" used_stock: {used_stock}")
-                
-                if ingredient.purchase_quantity < ingredient.original_stock_before_edit:
-                    # print(" 구매량 감소 감지 → required_amount = 0 처리")
-                    required_amount = Decimal("0.0")
-
-            ingredients_data.append({
-                "ingredient_id": str(ingredient.id),
-                "required_amount": float(required_amount)
-            })
-
 
+        # ✅ 재료 / 재고는 JOIN 으로 한 번에 (레시피 크기와 무관하게 쿼리 2번)
+        items = RecipeItem.objects.filter(recipe=recipe).select_related("ingredient", "ingredient__inventory").order_by("id")
+        ingredients_data = [recipe_ingredient_line(item) for item in items]
 
         # 이미지 예외 처리
         recipe_img_url = None
@@ -175,8 +257,9 @@ class StoreRecipeDetailView(APIView):
         response_data = {
             "recipe_id": str(recipe.id),
             "recipe_name": recipe.name,
-            "recipe_cost": recipe.sales_price_per_item,
+            "recipe_cost": from_fixed(recipe.sales_price_per_item, MONEY_SCALE),
             "recipe_img": recipe_img_url,
+            "recipe_img_variants": variant_urls(recipe),
             "is_favorites": recipe.is_favorites,
             "ingredients": ingredients_data,
             "production_quantity": recipe.production_quantity_per_batch,
@@ -228,39 +311,78 @@ class StoreRecipeDetailView(APIView):
             except json.JSONDecodeError:
                 return Response({"error": "올바른 JSON 형식의 ingredients를 보내야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
 
-        updated_ingredients = []
+        # ✅ 하위 레시피 줄은 따로 모아 같은 가게 레시피인지 / 순환이 생기지 않는지 확인
+        component_lines = [ing for ing in ingredients if "component_recipe_id" in ing]
+        ingredients = [ing for ing in ingredients if "component_recipe_id" not in ing]
+        try:
+            component_ids = [uuid.UUID(str(ing["component_recipe_id"])) for ing in component_lines]
+        except ValueError:
+            raise Http404
 
+        component_map = Recipe.objects.filter(store_id=store_id).in_bulk(component_ids)
+        if len(component_map) != len(set(component_ids)):
+            raise Http404
+        try:
+            check_components(recipe, component_ids)
+        except RecipeCycleError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # ✅ 참조하는 재료 / 재고 / 총 사용량을 각각 쿼리 1번으로 조회
+        ingredient_ids = []
         for ing in ingredients:
-            ingredient = get_object_or_404(Ingredient, id=ing.get("ingredient_id"))
-            inventory = Inventory.objects.filter(ingredient=ingredient).first()
+            try:
+                ingredient_ids.append(uuid.UUID(str(ing.get("ingredient_id"))))
+            except ValueError:
+                raise Http404
 
-            required_amount = Decimal(str(ing.get("required_amount", 0)))
+        ingredient_map = Ingredient.objects.in_bulk(ingredient_ids)
+        if len(ingredient_map) != len(set(ingredient_ids)):
+            raise Http404  # 🔹 없는 재료가 하나라도 있으면 기존처럼 404
 
-            if inventory:
-                current_capacity = Decimal(str(ingredient.purchase_quantity))
-                remaining_stock = Decimal(str(inventory.remaining_stock))
-                total_used = get_total_used_quantity(ingredient)
+        with_inventory = set(
+            Inventory.objects.filter(ingredient_id__in=ingredient_map).values_list("ingredient_id", flat=True)
+        )
+        total_used_map = get_total_used_quantities(list(with_inventory))
 
-                estimated_old_capacity = current_capacity + total_used
+        updated_ingredients = []
+        backup_ids = []
+        lines = []
+
+        for ing, ingredient_id in zip(ingredients, ingredient_ids):
+            ingredient = ingredient_map[ingredient_id]
+            required_amount = to_fixed(ing.get("required_amount", 0), QUANTITY_SCALE) or 0  # 🔹 요청 숫자 → 정수(1/1000 단위)
 
-                # print(f"\n🧾 [디버깅] Ingredient: {ingredient.name}")
-                # print(f"📦 이전 구매량 추정: {estimated_old_capacity}, 현재 구매량: {current_capacity}")
-                # print(f"📏 기존 required_amount: {required_amount}, 총 사용량: {total_used}")
+            if ingredient_id in with_inventory:
+                current_capacity = ingredient.purchase_quantity
+                total_used = total_used_map[ingredient_id]
 
-                # 백업이 안 되어 있다면 현재 값을 백업
+                estimated_old_capacity = current_capacity + total_used
+
+                # 백업이 안 되어 있다면 현재 값을 백업 (아래에서 UPDATE 1번으로 처리)
                 if ingredient.original_stock_before_edit == 0 and ingredient.purchase_quantity > 0:
-                    # print(f"📝 original_stock_before_edit 백업: {ingredient.purchase_quantity}")
-                    ingredient.original_stock_before_edit = ingredient.purchase_quantity
-                    ingredient.save()
+                    backup_ids.append(ingredient_id)
 
                 # 초기화 조건
                 if current_capacity < estimated_old_capacity and required_amount != 0 and total_used == 0:
                     # print("⚠️ 조건 충족 → required_amount 초기화")
-                    required_amount = Decimal("0.0")
+                    required_amount = 0
 
-            ing["required_amount"] = float(required_amount)
+            ing["required_amount"] = float(from_fixed(required_amount, QUANTITY_SCALE))
             updated_ingredients.append(ing)
+            lines.append((ingredient, required_amount))
 
+        for ing, component_id in zip(component_lines, component_ids):
+            required_amount = to_fixed(ing.get("required_amount", 0), QUANTITY_SCALE) or 0
+            ing["required_amount"] = float(from_fixed(required_amount, QUANTITY_SCALE))
+            updated_ingredients.append(ing)
+            lines.append((component_map[component_id], required_amount))
+
+        if backup_ids:
+            Ingredient.objects.filter(id__in=backup_ids, original_stock_before_edit=0).update(
+                original_stock_before_edit=F("purchase_quantity"), updated_at=now()
+            )
+            for store_id in {ingredient_map[ingredient_id].store_id for ingredient_id in backup_ids}:
+                schedule_store_version_bump(store_id)
 
         request_data["ingredients"] = updated_ingredients
 
@@ -277,17 +399,12 @@ class StoreRecipeDetailView(APIView):
             recipe.is_favorites = str(request.data.get("is_favorites", str(recipe.is_favorites).lower())).lower() == "true"
             recipe.save()
 
-            RecipeItem.objects.filter(recipe=recipe).delete()
-
-            for ingredient_data in updated_ingredients:
-                ingredient = get_object_or_404(Ingredient, id=ingredient_data.get("ingredient_id"))
-                required_amount = Decimal(str(ingredient_data.get("required_amount", 0)))
+            # ✅ 기존 재료 목록과 비교해 바뀐 행만 INSERT / UPDATE / DELETE
+            sync_recipe_items(recipe, lines)
 
-                RecipeItem.objects.create(
-                    recipe=recipe,
-                    ingredient=ingredient,
-                    quantity_used=required_amount,
-                )
+            # ✅ 재료 구성이 바뀌었으므로 저장된 원가(총 재료비 / 개당 원가) 재계산 (이 레시피를 하위로 쓰는 상위 레시피까지)
+            recompute_recipe_costs(Recipe.objects.filter(pk=recipe.pk))
+            recipe.refresh_from_db(fields=["total_ingredient_cost", "production_cost", "updated_at"])
 
         # print(f"✅ 최종 저장된 이미지: {recipe.recipe_img}")
         # print(f"✅ 최종 저장된 이미지 URL: {recipe.recipe_img.url if recipe.recipe_img else 'None'}")
@@ -310,14 +427,39 @@ class StoreRecipeDetailView(APIView):
         with transaction.atomic():  # 트랜잭션 적용
             recipe_items = RecipeItem.objects.filter(recipe=recipe)
 
-            for item in recipe_items:
+            for item in recipe_items.filter(ingredient__isnull=False):  # 하위 레시피 줄은 재고 없음
                 inventory = Inventory.objects.filter(ingredient=item.ingredient).first()  # 존재 여부 체크
                 if inventory:
-                    inventory.remaining_stock = Decimal(str(inventory.remaining_stock)) 
-                    inventory.remaining_stock += item.quantity_used 
+                    inventory.remaining_stock += item.quantity_used  # 🔹 둘 다 1/1000 단위 정수
                     inventory.save()
 
             recipe_items.delete()  # 사용한 RecipeItem 삭제
             recipe.delete()  # 레시피 삭제
 
-        return Response({"message": "레시피가 삭제되었으며, 사용한 재료의 재고가 복구되었습니다."}, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response({"message": "레시피가 삭제되었으며, 사용한 재료의 재고가 복구되었습니다."}, status=status.HTTP_204_NO_CONTENT)
+
+# ✅ 재료 가격 변동 시 전체 레시피 원가 / 마진 / 권장 판매가 시뮬레이션
+class RecipeCostSimulationView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="재료 가격 변동 시뮬레이션 (what-if)",
+        operation_description="재료별 가격 변동률(%)을 적용했을 때 가게의 모든 레시피의 개당 원가, 원가율, 마진, 목표 원가율 기준 권장 판매가 (DB 는 변경하지 않음)",
+        request_body=CostSimulationSerializer,
+        responses={200: "레시피별 시뮬레이션 결과", 400: "유효성 검사 실패"}
+    )
+    def post(self, request, store_id):
+        get_object_or_404(Store, id=store_id, user=request.user)
+
+        serializer = CostSimulationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # 🔹 레시피 × 재료 행렬은 가게 데이터가 바뀔 때까지 캐시, 계산은 NumPy 벡터 연산
+        matrix = cost_matrix_cache.get(store_id)
+        result = matrix.simulate(
+            serializer.validated_data["price_changes"],
+            target_cost_ratio=serializer.validated_data["target_cost_ratio"],
+            target_cost_ratios=serializer.validated_data["target_cost_ratios"],
+        )
+        return Response(result, status=status.HTTP_200_OK)
@@ -0,0 +1,17 @@
+# gunicorn.conf.py (gunicorn 실행 시 현재 디렉터리에서 자동으로 읽힘)
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 1))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+
+# ✅ SERVER_MODE=asgi: uvicorn 워커 + ASGI 앱
+#    로그인 / 매출 예측처럼 외부 API 응답을 기다리는 async 뷰가 워커를 점유하지 않음
+# ✅ 기본값(wsgi): 기존과 같은 sync 워커 + WSGI 앱
+if os.getenv("SERVER_MODE", "wsgi") == "asgi":
+    wsgi_app = "livflow.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "livflow.wsgi:application"
+    worker_class = "sync"
@@ -1,14 +1,24 @@
 from django.contrib import admin
 from .models import Ingredient
 from inventory.models import Inventory  # ✅ Inventory 모델 추가
+from livflow.fixedpoint import MONEY_SCALE, QUANTITY_SCALE, from_fixed
 
 @admin.register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "store", "purchase_price", "purchase_quantity", "unit", "vendor")
+    list_display = ("id", "name", "store", "purchase_price_display", "purchase_quantity_display", "unit", "vendor")
     list_filter = ("store", "unit", "vendor")
     search_fields = ("name", "store__name")
     ordering = ("id",)
 
+    # ✅ 정수로 저장된 구매가 / 구매량을 실제 값으로 표시
+    def purchase_price_display(self, obj):
+        return f"{from_fixed(obj.purchase_price, MONEY_SCALE):,} 원"
+    purchase_price_display.short_description = "구매가"
+
+    def purchase_quantity_display(self, obj):
+        return from_fixed(obj.purchase_quantity, QUANTITY_SCALE)
+    purchase_quantity_display.short_description = "구매량"
+
     # ✅ Ingredient 저장 시 Inventory 자동 생성/업데이트
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)  # ✅ 기본 저장 로직 실행
@@ -2,14 +2,16 @@ import uuid
 from django.db import models
 from store.models import Store  
 from django.utils.timezone import now 
+from decimal import Decimal
+from livflow.fixedpoint import FixedPointField, MONEY_SCALE, QUANTITY_SCALE, div_round
 
 # 재료(Ingredient) 모델(모델 이름을 front랑 맞춰야하는데 너무 늦었음)
 class Ingredient(models.Model):
     id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)  #  UUID 사용
     store = models.ForeignKey(Store, related_name='ingredients', on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
-    purchase_price = models.DecimalField(max_digits=10, decimal_places=2)  #  ingredient_cost
-    purchase_quantity = models.DecimalField(max_digits=10, decimal_places=2)  #  capacity
+    purchase_price = FixedPointField(scale=MONEY_SCALE)  #  ingredient_cost (1/100 원 단위 정수)
+    purchase_quantity = FixedPointField(scale=QUANTITY_SCALE)  #  capacity (1/1000 단위 정수)
     unit = models.CharField(max_length=2, choices=[
         ('g', 'gram'),
         ('ml', 'Milliliter'),
@@ -17,15 +19,25 @@ class Ingredient(models.Model):
     ])
     vendor = models.CharField(max_length=100, blank=True, null=True)  # shop
     notes = models.TextField(blank=True, null=True)  # ingredient_detail
-    original_stock_before_edit = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    original_stock_before_edit = FixedPointField(scale=QUANTITY_SCALE, default=0)
     created_at = models.DateTimeField(default=now, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["store", "created_at", "id"], name="ingredient_store_created_idx"),  # cursor 페이지네이션
+        ]
     
     def __str__(self):
         return self.name
 
     @property
     def unit_cost(self):
-        """ ✅ 단가 계산 """
+        """ ✅ 단가 (응답용, 원 / 1 단위) """
         if self.purchase_quantity and self.purchase_price:
-            return self.purchase_price / self.purchase_quantity
+            return Decimal(self.purchase_price * QUANTITY_SCALE) / (self.purchase_quantity * MONEY_SCALE)
         return 0
+
+    def material_cost(self, quantity_used):
+        """ ✅ 사용량(1/1000 단위) 만큼의 원가 (1/100 원 단위 정수, 반올림) """
+        return div_round(quantity_used * self.purchase_price, self.purchase_quantity)
@@ -2,12 +2,13 @@
 from rest_framework import serializers
 from .models import Ingredient
 from .utils import calculate_unit_price  # ✅ utils.py의 함수 불러오기
+from livflow.fixedpoint import FixedPointSerializerField, MAX_MONEY, MAX_QUANTITY, MONEY_SCALE, QUANTITY_SCALE
 
 class IngredientSerializer(serializers.ModelSerializer):
     unit_cost = serializers.SerializerMethodField()
     ingredient_name = serializers.CharField(source="name")  # ✅ 필드명 매칭
-    ingredient_cost = serializers.DecimalField(source="purchase_price", max_digits=10, decimal_places=2)
-    capacity = serializers.DecimalField(source="purchase_quantity", max_digits=10, decimal_places=2)
+    ingredient_cost = FixedPointSerializerField(MONEY_SCALE, source="purchase_price", max_digits=10, max_value=MAX_MONEY)  # 정수(1/100 원)로 변환
+    capacity = FixedPointSerializerField(QUANTITY_SCALE, source="purchase_quantity", max_digits=11, max_value=MAX_QUANTITY)  # 정수(1/1000 단위)로 변환
     shop = serializers.CharField(source="vendor", required=False, allow_null=True, allow_blank=True)
     ingredient_detail = serializers.CharField(source="notes", required=False, allow_null=True, allow_blank=True)
 
@@ -1,9 +1,12 @@
 # ingredients/utils.py
 
+from decimal import Decimal
+from livflow.fixedpoint import MONEY_SCALE, QUANTITY_SCALE
+
 def calculate_unit_price(purchase_price, purchase_quantity):
     """
-    구매가를 용량으로 나누어 단가를 계산하는 함수.
+    구매가(1/100 원 단위 정수)를 용량(1/1000 단위 정수)으로 나누어 단가(원 / 1 단위)를 계산하는 함수.
     """
     if purchase_quantity == 0:
         return 0  # 용량이 0인 경우를 대비해 0을 반환
-    return round(purchase_price / purchase_quantity, 2)  # 소수점 둘째 자리까지 반올림
+    return round(Decimal(purchase_price * QUANTITY_SCALE) / (purchase_quantity * MONEY_SCALE), 2)  # 소수점 둘째 자리까지 반올림
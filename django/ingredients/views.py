@@ -8,8 +8,20 @@ from inventory.models import Inventory
 from .serializers import IngredientSerializer
 from store.models import Store
 from drf_yasg.utils import swagger_auto_schema
-from decimal import Decimal
 from costcalcul.models import RecipeItem
+from django.db.models import Max, Count
+from store.cache import cache_store_response, conditional_get, make_etag
+from livflow.pagination import is_paginated, paginate_keyset, paginated_data, PAGINATION_PARAMETERS
+from livflow.fixedpoint import MONEY_SCALE, QUANTITY_SCALE, from_fixed
+
+def ingredient_list_etag(request, store_id):
+    """ ✅ 재료 목록 ETag (재료 수 + 마지막 수정 시각) """
+    if not Store.objects.filter(id=store_id, user=request.user).exists():
+        return None  # 🔹 다른 사용자의 가게는 조건부 응답 없음
+
+    stats = Ingredient.objects.filter(store_id=store_id).aggregate(last=Max("updated_at"), count=Count("id"))
+    return make_etag("ingredients", store_id, stats["last"], stats["count"], sorted(request.query_params.lists()))
+
 
 class StoreIngredientView(APIView):
     """
@@ -18,18 +30,25 @@ class StoreIngredientView(APIView):
 
     @swagger_auto_schema(
         operation_summary="특정 상점의 모든 재료 조회",
+        manual_parameters=PAGINATION_PARAMETERS,
         responses={200: "재료 목록 반환"}
     )
-
+    @conditional_get(ingredient_list_etag)
+    @cache_store_response("ingredients")
     def get(self, request, store_id):
         """ 특정 상점의 모든 재료 조회 (Ingredient 기준) """
         ingredients = Ingredient.objects.filter(store_id=store_id).order_by("created_at")
+
+        next_cursor = None
+        if is_paginated(request):
+            ingredients, next_cursor = paginate_keyset(request, ingredients)
+
         ingredient_data = [
             {
                 "ingredient_id": str(ingredient.id),
                 "ingredient_name": ingredient.name,
-                "ingredient_cost": ingredient.purchase_price,
-                "capacity": ingredient.purchase_quantity,  # 원래 등록된 구매 용량 기준
+                "ingredient_cost": from_fixed(ingredient.purchase_price, MONEY_SCALE),
+                "capacity": from_fixed(ingredient.purchase_quantity, QUANTITY_SCALE),  # 원래 등록된 구매 용량 기준
                 "unit": ingredient.unit,
                 "unit_cost": ingredient.unit_cost,
                 "shop": ingredient.vendor if ingredient.vendor else None,
@@ -37,6 +56,9 @@ class StoreIngredientView(APIView):
             }
             for ingredient in ingredients
         ]
+
+        if is_paginated(request):
+            return Response(paginated_data(ingredient_data, next_cursor), status=status.HTTP_200_OK)
         return Response(ingredient_data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
@@ -84,8 +106,8 @@ class IngredientDetailView(APIView):
         data = {
             "ingredient_id": str(ingredient.id),
             "ingredient_name": ingredient.name,
-            "ingredient_cost": ingredient.purchase_price,
-            "capacity": ingredient.purchase_quantity, # 구매용량
+            "ingredient_cost": from_fixed(ingredient.purchase_price, MONEY_SCALE),
+            "capacity": from_fixed(ingredient.purchase_quantity, QUANTITY_SCALE), # 구매용량
             "unit": ingredient.unit,
             "unit_cost": ingredient.unit_cost,
             "shop": ingredient.vendor if ingredient.vendor else None,
@@ -105,13 +127,9 @@ class IngredientDetailView(APIView):
         serializer = IngredientSerializer(ingredient, data=request.data, partial=True)
 
         if serializer.is_valid():
-            old_original_stock = Decimal(str(ingredient.purchase_quantity))  # 기존 original_stock
-            new_original_stock = request.data.get("capacity")
-
-            if new_original_stock is not None:
-                new_original_stock = Decimal(str(new_original_stock))
-            else:
-                new_original_stock = old_original_stock  # 값이 없으면 기존 값 유지
+            old_original_stock = ingredient.purchase_quantity  # 기존 original_stock (1/1000 단위 정수)
+            # 🔹 capacity 는 시리얼라이저에서 이미 정수로 변환됨, 값이 없으면 기존 값 유지
+            new_original_stock = serializer.validated_data.get("purchase_quantity", old_original_stock)
 
             difference = new_original_stock - old_original_stock  # 용량 변화량 계산
             # print(f" 기존 original_stock: {old_original_stock}, 새로운 original_stock: {new_original_stock}, 차이: {difference}")
@@ -121,8 +139,6 @@ class IngredientDetailView(APIView):
             if inventory:
                 # print(f" 기존 remaining_stock: {inventory.remaining_stock}, 변동 차이: {difference}")
 
-                inventory.remaining_stock = Decimal(str(inventory.remaining_stock))
-
                 #  **original_stock 증가 → remaining_stock 증가**
                 if difference > 0:
                     inventory.remaining_stock += difference
@@ -172,10 +188,22 @@ class IngredientUsagesView(APIView):
     특정 재료를 사용하는 레시피(메뉴) 목록 조회 API
     """
 
+    @swagger_auto_schema(
+        operation_summary="특정 재료를 사용하는 레시피 목록 조회",
+        manual_parameters=PAGINATION_PARAMETERS,
+        responses={200: "레시피 이름 목록 반환"}
+    )
     def get(self, request, store_id, ingredient_id):
         """특정 재료를 사용 중인 레시피 리스트 반환"""
         # 해당 재료를 사용하는 RecipeItem 조회
-        recipe_items = RecipeItem.objects.filter(ingredient_id=ingredient_id, recipe__store_id=store_id)
+        recipe_items = RecipeItem.objects.filter(
+            ingredient_id=ingredient_id, recipe__store_id=store_id
+        ).select_related("recipe")
+
+        if is_paginated(request):
+            page, next_cursor = paginate_keyset(request, recipe_items, ordering=("id",))
+            recipe_names = [item.recipe.name for item in page]
+            return Response(paginated_data(recipe_names, next_cursor), status=status.HTTP_200_OK)
 
         # 레시피 이름 목록 반환
         recipe_names = [item.recipe.name for item in recipe_items]
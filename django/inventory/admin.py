@@ -1,9 +1,10 @@
 from django.contrib import admin
 from .models import Inventory
+from livflow.fixedpoint import QUANTITY_SCALE, from_fixed
 
 @admin.register(Inventory)
 class InventoryAdmin(admin.ModelAdmin):
-    list_display = ("ingredient", "get_store", "remaining_stock", "get_unit", "get_unit_cost")  
+    list_display = ("ingredient", "get_store", "get_remaining_stock", "get_unit", "get_unit_cost")  
     search_fields = ("ingredient__name", "ingredient__store__name")  
     list_filter = ("ingredient__store",)  
     ordering = ("id",)
@@ -19,6 +20,11 @@ class InventoryAdmin(admin.ModelAdmin):
         return obj.ingredient.store.name if obj.ingredient.store else "No Store"
     get_store.short_description = "Store"
 
+    def get_remaining_stock(self, obj):
+        """ ✅ 정수(1/1000 단위)로 저장된 남은 재고를 실제 값으로 표시 """
+        return from_fixed(obj.remaining_stock, QUANTITY_SCALE)
+    get_remaining_stock.short_description = "Remaining stock"
+
     def get_unit(self, obj):
         """ ✅ Ingredient 모델에서 unit 가져오기 """
         return obj.get_unit  
@@ -1,15 +1,16 @@
 from django.db import models
 from ingredients.models import Ingredient
 from django.utils.timezone import now
+from livflow.fixedpoint import FixedPointField, QUANTITY_SCALE, from_fixed
 
 class Inventory(models.Model):
     ingredient = models.OneToOneField(Ingredient, on_delete=models.CASCADE, related_name="inventory")
-    remaining_stock = models.FloatField(default=0)  
+    remaining_stock = FixedPointField(scale=QUANTITY_SCALE, default=0)  # 1/1000 단위 정수
     created_at = models.DateTimeField(default=now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)  
 
     def __str__(self):
-        return f"{self.ingredient.name} - {self.remaining_stock} {self.ingredient.unit}"
+        return f"{self.ingredient.name} - {from_fixed(self.remaining_stock, QUANTITY_SCALE)} {self.ingredient.unit}"
 
     @property
     def get_unit(self):
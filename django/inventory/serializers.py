@@ -1,11 +1,13 @@
 from rest_framework import serializers
 from .models import Inventory
+from livflow.fixedpoint import FixedPointSerializerField, QUANTITY_SCALE
 
 class InventorySerializer(serializers.ModelSerializer):
     ingredient_id = serializers.IntegerField(source='ingredient.id', read_only=True)  # ID로 변경
     ingredient_name = serializers.CharField(source='ingredient.name', read_only=True)
     unit = serializers.CharField(source='ingredient.unit', read_only=True)
     unit_cost = serializers.FloatField(source='ingredient.unit_cost', read_only=True)  # 단가 추가
+    remaining_stock = FixedPointSerializerField(QUANTITY_SCALE, max_digits=11)  # 정수(1/1000 단위)로 변환
 
     class Meta:
         model = Inventory
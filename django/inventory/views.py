@@ -5,35 +5,63 @@ from django.shortcuts import get_object_or_404
 from django.db import transaction  
 from .models import Inventory
 from ingredients.models import Ingredient
+from store.models import Store
 from costcalcul.models import Recipe, RecipeItem 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.db.models import F
 from django.utils.timezone import now
-from decimal import Decimal
+from django.db.models import Max, Count
+from store.cache import cache_store_response, schedule_store_version_bump, conditional_get, make_etag
+from livflow.pagination import is_paginated, paginate_keyset, paginated_data, PAGINATION_PARAMETERS
+from livflow.fixedpoint import QUANTITY_SCALE, from_fixed, to_fixed
+
+def inventory_list_etag(request, store_id):
+    """ ✅ 재고 목록 ETag (재고/재료의 마지막 수정 시각 + 행 수) """
+    if not Store.objects.filter(id=store_id, user=request.user).exists():
+        return None  # 🔹 다른 사용자의 가게는 조건부 응답 없음
+
+    stats = Inventory.objects.filter(ingredient__store_id=store_id).aggregate(
+        last=Max("updated_at"), ingredient_last=Max("ingredient__updated_at"), count=Count("id")
+    )
+    return make_etag(
+        "inventory", store_id, stats["last"], stats["ingredient_last"], stats["count"],
+        sorted(request.query_params.lists()),
+    )
+
 
 # 특정 상점의 재고 조회
 class StoreInventoryView(APIView):
     
     @swagger_auto_schema(
         operation_summary="특정 상점의 재고 목록 조회",
+        manual_parameters=PAGINATION_PARAMETERS,
         responses={200: "재고 목록 반환"}
     )
-    
+    @conditional_get(inventory_list_etag)
+    @cache_store_response("inventory")
     def get(self, request, store_id):
         """ 특정 상점의 재고 목록 조회 """
-        inventories = Inventory.objects.filter(ingredient__store_id=store_id).order_by("created_at")
+        inventories = Inventory.objects.filter(ingredient__store_id=store_id).select_related("ingredient").order_by("created_at")
+
+        next_cursor = None
+        if is_paginated(request):
+            inventories, next_cursor = paginate_keyset(request, inventories)
+
         inventory_data = [
             {
                 "ingredient_id": str(inv.ingredient.id),
                 "ingredient_name": inv.ingredient.name,
-                "original_stock": inv.ingredient.purchase_quantity,
-                "remaining_stock": inv.remaining_stock,
+                "original_stock": from_fixed(inv.ingredient.purchase_quantity, QUANTITY_SCALE),
+                "remaining_stock": from_fixed(inv.remaining_stock, QUANTITY_SCALE),
                 "unit": inv.ingredient.unit,
                 "unit_cost": inv.ingredient.unit_cost, 
             }
             for inv in inventories
         ]
+
+        if is_paginated(request):
+            return Response(paginated_data(inventory_data, next_cursor), status=status.HTTP_200_OK)
         return Response(inventory_data, status=status.HTTP_200_OK)
 
 class UseIngredientStockView(APIView):
@@ -53,14 +81,14 @@ class UseIngredientStockView(APIView):
     def post(self, request, store_id, ingredient_id):
         """ 특정 재료의 재고 사용 처리 """
         request_id = request.META.get('HTTP_X_REQUEST_ID', f"REQ-{now().strftime('%H%M%S%f')}")
-        used_stock = Decimal(str(request.data.get("used_stock", 0)))
+        used_stock = to_fixed(request.data.get("used_stock", 0), QUANTITY_SCALE) or 0  # 🔹 요청 숫자 → 정수(1/1000 단위)
 
         with transaction.atomic():
             inventory = get_object_or_404(Inventory, ingredient__id=ingredient_id, ingredient__store_id=store_id)
             inventory.refresh_from_db()  # 최신 상태 반영
 
-            before_stock = Decimal(str(inventory.remaining_stock))  # 기존 재고 상태 저장
-            original_stock = Decimal(str(inventory.ingredient.purchase_quantity))
+            before_stock = inventory.remaining_stock  # 기존 재고 상태 저장
+            original_stock = inventory.ingredient.purchase_quantity
 
             # **현재까지 사용한 총량 계산**
             used_stock_so_far = original_stock - before_stock  # (원래 등록 용량 - 현재 남은 재고)
@@ -70,10 +98,11 @@ class UseIngredientStockView(APIView):
 
             if total_usage > original_stock:
                 # print(f"[오류] REQUEST_ID: {request_id}, 총 사용량({total_usage})이 original_stock({original_stock})보다 큼")
-                return Response({"error": f"최대 사용 가능한 재고는 {original_stock - used_stock_so_far}입니다."}, status=status.HTTP_400_BAD_REQUEST)
+                return Response({"error": f"최대 사용 가능한 재고는 {from_fixed(original_stock - used_stock_so_far, QUANTITY_SCALE)}입니다."}, status=status.HTTP_400_BAD_REQUEST)
 
             # 재고 차감 로직
-            Inventory.objects.filter(id=inventory.id).update(remaining_stock=F('remaining_stock') - used_stock)
+            Inventory.objects.filter(id=inventory.id).update(remaining_stock=F('remaining_stock') - used_stock, updated_at=now())
+            schedule_store_version_bump(store_id)  # 🔹 update()는 시그널이 발생하지 않으므로 직접 캐시 무효화
             inventory.refresh_from_db()  # 최신 상태 반영
             after_stock = inventory.remaining_stock
 
@@ -83,8 +112,8 @@ class UseIngredientStockView(APIView):
             {
                 "ingredient_id": inventory.ingredient.id,
                 "ingredient_name": inventory.ingredient.name,
-                "original_stock": inventory.ingredient.purchase_quantity,  
-                "remaining_stock": inventory.remaining_stock,
+                "original_stock": from_fixed(inventory.ingredient.purchase_quantity, QUANTITY_SCALE),  
+                "remaining_stock": from_fixed(inventory.remaining_stock, QUANTITY_SCALE),
                 "unit": inventory.ingredient.unit,
             },
             status=status.HTTP_200_OK,
@@ -104,7 +133,7 @@ class DeleteRecipeView(APIView):
         recipe_items = RecipeItem.objects.filter(recipe=recipe)
 
         with transaction.atomic():  # 트랜잭션 적용
-            for item in recipe_items:
+            for item in recipe_items.filter(ingredient__isnull=False):  # 하위 레시피 줄은 재고 없음
                 inventory_item = Inventory.objects.filter(ingredient=item.ingredient).first()
                 if inventory_item:
                     max_stock = inventory_item.ingredient.purchase_quantity  # 최신 original_stock
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from ledger.models import Category as LedgerCategory, Transaction  # ✅ 가계부 카테고리
+from ledger.models import Category as LedgerCategory, Transaction, MonthlyCategorySummary, MonthlyDayActivity  # ✅ 가계부 카테고리
 
 @admin.register(LedgerCategory)
 class LedgerCategoryAdmin(admin.ModelAdmin):
@@ -12,3 +12,15 @@ class TransactionAdmin(admin.ModelAdmin):
     search_fields = ('user__email', 'transaction_type', 'category__name', 'description')
     list_filter = ('transaction_type', 'date', 'category', 'store')
     raw_id_fields = ('user', 'category', 'store')
+
+@admin.register(MonthlyCategorySummary)
+class MonthlyCategorySummaryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'store', 'year', 'month', 'transaction_type', 'category', 'total_amount', 'transaction_count')
+    list_filter = ('transaction_type', 'year', 'month', 'store')
+    raw_id_fields = ('store', 'category')
+
+@admin.register(MonthlyDayActivity)
+class MonthlyDayActivityAdmin(admin.ModelAdmin):
+    list_display = ('id', 'store', 'year', 'month', 'income_days', 'expense_days')
+    list_filter = ('year', 'month', 'store')
+    raw_id_fields = ('store',)
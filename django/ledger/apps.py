@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def install_ledger_search_index(sender, using, **kwargs):
+    """ ✅ migrate 후 검색 인덱스(pg_trgm / FTS5) 생성 """
+    from ledger.search import install_search_index
+    install_search_index(using)
 
 
 class LedgerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ledger'
+
+    def ready(self):
+        import ledger.signals  # noqa: F401
+        post_migrate.connect(install_ledger_search_index, sender=self)
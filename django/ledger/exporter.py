@@ -0,0 +1,59 @@
+# ledger/exporter.py
+
+import csv
+import json
+from ledger.models import Transaction
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = ("date", "type", "category", "detail", "cost")  # 🔹 importer.py 와 같은 컬럼 (다시 가져오기 가능)
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+
+class _Echo:
+    """ ✅ csv.writer 가 쓴 한 줄을 그대로 돌려주는 버퍼 (메모리에 쌓지 않음) """
+    def write(self, value):
+        return value
+
+
+def export_rows(store, start=None, end=None):
+    """
+    거래 내역을 (date, type, category, detail, cost) 튜플로 하나씩 반환.
+    카테고리 이름은 SQL JOIN 으로 가져오고, iterator 로 chunk 단위만 메모리에 올린다.
+    end 는 포함(inclusive) 날짜.
+    """
+    transactions = Transaction.objects.filter(store=store)
+    if start:
+        transactions = transactions.filter(date__gte=start)
+    if end:
+        transactions = transactions.filter(date__lte=end)
+
+    return transactions.order_by("date", "created_at", "id").values_list(
+        "date", "transaction_type", "category__name", "description", "amount"
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield "﻿"  # 🔹 엑셀에서 한글이 깨지지 않도록 BOM
+    yield writer.writerow(EXPORT_COLUMNS)
+    for date, transaction_type, category, description, amount in rows:
+        yield writer.writerow([date.isoformat(), transaction_type, category or "", description or "", amount])
+
+
+def stream_ndjson(rows):
+    for date, transaction_type, category, description, amount in rows:
+        yield json.dumps({
+            "date": date.isoformat(),
+            "type": transaction_type,
+            "category": category or "",
+            "detail": description or "",
+            "cost": float(amount),
+        }, ensure_ascii=False) + "\n"
+
+
+def stream_export(store, export_format, start=None, end=None):
+    rows = export_rows(store, start, end)
+    return stream_csv(rows) if export_format == "csv" else stream_ndjson(rows)
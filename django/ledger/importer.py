@@ -0,0 +1,182 @@
+# ledger/importer.py
+
+import csv
+import hashlib
+import io
+from collections import Counter, defaultdict
+from decimal import Decimal
+from datetime import timedelta
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction as db_transaction
+from ledger.models import Category, Transaction, MonthlyCategorySummary, MonthlyDayActivity
+from store.cache import schedule_store_version_bump, schedule_version_bump, LEDGER_CATEGORY_VERSION
+
+MAX_IMPORT_ROWS = 100_000
+IMPORT_BATCH_SIZE = 1000
+IMPORT_COLUMNS = ("date", "type", "category", "detail", "cost")
+DEFAULT_CATEGORY_NAME = "미분류"
+
+AMOUNT_PLACES = Decimal("0.01")
+
+
+def read_csv_rows(file):
+    """ ✅ 업로드된 CSV 파일 → dict 목록 (엑셀에서 저장한 BOM 포함 UTF-8 허용) """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    missing = [column for column in ("date", "type", "cost") if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV 헤더에 {', '.join(missing)} 컬럼이 필요합니다. (사용 가능: {', '.join(IMPORT_COLUMNS)})")
+    return list(reader)
+
+
+def _parse_date(value):
+    """ 🔹 "YYYY-MM-DD" 문자열 또는 기존 API 와 같은 {"year", "month", "day"} 형식 """
+    if isinstance(value, dict):
+        value = f"{value.get('year')}-{value.get('month')}-{value.get('day')}"
+    return Transaction._meta.get_field("date").clean(str(value).strip() if value is not None else "", None)
+
+
+def _clean_row(row):
+    """ ✅ 행 1개 검증 → (정리된 값 dict, 오류 dict) """
+    if not isinstance(row, dict):
+        return None, {"row": ["객체 형식이어야 합니다."]}
+
+    errors = {}
+    cleaned = {}
+
+    try:
+        cleaned["date"] = _parse_date(row.get("date"))
+    except DjangoValidationError as e:
+        errors["date"] = e.messages
+
+    transaction_type = str(row.get("type") or "").strip()
+    if transaction_type not in dict(Transaction.TRANSACTION_TYPES):
+        errors["type"] = ["income 또는 expense 여야 합니다."]
+    cleaned["transaction_type"] = transaction_type
+
+    try:
+        amount = Transaction._meta.get_field("amount").clean(str(row.get("cost") or "").strip(), None)
+        cleaned["amount"] = amount.quantize(AMOUNT_PLACES)
+    except DjangoValidationError as e:
+        errors["cost"] = e.messages
+
+    category_name = str(row.get("category") or "").strip() or DEFAULT_CATEGORY_NAME
+    if len(category_name) > Category._meta.get_field("name").max_length:
+        errors["category"] = ["카테고리 이름이 너무 깁니다."]
+    cleaned["category_name"] = category_name
+
+    cleaned["description"] = str(row.get("detail") or "").strip()
+
+    return cleaned, errors
+
+
+def _content_hash(date, transaction_type, category_name, amount, description):
+    """ ✅ 중복 판별용 내용 해시 (날짜, 종류, 카테고리, 금액, 메모) """
+    raw = "\x1f".join([
+        date.isoformat(),
+        transaction_type,
+        category_name or DEFAULT_CATEGORY_NAME,
+        str(Decimal(amount).quantize(AMOUNT_PLACES)),
+        description or "",
+    ])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _existing_hashes(store, start, end):
+    """ ✅ 가져올 기간 안의 기존 거래 내역 해시별 개수 (범위 조건 1번 조회) """
+    rows = Transaction.objects.filter(store=store, date__gte=start, date__lt=end).values_list(
+        "date", "transaction_type", "category__name", "amount", "description"
+    )
+    return Counter(_content_hash(*row) for row in rows.iterator(chunk_size=IMPORT_BATCH_SIZE))
+
+
+def _resolve_categories(names):
+    """ ✅ 카테고리 이름 → Category 를 한 번에 조회하고, 없는 이름만 bulk_create """
+    categories = {c.name: c for c in Category.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in categories]
+    if missing:
+        Category.objects.bulk_create([Category(name=name) for name in missing], ignore_conflicts=True)
+        categories.update({c.name: c for c in Category.objects.filter(name__in=missing)})
+        schedule_version_bump(LEDGER_CATEGORY_VERSION)  # 🔹 bulk_create 는 시그널이 발생하지 않음
+    return categories
+
+
+def _apply_ledger_rollups(store_id, transactions):
+    """
+    bulk_create 는 post_save 시그널을 건너뛰므로
+    월별 카테고리 집계 / 달력 비트맵을 (월, 종류, 카테고리) 단위로 모아서 한 번씩 반영.
+    """
+    totals = defaultdict(lambda: [Decimal("0"), 0])
+    day_masks = defaultdict(int)
+    for t in transactions:
+        key = (t.date.year, t.date.month, t.transaction_type, t.category_id)
+        totals[key][0] += t.amount
+        totals[key][1] += 1
+        day_masks[(t.date.year, t.date.month, t.transaction_type)] |= 1 << (t.date.day - 1)
+
+    for (year, month, transaction_type, category_id), (amount, count) in totals.items():
+        MonthlyCategorySummary.apply_delta(store_id, year, month, transaction_type, category_id, amount, count)
+    for (year, month, transaction_type), mask in day_masks.items():
+        MonthlyDayActivity.mark_days(store_id, year, month, transaction_type, mask)
+
+
+def import_transactions(user, store, rows, batch_size=IMPORT_BATCH_SIZE):
+    """
+    거래 내역 일괄 등록.
+    - 한 행이라도 오류가 있으면 아무것도 저장하지 않고 행별 오류 반환
+    - 내용이 같은 행은 (파일 안 개수 - 기존 거래 개수) 만큼만 저장하고 나머지는 중복으로 건너뜀
+      (같은 날 같은 금액의 거래가 실제로 여러 번 있을 수 있으므로 재업로드만 걸러냄)
+    - 전체를 하나의 DB 트랜잭션 안에서 batch_size 단위 bulk_create
+    반환값: {"created", "duplicates", "errors"}
+    """
+    cleaned_rows = []
+    errors = []
+    for index, row in enumerate(rows, start=1):
+        cleaned, row_errors = _clean_row(row)
+        if row_errors:
+            errors.append({"row": index, "errors": row_errors})
+        else:
+            cleaned_rows.append((index, cleaned))
+
+    if errors or not cleaned_rows:
+        return {"created": 0, "duplicates": [], "errors": errors}
+
+    start = min(c["date"] for _, c in cleaned_rows)
+    end = max(c["date"] for _, c in cleaned_rows) + timedelta(days=1)
+    existing = _existing_hashes(store, start, end)
+
+    new_rows = []
+    duplicates = []
+    for index, cleaned in cleaned_rows:
+        content_hash = _content_hash(
+            cleaned["date"], cleaned["transaction_type"], cleaned["category_name"],
+            cleaned["amount"], cleaned["description"],
+        )
+        if existing[content_hash] > 0:
+            existing[content_hash] -= 1  # 🔹 기존 거래 1건당 파일의 행 1개만 중복 처리
+            duplicates.append(index)
+            continue
+        new_rows.append(cleaned)
+
+    if not new_rows:
+        return {"created": 0, "duplicates": duplicates, "errors": []}
+
+    with db_transaction.atomic():
+        categories = _resolve_categories({c["category_name"] for c in new_rows})
+        transactions = [
+            Transaction(
+                user=user,
+                store=store,
+                category=categories[c["category_name"]],
+                transaction_type=c["transaction_type"],
+                amount=c["amount"],
+                date=c["date"],
+                description=c["description"],
+            )
+            for c in new_rows
+        ]
+        Transaction.objects.bulk_create(transactions, batch_size=batch_size)
+        _apply_ledger_rollups(store.id, transactions)
+        schedule_store_version_bump(store.id)
+
+    return {"created": len(transactions), "duplicates": duplicates, "errors": []}
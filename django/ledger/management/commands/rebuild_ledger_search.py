@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from ledger.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = "가계부 거래 내역 검색 인덱스를 다시 생성합니다. (SQLite FTS5 테이블은 VACUUM 후 실행 필요)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if install_search_index(options["database"], rebuild=True):
+            self.stdout.write(self.style.SUCCESS("✅ 거래 내역 검색 인덱스 재생성 완료"))
+        else:
+            self.stdout.write(self.style.WARNING("⚠️ 지원하지 않는 DB 입니다. 인덱스 없이 부분 문자열 검색을 사용합니다."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from ledger.models import MonthlyCategorySummary, MonthlyDayActivity
+
+
+class Command(BaseCommand):
+    help = "가계부 거래 내역으로부터 월별 카테고리 집계와 달력 비트맵을 다시 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store", action="append", dest="stores", help="특정 가게(store_id)만 재생성 (여러 번 지정 가능)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = MonthlyCategorySummary.rebuild(store_ids=options["stores"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ 월별 카테고리 집계 {created}건 재생성 완료"))
+
+        created = MonthlyDayActivity.rebuild(store_ids=options["stores"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ 달력 비트맵 {created}건 재생성 완료"))
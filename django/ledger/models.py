@@ -1,5 +1,7 @@
 import uuid
-from django.db import models
+from django.db import models, transaction as db_transaction, IntegrityError
+from django.db.models import F, Q, Sum, Count
+from django.db.models.functions import ExtractYear, ExtractMonth
 from users.models import CustomUser
 from django.utils.timezone import now
 from store.models import Store 
@@ -14,9 +16,9 @@ class Category(models.Model):
 
     @classmethod
     def get_default_category(cls):
-        """ ✅ 기본 '미분류' 카테고리 가져오기 (없으면 생성) """
-        category, created = cls.objects.get_or_create(name="미분류")
-        return category.id
+        """ ✅ 기본 '미분류' 카테고리 가져오기 (없으면 생성, 이름 → id 캐시 사용) """
+        from ledger.utils import resolve_category_id  # 🔹 순환 import 방지
+        return resolve_category_id("미분류")
 
 
 # ✅ 2️⃣ 가계부 거래 내역 모델
@@ -45,10 +47,251 @@ class Transaction(models.Model):
     date = models.DateField()
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "ledger_transaction"  # ✅ 테이블을 ledger_transaction으로 변경
+        indexes = [
+            models.Index(fields=["store", "date", "transaction_type"], name="ledger_tx_store_date_type_idx"),  # 달력/월별 조회
+            models.Index(fields=["store", "created_at"], name="ledger_tx_store_created_idx"),  # 목록 정렬/cursor
+            models.Index(
+                fields=["store", "date"],
+                condition=Q(transaction_type="income"),
+                name="ledger_tx_income_idx",  # 매출 분석(salesforecast) 데이터 로딩
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.email}'s {self.transaction_type} on {self.date} for {self.amount}"
 
+    def save(self, *args, **kwargs):
+        """ ✅ 월별 집계(signals.py) 갱신이 같은 DB 트랜잭션 안에서 처리되도록 atomic 적용 """
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+# ✅ 3️⃣ 월별 카테고리 집계 (가게, 연, 월, 수입/지출, 카테고리 단위 롤업)
+class MonthlyCategorySummary(models.Model):
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="ledger_monthly_summaries")
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    transaction_type = models.CharField(max_length=7, choices=Transaction.TRANSACTION_TYPES)
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,  # 🔥 삭제 전에 signals.py 에서 '카테고리 없음' 행으로 합산됨
+        null=True,
+        blank=True,
+        related_name="monthly_summaries"
+    )
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "ledger_monthly_category_summary"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["store", "year", "month", "transaction_type", "category"],
+                condition=Q(category__isnull=False),
+                name="uniq_ledger_summary_category",
+            ),
+            models.UniqueConstraint(
+                fields=["store", "year", "month", "transaction_type"],
+                condition=Q(category__isnull=True),
+                name="uniq_ledger_summary_no_category",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.store_id} {self.year}-{self.month} {self.transaction_type} {self.category_id}: {self.total_amount}"
+
+    @classmethod
+    def apply_delta(cls, store_id, year, month, transaction_type, category_id, amount, count):
+        """ ✅ 집계 행에 금액/건수 변화량 반영 (행이 없으면 생성) """
+        lookup = {
+            "store_id": store_id,
+            "year": year,
+            "month": month,
+            "transaction_type": transaction_type,
+            "category_id": category_id,
+        }
+        changes = {
+            "total_amount": F("total_amount") + amount,
+            "transaction_count": F("transaction_count") + count,
+        }
+
+        if not cls.objects.filter(**lookup).update(**changes):
+            try:
+                with db_transaction.atomic():
+                    cls.objects.create(**lookup, total_amount=amount, transaction_count=count)
+            except IntegrityError:
+                # 🔥 동시에 같은 행이 생성된 경우 다시 update
+                cls.objects.filter(**lookup).update(**changes)
+
+        if count < 0:
+            # ✅ 거래가 모두 사라진 행은 제거해서 O(카테고리) 크기를 유지
+            cls.objects.filter(**lookup, transaction_count__lte=0).delete()
+
+    @classmethod
+    def get_month_chart(cls, store, year, month, limit=5):
+        """ ✅ 특정 월의 수입/지출 총합 + 상위 카테고리 (집계 행 O(카테고리) 개만 조회) """
+        rows = cls.objects.filter(store=store, year=year, month=month).values(
+            "transaction_type", "category__name"
+        ).annotate(total=Sum("total_amount"))
+
+        by_type = {"income": [], "expense": []}
+        for row in rows:
+            by_type.setdefault(row["transaction_type"], []).append(row)
+
+        categories = []
+        for transaction_type in ("income", "expense"):
+            top_rows = sorted(by_type[transaction_type], key=lambda r: r["total"], reverse=True)[:limit]
+            categories += [
+                {
+                    "type": transaction_type,
+                    "category": r["category__name"] if r["category__name"] else "미분류",
+                    "cost": float(r["total"])
+                }
+                for r in top_rows
+            ]
+
+        return {
+            "totalIncome": sum(r["total"] for r in by_type["income"]) or 0,
+            "totalExpense": sum(r["total"] for r in by_type["expense"]) or 0,
+            "categories": categories,
+        }
+
+    @classmethod
+    def rebuild(cls, store_ids=None, batch_size=1000):
+        """ ✅ 원본 거래 내역으로부터 집계 테이블 전체(또는 특정 가게) 재생성 """
+        transactions = Transaction.objects.all()
+        summaries = cls.objects.all()
+        if store_ids is not None:
+            transactions = transactions.filter(store_id__in=store_ids)
+            summaries = summaries.filter(store_id__in=store_ids)
+
+        rows = transactions.annotate(
+            year=ExtractYear("date"), month=ExtractMonth("date")
+        ).values("store_id", "year", "month", "transaction_type", "category_id").annotate(
+            total=Sum("amount"), count=Count("id")
+        ).order_by()
+
+        with db_transaction.atomic():
+            summaries.delete()
+            created = cls.objects.bulk_create(
+                (
+                    cls(
+                        store_id=row["store_id"],
+                        year=row["year"],
+                        month=row["month"],
+                        transaction_type=row["transaction_type"],
+                        category_id=row["category_id"],
+                        total_amount=row["total"] or 0,
+                        transaction_count=row["count"],
+                    )
+                    for row in rows.iterator()
+                ),
+                batch_size=batch_size,
+            )
+
+        return len(created)
+
+
+
+# ✅ 4️⃣ 월별 거래 발생일 비트맵 (달력 화면의 수입/지출 표시용)
+class MonthlyDayActivity(models.Model):
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="ledger_day_activities")
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    income_days = models.IntegerField(default=0)  # 🔹 n일에 수입이 있으면 (n-1)번째 비트 = 1
+    expense_days = models.IntegerField(default=0)  # 🔹 n일에 지출이 있으면 (n-1)번째 비트 = 1
+
+    class Meta:
+        db_table = "ledger_monthly_day_activity"
+        constraints = [
+            models.UniqueConstraint(fields=["store", "year", "month"], name="uniq_ledger_day_activity"),
+        ]
+
+    def __str__(self):
+        return f"{self.store_id} {self.year}-{self.month}"
+
+    @staticmethod
+    def _mask_field(transaction_type):
+        return "income_days" if transaction_type == "income" else "expense_days"
+
+    @classmethod
+    def mark_day(cls, store_id, date, transaction_type):
+        """ ✅ 해당 날짜의 수입/지출 비트 켜기 (행이 없으면 생성) """
+        cls.mark_days(store_id, date.year, date.month, transaction_type, 1 << (date.day - 1))
+
+    @classmethod
+    def mark_days(cls, store_id, year, month, transaction_type, mask):
+        """ ✅ 한 달치 여러 날짜의 비트를 한 번에 켜기 (일괄 등록용) """
+        field = cls._mask_field(transaction_type)
+        lookup = {"store_id": store_id, "year": year, "month": month}
+
+        if not cls.objects.filter(**lookup).update(**{field: F(field).bitor(mask)}):
+            try:
+                with db_transaction.atomic():
+                    cls.objects.create(**lookup, **{field: mask})
+            except IntegrityError:
+                # 🔥 동시에 같은 행이 생성된 경우 다시 update
+                cls.objects.filter(**lookup).update(**{field: F(field).bitor(mask)})
+
+    @classmethod
+    def unmark_day_if_empty(cls, store_id, date, transaction_type):
+        """ ✅ 해당 날짜에 같은 종류의 거래가 더 이상 없으면 비트 끄기 """
+        if Transaction.objects.filter(store_id=store_id, date=date, transaction_type=transaction_type).exists():
+            return
+
+        field = cls._mask_field(transaction_type)
+        bit = 1 << (date.day - 1)
+        cls.objects.filter(store_id=store_id, year=date.year, month=date.month).update(
+            **{field: F(field).bitand(~bit)}
+        )
+
+    @classmethod
+    def get_days(cls, store, year, month):
+        """ ✅ 비트맵 1행을 달력 `days` 리스트로 변환 """
+        activity = cls.objects.filter(store=store, year=year, month=month).values(
+            "income_days", "expense_days"
+        ).first()
+        if not activity:
+            return []
+
+        income_days, expense_days = activity["income_days"], activity["expense_days"]
+        return [
+            {
+                "day": day,
+                "hasIncome": bool(income_days >> (day - 1) & 1),
+                "hasExpense": bool(expense_days >> (day - 1) & 1),
+            }
+            for day in range(1, 32)
+            if (income_days | expense_days) >> (day - 1) & 1
+        ]
+
+    @classmethod
+    def rebuild(cls, store_ids=None, batch_size=1000):
+        """ ✅ 원본 거래 내역으로부터 비트맵 전체(또는 특정 가게) 재생성 """
+        transactions = Transaction.objects.all()
+        activities = cls.objects.all()
+        if store_ids is not None:
+            transactions = transactions.filter(store_id__in=store_ids)
+            activities = activities.filter(store_id__in=store_ids)
+
+        masks = {}
+        days = transactions.values_list("store_id", "date", "transaction_type").distinct().order_by()
+        for store_id, date, transaction_type in days.iterator():
+            mask = masks.setdefault((store_id, date.year, date.month), {"income_days": 0, "expense_days": 0})
+            mask[cls._mask_field(transaction_type)] |= 1 << (date.day - 1)
+
+        with db_transaction.atomic():
+            activities.delete()
+            created = cls.objects.bulk_create(
+                [
+                    cls(store_id=store_id, year=year, month=month, **mask)
+                    for (store_id, year, month), mask in masks.items()
+                ],
+                batch_size=batch_size,
+            )
+
+        return len(created)
@@ -0,0 +1,194 @@
+# ledger/search.py
+
+from django.db import connections, connection, DEFAULT_DB_ALIAS
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from ledger.models import Category, Transaction
+
+MIN_TRIGRAM_LENGTH = 3  # 🔹 트라이그램 인덱스는 3글자 미만 검색어를 쓸 수 없음
+MAX_SEARCH_TERMS = 10
+
+SQLITE_FTS_TABLE = "ledger_transaction_fts"
+SQLITE_FTS_TRIGGERS = ("ledger_tx_fts_ai", "ledger_tx_fts_ad", "ledger_tx_fts_au", "ledger_category_fts_au")
+POSTGRES_TRGM_INDEX = "ledger_tx_description_trgm_idx"
+
+
+def _sqlite_setup_sql():
+    """ ✅ FTS5 shadow 테이블 + 원본 테이블 변경을 따라가는 트리거 (bulk_create / raw DELETE 도 반영됨) """
+    tx_table = Transaction._meta.db_table
+    category_table = Category._meta.db_table
+    category_name = f"COALESCE((SELECT name FROM {category_table} WHERE id = new.category_id), '')"
+    insert_row = (
+        f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, description, category) "
+        f"VALUES (new.rowid, COALESCE(new.description, ''), {category_name});"
+    )
+    delete_row = f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = old.rowid;"
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(description, category, tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS ledger_tx_fts_ai AFTER INSERT ON {tx_table} BEGIN {insert_row} END",
+        f"CREATE TRIGGER IF NOT EXISTS ledger_tx_fts_ad AFTER DELETE ON {tx_table} BEGIN {delete_row} END",
+        f"CREATE TRIGGER IF NOT EXISTS ledger_tx_fts_au AFTER UPDATE OF description, category_id ON {tx_table} "
+        f"BEGIN {delete_row} {insert_row} END",
+        f"CREATE TRIGGER IF NOT EXISTS ledger_category_fts_au AFTER UPDATE OF name ON {category_table} BEGIN "
+        f"UPDATE {SQLITE_FTS_TABLE} SET category = new.name "
+        f"WHERE rowid IN (SELECT rowid FROM {tx_table} WHERE category_id = new.id); END",
+    ]
+
+
+def _sqlite_rebuild(cursor):
+    """ ✅ shadow 테이블 내용을 원본 거래 내역으로 다시 채움 """
+    cursor.execute(f"DELETE FROM {SQLITE_FTS_TABLE}")
+    cursor.execute(
+        f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, description, category) "
+        f"SELECT t.rowid, COALESCE(t.description, ''), COALESCE(c.name, '') "
+        f"FROM {Transaction._meta.db_table} t LEFT JOIN {Category._meta.db_table} c ON c.id = t.category_id"
+    )
+
+
+def install_search_index(using=DEFAULT_DB_ALIAS, rebuild=False):
+    """
+    검색 인덱스 생성 (post_migrate 에서 호출, 이미 있으면 아무것도 하지 않음).
+    - PostgreSQL: pg_trgm + UPPER(description) GIN 인덱스 (icontains 가 UPPER(..) LIKE 로 변환되기 때문)
+    - SQLite: FTS5 trigram shadow 테이블 + 트리거
+    SQLite 는 migrate 의 테이블 재생성(ALTER) 시 트리거가 사라지므로 그때 내용까지 다시 채운다.
+    """
+    conn = connections[using]
+
+    with conn.cursor() as cursor:
+        if conn.vendor == "postgresql":
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {POSTGRES_TRGM_INDEX} ON {Transaction._meta.db_table} "
+                f"USING gin (UPPER(description::text) gin_trgm_ops)"
+            )
+            return True
+
+        if conn.vendor == "sqlite":
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s)" % ", ".join(["%s"] * (len(SQLITE_FTS_TRIGGERS) + 1)),
+                [SQLITE_FTS_TABLE, *SQLITE_FTS_TRIGGERS],
+            )
+            installed = cursor.fetchone()[0] == len(SQLITE_FTS_TRIGGERS) + 1
+            if installed and not rebuild:
+                return True
+
+            for sql in _sqlite_setup_sql():
+                cursor.execute(sql)
+            _sqlite_rebuild(cursor)
+            return True
+
+    return False  # 🔹 그 외 DB 는 인덱스 없이 부분 문자열 검색
+
+
+def search_terms(query):
+    """ ✅ 공백 기준 검색어 목록 (중복 제거, 최대 MAX_SEARCH_TERMS 개) """
+    terms = []
+    for term in (query or "").split():
+        if term.lower() not in (t.lower() for t in terms):
+            terms.append(term)
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def _base_queryset(store, start=None, end=None):
+    transactions = Transaction.objects.filter(store=store)
+    if start:
+        transactions = transactions.filter(date__gte=start)
+    if end:
+        transactions = transactions.filter(date__lte=end)
+    return transactions
+
+
+def _term_filters(transactions, terms):
+    """ ✅ 모든 검색어가 내용 또는 카테고리 이름에 포함 (카테고리는 id 목록으로 먼저 변환해 JOIN 없이 OR) """
+    for term in terms:
+        category_ids = list(Category.objects.filter(name__icontains=term).values_list("id", flat=True))
+        transactions = transactions.filter(Q(description__icontains=term) | Q(category_id__in=category_ids))
+    return transactions
+
+
+def _search_substring(store, terms, start, end, limit, offset):
+    """ ✅ 인덱스를 쓸 수 없는 짧은 검색어 / 기타 DB: 부분 문자열 일치, 최신순 """
+    transactions = _term_filters(_base_queryset(store, start, end), terms)
+    transactions = transactions.select_related("category").order_by("-date", "-created_at", "id")
+    results = list(transactions[offset:offset + limit])
+    for transaction in results:
+        transaction.search_rank = None
+    return results
+
+
+def _search_postgres(store, terms, start, end, limit, offset):
+    """ ✅ pg_trgm GIN 인덱스로 후보를 찾고 word_similarity 로 정렬 """
+    from django.contrib.postgres.search import TrigramWordSimilarity  # 🔹 psycopg 가 있는 PostgreSQL 에서만 import
+
+    query = " ".join(terms)
+    transactions = _term_filters(_base_queryset(store, start, end), terms).annotate(
+        search_rank=Greatest(
+            Coalesce(TrigramWordSimilarity(query, "description"), Value(0.0), output_field=FloatField()),
+            Coalesce(TrigramWordSimilarity(query, "category__name"), Value(0.0), output_field=FloatField()),
+        )
+    )
+    transactions = transactions.select_related("category").order_by("-search_rank", "-date", "id")
+    return list(transactions[offset:offset + limit])
+
+
+def _search_sqlite(store, terms, start, end, limit, offset):
+    """ ✅ FTS5 trigram MATCH + bm25 정렬 후 해당 페이지의 거래 내역만 조회 """
+    tx_table = Transaction._meta.db_table
+    match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)  # 🔹 각 검색어를 구문으로 (AND)
+
+    sql = (
+        f"SELECT t.id, bm25({SQLITE_FTS_TABLE}) AS rank FROM {SQLITE_FTS_TABLE} "
+        f"JOIN {tx_table} t ON t.rowid = {SQLITE_FTS_TABLE}.rowid "
+        f"WHERE {SQLITE_FTS_TABLE} MATCH %s AND t.store_id = %s"
+    )
+    params = [match, Transaction._meta.get_field("store").get_db_prep_value(store.pk, connection)]
+    if start:
+        sql += " AND t.date >= %s"
+        params.append(connection.ops.adapt_datefield_value(start))
+    if end:
+        sql += " AND t.date <= %s"
+        params.append(connection.ops.adapt_datefield_value(end))
+    sql += " ORDER BY rank, t.date DESC, t.id LIMIT %s OFFSET %s"
+    params += [limit, offset]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        ranked = cursor.fetchall()
+
+    pk_field = Transaction._meta.pk
+    ids = [pk_field.to_python(row[0]) for row in ranked]
+    objects = Transaction.objects.select_related("category").in_bulk(ids)
+
+    results = []
+    for pk, (_, rank) in zip(ids, ranked):
+        transaction = objects.get(pk)
+        if transaction:
+            transaction.search_rank = -rank  # 🔹 bm25 는 낮을수록 관련도가 높음 → 부호 반전
+            results.append(transaction)
+    return results
+
+
+def _sqlite_index_ready():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [SQLITE_FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def search_transactions(store, query, start=None, end=None, limit=50, offset=0):
+    """
+    가게의 거래 내역을 내용(description) / 카테고리 이름으로 검색.
+    공백으로 나눈 검색어가 모두 포함된 거래를 관련도 순으로 반환 (각 객체에 search_rank 속성).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    args = (store, terms, start, end, limit, offset)
+    if all(len(term) >= MIN_TRIGRAM_LENGTH for term in terms):
+        if connection.vendor == "postgresql":
+            return _search_postgres(*args)
+        if connection.vendor == "sqlite" and _sqlite_index_ready():
+            return _search_sqlite(*args)
+
+    return _search_substring(*args)
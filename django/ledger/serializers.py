@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.shortcuts import get_object_or_404
 from store.models import Store
 from ledger.models import Transaction, Category
+from ledger.utils import resolve_category
 from datetime import datetime
 from rest_framework.exceptions import ValidationError
 
@@ -35,8 +36,7 @@ class TransactionSerializer(serializers.ModelSerializer):
         if isinstance(value, int) or str(value).isdigit():  
             return get_object_or_404(Category, id=int(value))  # ✅ ID로 변환
 
-        category, _ = Category.objects.get_or_create(name=value)  # ✅ 이름으로 변환
-        return category  
+        return resolve_category(value)  # ✅ 이름으로 변환 (캐시 적중 시 쿼리 없음)
 
     def create(self, validated_data):
         store_id = validated_data.pop("store_id")
@@ -81,3 +81,12 @@ class TransactionSerializer(serializers.ModelSerializer):
 
         return super().update(instance, validated_data)
     
+
+
+class TransactionSearchSerializer(TransactionSerializer):
+    """ ✅ 검색 결과용 (여러 달에 걸쳐 있으므로 날짜와 관련도 점수 포함) """
+    date = serializers.DateField(read_only=True)
+    score = serializers.FloatField(source="search_rank", read_only=True, allow_null=True)
+
+    class Meta(TransactionSerializer.Meta):
+        fields = TransactionSerializer.Meta.fields + ["date", "score"]
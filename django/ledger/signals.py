@@ -0,0 +1,90 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from ledger.models import Category, Transaction, MonthlyCategorySummary, MonthlyDayActivity
+from ledger.utils import category_cache
+
+
+def _summary_key(values):
+    """ ✅ 거래 내역 → 월별 집계 키 (store_id, year, month, transaction_type, category_id) """
+    return (
+        values["store_id"],
+        values["date"].year,
+        values["date"].month,
+        values["transaction_type"],
+        values["category_id"],
+    )
+
+
+def _day_key(values):
+    """ ✅ 거래 내역 → 달력 비트 키 (store_id, date, transaction_type) """
+    return (values["store_id"], values["date"], values["transaction_type"])
+
+
+def _ledger_values(instance):
+    return {
+        "store_id": instance.store_id,
+        "date": instance.date,
+        "transaction_type": instance.transaction_type,
+        "category_id": instance.category_id,
+        "amount": instance.amount,
+    }
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_transaction(sender, instance, raw=False, **kwargs):
+    """ ✅ 수정 전 값을 보관해두고 post_save 에서 차이만큼 집계 반영 """
+    if raw or instance._state.adding:
+        instance._ledger_previous = None
+        return
+
+    instance._ledger_previous = Transaction.objects.filter(pk=instance.pk).values(
+        "store_id", "date", "transaction_type", "category_id", "amount"
+    ).first()
+
+
+@receiver(post_save, sender=Transaction)
+def update_summary_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = getattr(instance, "_ledger_previous", None)
+    current = _ledger_values(instance)
+
+    if previous:
+        MonthlyCategorySummary.apply_delta(*_summary_key(previous), -previous["amount"], -1)
+    MonthlyCategorySummary.apply_delta(*_summary_key(current), current["amount"], 1)
+
+    MonthlyDayActivity.mark_day(current["store_id"], current["date"], current["transaction_type"])
+    if previous and _day_key(previous) != _day_key(current):
+        MonthlyDayActivity.unmark_day_if_empty(previous["store_id"], previous["date"], previous["transaction_type"])
+
+    instance._ledger_previous = None
+
+
+@receiver(post_delete, sender=Transaction)
+def update_summary_on_delete(sender, instance, origin=None, **kwargs):
+    # 🔥 가게/사용자 삭제로 인한 CASCADE 라면 집계 행도 함께 삭제되므로 건너뜀
+    if not (isinstance(origin, Transaction) or getattr(origin, "model", None) is Transaction):
+        return
+
+    values = _ledger_values(instance)
+    MonthlyCategorySummary.apply_delta(*_summary_key(values), -values["amount"], -1)
+    MonthlyDayActivity.unmark_day_if_empty(values["store_id"], values["date"], values["transaction_type"])
+
+
+@receiver(pre_delete, sender=Category)
+def merge_summary_on_category_delete(sender, instance, **kwargs):
+    """ ✅ 카테고리 삭제 시 거래 내역은 SET_NULL 되므로 집계도 '카테고리 없음' 행으로 합산 """
+    summaries = MonthlyCategorySummary.objects.filter(category=instance)
+    for summary in summaries:
+        MonthlyCategorySummary.apply_delta(
+            summary.store_id, summary.year, summary.month, summary.transaction_type,
+            None, summary.total_amount, summary.transaction_count,
+        )
+    summaries.delete()
+
+
+@receiver([post_save, post_delete], sender=Category)
+def clear_category_cache(sender, instance, **kwargs):
+    """ ✅ 카테고리 생성/이름 변경/삭제 시 이름 → id 캐시 비우기 (다른 워커는 버전 카운터로 감지) """
+    category_cache.clear()
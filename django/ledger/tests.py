@@ -1,3 +1,554 @@
+import csv
+import io
+import json
+import os
+from datetime import date, timedelta
+from django.db import connection
 from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import CustomUser
+from store.models import Store
+from ledger.models import Category, Transaction, MonthlyCategorySummary, MonthlyDayActivity
+from ledger.exporter import EXPORT_COLUMNS
+from ledger.importer import import_transactions
+from ledger.utils import CategoryCache, category_cache, date_filter, get_running_balance, resolve_category_id
+from store.cache import bump_version, LEDGER_CATEGORY_VERSION
 
-# Create your tests here.
+
+class LedgerTestCase(TestCase):
+    """ ✅ 사용자 / 가게 / 인증된 API 클라이언트 준비 """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="owner@test.com", password="password")
+        self.store = Store.objects.create(user=self.user, name="테스트 가게")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class ImportTransactionsTests(LedgerTestCase):
+    """ ✅ 거래 내역 일괄 등록의 중복 처리 """
+
+    ROW = {"date": "2025-03-01", "type": "expense", "category": "식자재", "detail": "우유", "cost": "3000"}
+
+    def test_identical_rows_in_one_file_are_kept(self):
+        result = import_transactions(self.user, self.store, [dict(self.ROW), dict(self.ROW)])
+
+        self.assertEqual((result["created"], result["duplicates"]), (2, []))
+        self.assertEqual(Transaction.objects.filter(store=self.store).count(), 2)
+
+    def test_reupload_only_adds_missing_count(self):
+        import_transactions(self.user, self.store, [dict(self.ROW)])
+
+        result = import_transactions(self.user, self.store, [dict(self.ROW), dict(self.ROW), dict(self.ROW)])
+
+        self.assertEqual((result["created"], result["duplicates"]), (2, [1]))
+        self.assertEqual(Transaction.objects.filter(store=self.store, date=date(2025, 3, 1)).count(), 3)
+
+
+class TransactionIndexTests(LedgerTestCase):
+    """ ✅ 월별 / 매출 조회가 복합 인덱스를 타는지 (EXPLAIN) """
+
+    def explain(self, queryset):
+        if connection.vendor == "postgresql":
+            # 🔹 테스트 DB 는 행이 적어서 seq scan 을 고르므로 인덱스 사용 가능 여부만 확인
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_month_query_uses_store_date_index(self):
+        plan = self.explain(Transaction.objects.filter(store=self.store, **date_filter(2025, 3)))
+        self.assertIn("ledger_tx_store_date_type_idx", plan)
+
+    def test_income_query_uses_partial_index(self):
+        plan = self.explain(
+            Transaction.objects.filter(store=self.store, transaction_type="income", **date_filter(2025, 3))
+        )
+        self.assertIn("ledger_tx_income_idx", plan)
+
+
+class TransactionExportTests(LedgerTestCase):
+    """
+    ✅ 거래 내역 스트리밍 내보내기 (CSV / NDJSON)
+    행 수는 LEDGER_EXPORT_TEST_ROWS 로 조절 (기본값은 CI 용으로 작게, 로컬에서 대용량 확인 시 늘림)
+    """
+
+    ROWS = int(os.environ.get("LEDGER_EXPORT_TEST_ROWS", 5000))
+    START = date(2025, 1, 1)
+
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name="식자재")
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user,
+                store=self.store,
+                category=category,
+                transaction_type="income" if index % 2 else "expense",
+                amount=index % 1000 + 1,
+                date=self.START + timedelta(days=index % 365),
+                description=f"거래 {index}",
+            )
+            for index in range(self.ROWS)
+        ], batch_size=1000)
+
+    def export(self, file_format, **params):
+        response = self.client.get(
+            f"/api/ledger/{self.store.id}/transactions/export/", {"file_format": file_format, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_csv_export(self):
+        reader = csv.reader(io.StringIO(self.export("csv").lstrip("\ufeff")))
+
+        self.assertEqual(tuple(next(reader)), EXPORT_COLUMNS)
+        self.assertEqual(sum(1 for _ in reader), self.ROWS)
+
+    def test_ndjson_export(self):
+        rows = [json.loads(line) for line in self.export("ndjson").splitlines()]
+
+        self.assertEqual(len(rows), self.ROWS)
+        self.assertEqual(tuple(rows[0]), EXPORT_COLUMNS)
+        self.assertEqual(rows[0]["date"], self.START.isoformat())
+
+    def test_date_range_includes_end(self):
+        rows = self.export("ndjson", start="2025-01-01", end="2025-01-02").splitlines()
+
+        expected = Transaction.objects.filter(store=self.store, date__lte=date(2025, 1, 2)).count()
+        self.assertEqual(len(rows), expected)
+
+
+class TransactionSearchTests(LedgerTestCase):
+    """ ✅ 거래 내역 검색 (관련도 순 / 짧은 검색어 / 특수 문자 / 기간 / cursor) """
+
+    def setUp(self):
+        super().setUp()
+        food = Category.objects.create(name="식자재")
+        self.latte = self.add(food, "바닐라 라떼 원두", date(2025, 1, 10))
+        self.milk = self.add(food, "바닐라 시럽 라떼용 우유", date(2025, 2, 10))
+        self.mocha = self.add(food, "카페 모카 시럽", date(2025, 3, 10))
+        self.quoted = self.add(food, 'NEAR(특가) "원두" 묶음', date(2025, 3, 20))
+
+    def add(self, category, description, day):
+        return Transaction.objects.create(
+            user=self.user, store=self.store, category=category,
+            transaction_type="expense", amount=1000, date=day, description=description,
+        )
+
+    def search(self, query, **params):
+        response = self.client.get(f"/api/ledger/{self.store.id}/transactions/search/", {"q": query, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def ids(self, data):
+        return [row["transaction_id"] for row in data["results"]]
+
+    def test_ranked_match(self):
+        data = self.search("바닐라")
+
+        self.assertCountEqual(self.ids(data), [str(self.latte.id), str(self.milk.id)])
+        self.assertTrue(all(row["score"] is not None for row in data["results"]))
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.ids(self.search("바닐라 원두")), [str(self.latte.id)])
+
+    def test_category_name_match(self):
+        self.assertEqual(len(self.search("식자재")["results"]), 4)
+
+    def test_short_query_falls_back_to_latest_first(self):
+        data = self.search("원두")
+
+        self.assertEqual(self.ids(data), [str(self.quoted.id), str(self.latte.id)])
+        self.assertTrue(all(row["score"] is None for row in data["results"]))
+
+    def test_punctuation_is_matched_literally(self):
+        self.assertEqual(self.ids(self.search('"원두"')), [str(self.quoted.id)])
+        self.assertEqual(self.ids(self.search("NEAR(특가)")), [str(self.quoted.id)])
+        self.assertEqual(self.ids(self.search('NEAR( "')), [str(self.quoted.id)])
+        self.assertEqual(self.search('바닐라" AND "카페')["results"], [])
+
+    def test_date_range(self):
+        data = self.search("바닐라", start="2025-02-01", end="2025-02-10")
+
+        self.assertEqual(self.ids(data), [str(self.milk.id)])
+
+    def test_cursor_paging(self):
+        first = self.search("식자재", limit=3)
+        self.assertEqual(len(first["results"]), 3)
+        self.assertIsNotNone(first["next_cursor"])
+
+        second = self.search("식자재", limit=3, cursor=first["next_cursor"])
+        self.assertEqual(len(second["results"]), 1)
+        self.assertIsNone(second["next_cursor"])
+        self.assertCountEqual(
+            self.ids(first) + self.ids(second),
+            [str(t.id) for t in (self.latte, self.milk, self.mocha, self.quoted)],
+        )
+
+
+class MonthlyDayActivityTests(LedgerTestCase):
+    """ ✅ 거래 생성 / 날짜 이동 / 삭제 시 달력 비트맵(get_days)이 거래 내역과 일치 """
+
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name="식자재")
+
+    def add(self, day, transaction_type="expense"):
+        return Transaction.objects.create(
+            user=self.user, store=self.store, category=self.category,
+            transaction_type=transaction_type, amount=1000, date=day,
+        )
+
+    def days(self, year=2025, month=3):
+        return MonthlyDayActivity.get_days(self.store, year, month)
+
+    def assertDaysMatchTransactions(self, year=2025, month=3):
+        expected = {}
+        for t in Transaction.objects.filter(store=self.store, date__year=year, date__month=month):
+            row = expected.setdefault(t.date.day, {"day": t.date.day, "hasIncome": False, "hasExpense": False})
+            row["hasIncome" if t.transaction_type == "income" else "hasExpense"] = True
+        self.assertEqual(self.days(year, month), [expected[day] for day in sorted(expected)])
+
+    def test_create_marks_day(self):
+        self.add(date(2025, 3, 1))
+        self.add(date(2025, 3, 31), "income")
+
+        self.assertEqual(self.days(), [
+            {"day": 1, "hasIncome": False, "hasExpense": True},
+            {"day": 31, "hasIncome": True, "hasExpense": False},
+        ])
+
+    def test_move_to_another_day(self):
+        moved = self.add(date(2025, 3, 5))
+        self.add(date(2025, 3, 7))
+
+        moved.date = date(2025, 3, 7)
+        moved.save()
+        self.assertDaysMatchTransactions()
+
+        moved.date = date(2025, 4, 2)
+        moved.save()
+        self.assertDaysMatchTransactions()
+        self.assertDaysMatchTransactions(month=4)
+
+    def test_delete_keeps_day_while_others_remain(self):
+        first = self.add(date(2025, 3, 10))
+        second = self.add(date(2025, 3, 10))
+        self.add(date(2025, 3, 10), "income")
+
+        first.delete()
+        self.assertDaysMatchTransactions()
+
+        second.delete()
+        self.assertEqual(self.days(), [{"day": 10, "hasIncome": True, "hasExpense": False}])
+
+    def test_bulk_mark_days(self):
+        MonthlyDayActivity.mark_days(self.store.id, 2025, 3, "income", (1 << 0) | (1 << 14))
+
+        self.assertEqual([row["day"] for row in self.days()], [1, 15])
+
+
+class PeriodReportTests(LedgerTestCase):
+    """ ✅ 기간 리포트 (일 / 주 / 월 / 년 구간, 월 경계를 넘는 주, 잘못된 파라미터) """
+
+    def setUp(self):
+        super().setUp()
+        self.food = Category.objects.create(name="식자재")
+        self.sales = Category.objects.create(name="매출")
+        self.add(self.food, "expense", 1000, date(2025, 3, 30))  # 🔹 일요일
+        self.add(self.sales, "income", 5000, date(2025, 3, 31))  # 🔹 월요일
+        self.add(self.food, "expense", 2000, date(2025, 4, 1))
+        self.add(self.food, "expense", 500, date(2025, 4, 6))  # 🔹 일요일
+        self.add(self.sales, "income", 7000, date(2026, 1, 2))
+
+    def add(self, category, transaction_type, amount, day):
+        return Transaction.objects.create(
+            user=self.user, store=self.store, category=category,
+            transaction_type=transaction_type, amount=amount, date=day,
+        )
+
+    def report(self, start, end, granularity):
+        response = self.client.get(
+            f"/api/ledger/{self.store.id}/report/", {"start": start, "end": end, "granularity": granularity}
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def totals(self, data):
+        return [(bucket["period"], bucket["income"], bucket["expense"]) for bucket in data["buckets"]]
+
+    def test_day(self):
+        data = self.report("2025-03-30", "2025-04-02", "day")
+
+        self.assertEqual(self.totals(data), [
+            ("2025-03-30", 0, 1000), ("2025-03-31", 5000, 0), ("2025-04-01", 0, 2000), ("2025-04-02", 0, 0),
+        ])
+        self.assertEqual((data["totalIncome"], data["totalExpense"]), (5000, 3000))
+
+    def test_week_crossing_month_boundary(self):
+        data = self.report("2025-03-30", "2025-04-06", "week")
+
+        self.assertEqual(self.totals(data), [("2025-03-24", 0, 1000), ("2025-03-31", 5000, 2500)])
+        self.assertEqual(data["buckets"][1]["categories"], [
+            {"type": "expense", "category": "식자재", "cost": 2500, "count": 2},
+            {"type": "income", "category": "매출", "cost": 5000, "count": 1},
+        ])
+
+    def test_month(self):
+        data = self.report("2025-03-01", "2025-05-31", "month")
+
+        self.assertEqual(self.totals(data), [("2025-03-01", 5000, 1000), ("2025-04-01", 0, 2500), ("2025-05-01", 0, 0)])
+
+    def test_year(self):
+        data = self.report("2025-01-01", "2026-12-31", "year")
+
+        self.assertEqual(self.totals(data), [("2025-01-01", 5000, 3500), ("2026-01-01", 7000, 0)])
+
+    def test_uncategorized_bucket(self):
+        self.add(None, "expense", 300, date(2025, 3, 30))
+
+        categories = self.report("2025-03-30", "2025-03-30", "day")["buckets"][0]["categories"]
+
+        self.assertIn({"type": "expense", "category": "미분류", "cost": 300, "count": 1}, categories)
+
+    def test_invalid_parameters(self):
+        url = f"/api/ledger/{self.store.id}/report/"
+        for params in (
+            {"start": "2025-01-01", "end": "2025-12-31", "granularity": "quarter"},
+            {"start": "2025-01-01", "end": "2025-13-01", "granularity": "month"},
+            {"end": "2025-12-31"},
+            {"start": "2025-12-31", "end": "2025-01-01"},
+            {"start": "2000-01-01", "end": "2025-12-31", "granularity": "day"},  # 🔹 구간 수 초과
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+
+class RunningBalanceTests(LedgerTestCase):
+    """ ✅ 일별 누적 잔액 (시작 잔액 + 이전 달 월별 집계에서 출발, 같은 날 거래 누적) """
+
+    def setUp(self):
+        super().setUp()
+        self.store.opening_balance = 100000
+        self.store.save()
+        self.category = Category.objects.create(name="식자재")
+        self.add("income", 20000, date(2025, 2, 10))  # 🔹 이전 달 (월별 집계로만 반영)
+        self.add("expense", 5000, date(2025, 2, 20))
+        self.add("expense", 1000, date(2025, 3, 1))  # 🔹 같은 달, 조회 시작일 이전
+        self.add("income", 3000, date(2025, 3, 5))
+        self.add("expense", 500, date(2025, 3, 5))
+        self.add("expense", 700, date(2025, 3, 5))
+        self.add("income", 2000, date(2025, 3, 7))
+
+    def add(self, transaction_type, amount, day):
+        return Transaction.objects.create(
+            user=self.user, store=self.store, category=self.category,
+            transaction_type=transaction_type, amount=amount, date=day,
+        )
+
+    def test_starts_from_opening_balance_and_previous_months(self):
+        data = get_running_balance(self.store, date(2025, 3, 3), date(2025, 3, 31))
+
+        self.assertEqual(data["openingBalance"], 100000 + 20000 - 5000 - 1000)
+        self.assertEqual(data["closingBalance"], 114000 + 3000 - 500 - 700 + 2000)
+
+    def test_previous_months_come_from_summary(self):
+        MonthlyCategorySummary.objects.filter(store=self.store, year=2025, month=2, transaction_type="income").update(
+            total_amount=30000
+        )  # 🔹 집계만 바꾸면 시작 잔액도 따라 바뀜 (과거 거래를 다시 읽지 않음)
+
+        data = get_running_balance(self.store, date(2025, 3, 1), date(2025, 3, 1))
+
+        self.assertEqual(data["openingBalance"], 100000 + 30000 - 5000)
+
+    def test_same_day_transactions_accumulate(self):
+        data = get_running_balance(self.store, date(2025, 3, 3), date(2025, 3, 31))
+
+        self.assertEqual(data["days"], [
+            {"date": "2025-03-05", "income": 3000, "expense": 1200, "net": 1800, "balance": 115800},
+            {"date": "2025-03-07", "income": 2000, "expense": 0, "net": 2000, "balance": 117800},
+        ])
+
+    def test_empty_period_keeps_opening_balance(self):
+        data = get_running_balance(self.store, date(2025, 4, 1), date(2025, 4, 30))
+
+        self.assertEqual(data["days"], [])
+        self.assertEqual(data["closingBalance"], data["openingBalance"])
+        self.assertEqual(data["openingBalance"], 117800)
+
+    def test_view(self):
+        url = f"/api/ledger/{self.store.id}/balance/"
+
+        response = self.client.get(url, {"start": "2025-03-01", "end": "2025-03-31"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), get_running_balance(self.store, date(2025, 3, 1), date(2025, 3, 31)))
+        self.assertEqual(response.json()["openingBalance"], 115000)
+        for params in ({"start": "2025-03-31", "end": "2025-03-01"}, {"start": "2025-03-01"}, {"start": "03/01", "end": "2025-03-31"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+
+
+class MonthlySummarySignalTests(LedgerTestCase):
+    """ ✅ 거래 생성 / 수정 / 삭제 후 월별 집계가 rebuild() 결과와 같은지 (카테고리 삭제 합산 포함) """
+
+    def setUp(self):
+        super().setUp()
+        self.food = Category.objects.create(name="식자재")
+        self.rent = Category.objects.create(name="임대료")
+        self.other_store = Store.objects.create(user=self.user, name="다른 가게")
+        self.transaction = self.add(self.store, self.food, "expense", 1000, date(2025, 3, 1))
+        self.add(self.store, self.food, "expense", 2000, date(2025, 3, 15))
+        self.add(self.store, self.rent, "expense", 50000, date(2025, 3, 25))
+        self.add(self.store, None, "income", 7000, date(2025, 4, 2))
+        self.add(self.other_store, self.food, "expense", 3000, date(2025, 3, 1))
+
+    def add(self, store, category, transaction_type, amount, day):
+        return Transaction.objects.create(
+            user=self.user, store=store, category=category,
+            transaction_type=transaction_type, amount=amount, date=day,
+        )
+
+    def summaries(self):
+        return sorted(
+            MonthlyCategorySummary.objects.values_list(
+                "store_id", "year", "month", "transaction_type", "category_id", "total_amount", "transaction_count"
+            ),
+            key=str,
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.summaries()
+        MonthlyCategorySummary.rebuild()
+        self.assertEqual(incremental, self.summaries())
+
+    def update(self, **changes):
+        for field, value in changes.items():
+            setattr(self.transaction, field, value)
+        self.transaction.save()
+
+    def test_create(self):
+        self.assertMatchesRebuild()
+
+    def test_update(self):
+        for changes in (
+            {"amount": 4500},
+            {"transaction_type": "income"},
+            {"category": self.rent},
+            {"category": None},
+            {"date": date(2025, 4, 30)},
+            {"date": date(2026, 1, 1), "category": self.food, "transaction_type": "expense", "amount": 10},
+        ):
+            with self.subTest(changes=changes):
+                self.update(**changes)
+                self.assertMatchesRebuild()
+
+    def test_moved_out_row_is_removed(self):
+        self.update(category=self.rent)
+
+        self.assertFalse(MonthlyCategorySummary.objects.filter(
+            store=self.store, year=2025, month=3, transaction_type="expense", category=self.food, transaction_count__lte=0
+        ).exists())
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        self.transaction.delete()
+        self.assertMatchesRebuild()
+
+        Transaction.objects.filter(store=self.store, date__month=3).delete()
+        self.assertMatchesRebuild()
+
+    def test_category_delete_merges_into_uncategorized(self):
+        self.add(self.store, None, "expense", 400, date(2025, 3, 3))  # 🔹 이미 있는 '카테고리 없음' 행에 합산
+
+        food_id = self.food.id
+        self.food.delete()
+
+        self.assertFalse(MonthlyCategorySummary.objects.filter(category_id=food_id).exists())
+        uncategorized = MonthlyCategorySummary.objects.get(
+            store=self.store, year=2025, month=3, transaction_type="expense", category=None
+        )
+        self.assertEqual((uncategorized.total_amount, uncategorized.transaction_count), (3400, 3))
+        self.assertMatchesRebuild()
+
+
+class CategoryCacheTests(TestCase):
+    """ ✅ 카테고리 이름 → id 캐시: 첫 조회는 쿼리 1번, 이후 캐시 / 이름 변경·삭제 시 비움 """
+
+    def setUp(self):
+        category_cache.clear()
+        self.addCleanup(category_cache.clear)
+        self.category = Category.objects.create(name="식자재")
+
+    def resolve(self, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            return resolve_category_id(name)
+
+    def test_name_resolves_with_one_query_then_from_cache(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.resolve("식자재"), self.category.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolve("식자재"), self.category.id)
+
+    def test_missing_name_is_created_once(self):
+        category_id = self.resolve("소모품")
+
+        self.assertEqual(Category.objects.get(name="소모품").id, category_id)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolve("소모품"), category_id)
+
+    def test_rolled_back_lookup_is_not_cached(self):
+        try:
+            with self.captureOnCommitCallbacks(execute=False):
+                resolve_category_id("소모품")
+                raise RuntimeError  # 🔹 on_commit 콜백이 실행되지 않음 (롤백)
+        except RuntimeError:
+            pass
+
+        self.assertIsNone(category_cache.get("소모품"))
+
+    def test_rename_clears_cache(self):
+        self.resolve("식자재")
+
+        self.category.name = "원재료"
+        self.category.save()
+
+        self.assertIsNone(category_cache.get("식자재"))
+        self.assertEqual(self.resolve("원재료"), self.category.id)
+        self.assertNotEqual(self.resolve("식자재"), self.category.id)  # 🔹 예전 이름은 새 카테고리로 생성
+
+    def test_delete_clears_cache(self):
+        category_id = self.resolve("식자재")
+
+        self.category.delete()
+
+        self.assertIsNone(category_cache.get("식자재"))
+        self.assertNotEqual(self.resolve("식자재"), category_id)
+
+    def test_other_worker_change_clears_cache_via_version(self):
+        cache = CategoryCache(check_interval=0)  # 🔹 다른 워커의 프로세스 캐시
+        cache.get("식자재")  # 🔹 현재 버전 기록
+        cache.set("식자재", self.category.id)
+
+        bump_version(LEDGER_CATEGORY_VERSION)
+
+        self.assertIsNone(cache.get("식자재"))
+
+    def test_size_limit_evicts_least_recently_used(self):
+        cache = CategoryCache(max_size=2)
+        cache.get("a")  # 🔹 첫 조회의 버전 확인(clear)을 먼저 끝내둠
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+    def test_expired_entry_is_dropped(self):
+        cache = CategoryCache(ttl=-1)
+        cache.set("a", 1)
+
+        self.assertIsNone(cache.get("a"))
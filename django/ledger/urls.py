@@ -1,18 +1,26 @@
 from django.urls import path
 from .views import (
-    LedgerTransactionListCreateView, LedgerTransactionDetailView,
+    LedgerTransactionListCreateView, LedgerTransactionDetailView, LedgerTransactionImportView,
+    LedgerTransactionExportView, LedgerTransactionSearchView,
     CategoryListCreateView, CategoryDetailView,
-    LedgerCalendarView
+    LedgerCalendarView, LedgerReportView, LedgerBalanceView
 )
 
 urlpatterns = [
     # 🔹 거래 내역 관련 API
     path('<uuid:store_id>/transactions/', LedgerTransactionListCreateView.as_view(), name='ledger-transaction-list-create'),
+    path('<uuid:store_id>/transactions/import/', LedgerTransactionImportView.as_view(), name='ledger-transaction-import'),
+    path('<uuid:store_id>/transactions/export/', LedgerTransactionExportView.as_view(), name='ledger-transaction-export'),
+    path('<uuid:store_id>/transactions/search/', LedgerTransactionSearchView.as_view(), name='ledger-transaction-search'),
     path('<uuid:store_id>/transactions/<uuid:transaction_id>/', LedgerTransactionDetailView.as_view(), name='ledger-transaction-detail'),
 
     # 🔹 캘린더 및 일별 거래 조회 API
     path('<uuid:store_id>/calendar/', LedgerCalendarView.as_view(), name='ledger-calendar'),
 
+    # 🔹 기간 리포트 / 누적 잔액 API
+    path('<uuid:store_id>/report/', LedgerReportView.as_view(), name='ledger-report'),
+    path('<uuid:store_id>/balance/', LedgerBalanceView.as_view(), name='ledger-balance'),
+
     # 🔹 카테고리 관련 API
     path('categories/', CategoryListCreateView.as_view(), name='category-list-create'),
     path('categories/<uuid:category_id>/', CategoryDetailView.as_view(), name='category-detail'),
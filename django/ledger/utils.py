@@ -0,0 +1,281 @@
+# ledger/utils.py
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from django.conf import settings
+from django.db import connection, transaction as db_transaction, IntegrityError
+from django.db.models import Case, Count, DateField, DecimalField, F, Q, Sum, Value, When, Window
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
+from redis.exceptions import RedisError
+from ledger.models import Category, Transaction, MonthlyCategorySummary
+from store.cache import get_versions, LEDGER_CATEGORY_VERSION
+
+
+def month_range(year, month):
+    """ ✅ 해당 월의 반개구간 [1일, 다음 달 1일) """
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def date_filter(year, month, day=None):
+    """
+    연/월(/일) 조회 조건을 date 컬럼에 대한 범위 조건으로 변환.
+    date__year / date__month 는 EXTRACT() 로 바뀌어 (store, date) 인덱스를 못 타기 때문.
+    잘못된 날짜면 ValueError 발생.
+    """
+    if day:
+        return {"date": date(year, month, day)}
+
+    start, end = month_range(year, month)
+    return {"date__gte": start, "date__lt": end}
+
+
+REPORT_TRUNCS = {
+    "day": TruncDay,
+    "week": TruncWeek,  # 🔹 월요일 시작 (Postgres / SQLite 동일)
+    "month": TruncMonth,
+    "year": TruncYear,
+}
+MAX_REPORT_BUCKETS = 5000
+
+
+def period_start(value, granularity):
+    """ ✅ 날짜 → 해당 구간의 시작일 (DB 의 Trunc 결과와 동일) """
+    if granularity == "week":
+        return value - timedelta(days=value.weekday())
+    if granularity == "month":
+        return value.replace(day=1)
+    if granularity == "year":
+        return value.replace(month=1, day=1)
+    return value
+
+
+def next_period(value, granularity):
+    if granularity == "week":
+        return value + timedelta(days=7)
+    if granularity == "month":
+        return date(value.year + 1, 1, 1) if value.month == 12 else date(value.year, value.month + 1, 1)
+    if granularity == "year":
+        return date(value.year + 1, 1, 1)
+    return value + timedelta(days=1)
+
+
+def period_starts(start, end, granularity):
+    """ ✅ [start, end] 를 덮는 구간 시작일 목록 (거래가 없는 구간도 0 으로 채우기 위함) """
+    periods = []
+    current = period_start(start, granularity)
+    while current <= end:
+        periods.append(current)
+        if len(periods) > MAX_REPORT_BUCKETS:
+            raise ValueError(f"구간 수가 너무 많습니다. (최대 {MAX_REPORT_BUCKETS}개)")
+        current = next_period(current, granularity)
+    return periods
+
+
+def get_period_report(store, start, end, granularity):
+    """
+    기간 리포트: 구간(일/주/월/년)별 수입·지출 합계 + 카테고리별 합계.
+    (구간, 종류, 카테고리) GROUP BY 쿼리 1번으로 전체 기간을 집계한다.
+    """
+    periods = period_starts(start, end, granularity)
+
+    rows = Transaction.objects.filter(store=store, date__gte=start, date__lte=end).annotate(
+        period=REPORT_TRUNCS[granularity]("date", output_field=DateField())
+    ).values("period", "transaction_type", "category__name").annotate(
+        total=Sum("amount"), count=Count("id")
+    ).order_by("period")
+
+    buckets = {
+        period: {"period": period.isoformat(), "income": 0, "expense": 0, "categories": []}
+        for period in periods
+    }
+    totals = {"income": 0, "expense": 0}
+    for row in rows:
+        bucket = buckets[row["period"]]
+        transaction_type = row["transaction_type"]
+        cost = float(row["total"])
+
+        bucket[transaction_type] += cost
+        totals[transaction_type] += cost
+        bucket["categories"].append({
+            "type": transaction_type,
+            "category": row["category__name"] or "미분류",
+            "cost": cost,
+            "count": row["count"],
+        })
+
+    for bucket in buckets.values():
+        bucket["categories"].sort(key=lambda c: (c["type"], -c["cost"], c["category"]))
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "granularity": granularity,
+        "totalIncome": totals["income"],
+        "totalExpense": totals["expense"],
+        "buckets": list(buckets.values()),
+    }
+
+
+BALANCE_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _income_expense(queryset, amount_field):
+    """ ✅ 수입/지출 합계를 한 번의 aggregate 로 """
+    totals = queryset.aggregate(
+        income=Sum(amount_field, filter=Q(transaction_type="income")),
+        expense=Sum(amount_field, filter=Q(transaction_type="expense")),
+    )
+    return (totals["income"] or 0) - (totals["expense"] or 0)
+
+
+def balance_before(store, day):
+    """
+    day 이전까지의 잔액 = 가게 시작 잔액 + 이전 달까지의 월별 집계 + 이번 달 1일 ~ day 전날 거래.
+    과거 거래 내역 전체를 다시 읽지 않는다.
+    """
+    previous_months = MonthlyCategorySummary.objects.filter(store=store).filter(
+        Q(year__lt=day.year) | Q(year=day.year, month__lt=day.month)
+    )
+    this_month = Transaction.objects.filter(store=store, date__gte=day.replace(day=1), date__lt=day)
+
+    return (
+        store.opening_balance
+        + _income_expense(previous_months, "total_amount")
+        + _income_expense(this_month, "amount")
+    )
+
+
+def get_running_balance(store, start, end):
+    """
+    기간 내 일별 수입/지출/순증감 + 누적 잔액.
+    누적 잔액은 SUM() OVER (ORDER BY date) 윈도우로 DB 에서 계산하고, 하루 1행만 가져온다.
+    """
+    opening = balance_before(store, start)
+    transactions = Transaction.objects.filter(store=store, date__gte=start, date__lte=end)
+
+    income = Case(When(transaction_type="income", then=F("amount")), default=Value(0), output_field=BALANCE_FIELD)
+    signed = Case(When(transaction_type="income", then=F("amount")), default=-F("amount"), output_field=BALANCE_FIELD)
+
+    if connection.features.supports_over_clause:
+        # 🔹 ORDER BY date 의 기본 RANGE 프레임 → 같은 날짜 행은 모두 그날 마감 잔액을 가짐
+        rows = transactions.annotate(
+            income=Window(Sum(income), partition_by=[F("date")]),
+            net=Window(Sum(signed), partition_by=[F("date")]),
+            running=Window(Sum(signed), order_by=F("date").asc()),
+        ).values("date", "income", "net", "running").distinct().order_by("date")
+    else:
+        # ✅ 윈도우 함수를 지원하지 않는 DB 는 일별 GROUP BY 후 파이썬에서 누적
+        rows, running = [], 0
+        for row in transactions.values("date").annotate(income=Sum(income), net=Sum(signed)).order_by("date"):
+            running += row["net"]
+            rows.append({**row, "running": running})
+
+    days = [
+        {
+            "date": row["date"].isoformat(),
+            "income": float(row["income"]),
+            "expense": float(row["income"] - row["net"]),
+            "net": float(row["net"]),
+            "balance": float(opening + row["running"]),
+        }
+        for row in rows
+    ]
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "openingBalance": float(opening),
+        "closingBalance": days[-1]["balance"] if days else float(opening),
+        "days": days,
+    }
+
+
+class CategoryCache:
+    """
+    카테고리 이름 → id 프로세스 내 캐시 (크기 제한 LRU + TTL).
+    - 같은 프로세스의 변경: signals.py 에서 clear()
+    - 다른 워커의 변경: Redis 카테고리 버전 카운터를 최대 check_interval 초마다 확인해서 clear()
+    """
+
+    def __init__(self, max_size=1024, ttl=300, check_interval=1):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._entries = OrderedDict()  # 🔹 name → (category_id, 만료 시각)
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0
+
+    def _sync_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            version = get_versions([LEDGER_CATEGORY_VERSION])[0]
+        except RedisError:
+            return  # 🔹 Redis 장애 시에는 TTL 로만 만료
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+    def get(self, name):
+        self._sync_version()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            category_id, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[name]
+                return None
+            self._entries.move_to_end(name)
+            return category_id
+
+    def set(self, name, category_id):
+        with self._lock:
+            self._entries[name] = (category_id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+category_cache = CategoryCache(
+    max_size=getattr(settings, "LEDGER_CATEGORY_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "LEDGER_CATEGORY_CACHE_TTL", 300),
+)
+
+
+def resolve_category_id(name):
+    """
+    카테고리 이름 → id. 캐시에 있으면 DB 조회 없이 반환하고, 없으면 조회 후 생성.
+    동시에 같은 이름이 생성되면(unique 충돌) 먼저 생성된 행을 사용한다.
+    """
+    category_id = category_cache.get(name)
+    if category_id is not None:
+        return category_id
+
+    category_id = Category.objects.filter(name=name).values_list("id", flat=True).first()
+    if category_id is None:
+        try:
+            with db_transaction.atomic():
+                category_id = Category.objects.create(name=name).id
+        except IntegrityError:
+            category_id = Category.objects.get(name=name).id
+
+    # 🔥 롤백될 수 있는 행이 캐시에 남지 않도록 커밋 후에 저장
+    db_transaction.on_commit(lambda: category_cache.set(name, category_id))
+    return category_id
+
+
+def resolve_category(name):
+    """ ✅ 이름으로 Category 인스턴스 반환 (캐시 적중 시 쿼리 없음) """
+    return Category.from_db(Category.objects.db, ["id", "name"], [resolve_category_id(name), name])
@@ -5,14 +5,48 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from store.models import Store  
 from ledger.models import Transaction
-from ledger.models import Category
-from ledger.serializers import TransactionSerializer, CategorySerializer
+from ledger.models import Category, MonthlyCategorySummary, MonthlyDayActivity
+from ledger.serializers import TransactionSerializer, TransactionSearchSerializer, CategorySerializer
+from ledger.utils import date_filter, get_period_report, get_running_balance, REPORT_TRUNCS
+from ledger.importer import import_transactions, read_csv_rows, IMPORT_COLUMNS, MAX_IMPORT_ROWS
+from ledger.exporter import stream_export, EXPORT_FORMATS
+from ledger.search import search_transactions
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from django.http import StreamingHttpResponse
 from datetime import datetime
-from django.db.models import Sum
+from django.db.models import Max, Count
 from datetime import date
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.db import transaction
+from redis.exceptions import RedisError
+from livflow.pagination import (
+    is_paginated, paginate_keyset, paginated_data, get_offset_page, offset_page, PAGINATION_PARAMETERS
+)
+from store.cache import cache_store_response, conditional_get, make_etag, get_versions, LEDGER_CATEGORY_VERSION
+
+
+def ledger_month_etag(request, store_id):
+    """ ✅ 월(또는 일) 단위 거래 내역 ETag (행 수 + 마지막 수정 시각 + 카테고리 버전) """
+    try:
+        year = int(request.GET.get("year"))
+        month = int(request.GET.get("month"))
+        day = int(request.GET["day"]) if request.GET.get("day") else None
+        filters = date_filter(year, month, day)
+        category_version = get_versions([LEDGER_CATEGORY_VERSION])[0]
+    except (TypeError, ValueError, RedisError):
+        return None  # 🔹 잘못된 파라미터 / Redis 오류는 조건부 응답 없이 뷰에서 처리
+
+    if not Store.objects.filter(id=store_id, user=request.user).exists():
+        return None
+
+    transactions = Transaction.objects.filter(store_id=store_id, **filters)
+
+    stats = transactions.aggregate(last=Max("updated_at"), count=Count("id"))
+    return make_etag(
+        "ledger", store_id, stats["last"], stats["count"], category_version,
+        sorted(request.query_params.lists()),
+    )
 
 
 # ✅ 1️⃣ 거래 내역 목록 조회 & 생성
@@ -21,9 +55,15 @@ class LedgerTransactionListCreateView(APIView):
     
     @swagger_auto_schema(
         operation_summary="특정 상점의 모든 거래 내역 조회",
+        manual_parameters=[
+            openapi.Parameter("year", openapi.IN_QUERY, description="조회할 연도 (cursor 페이지네이션 시 생략하면 전체 기간)", type=openapi.TYPE_INTEGER),
+            openapi.Parameter("month", openapi.IN_QUERY, description="조회할 월", type=openapi.TYPE_INTEGER),
+            openapi.Parameter("day", openapi.IN_QUERY, description="조회할 일", type=openapi.TYPE_INTEGER),
+        ] + PAGINATION_PARAMETERS,
         responses={200: TransactionSerializer(many=True)}
     )    
 #'<uuid:store_id>/transactions/
+    @conditional_get(ledger_month_etag)
     def get(self, request, store_id):
         store = get_object_or_404(Store, id=store_id, user=request.user)
 
@@ -31,22 +71,27 @@ class LedgerTransactionListCreateView(APIView):
         month = request.GET.get("month")
         day = request.GET.get("day")
 
-        print(f"📌 [DEBUG] 요청된 파라미터 - year: {year}, month: {month}, day: {day}")
-
-        try:
-            year = int(year)
-            month = int(month)
-            day = int(day) if day else None
-        except ValueError:
-            return Response({"error": "year, month, day는 숫자여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        paginated = is_paginated(request)
 
         # ✅ ledger.models.Transaction을 조회하도록 변경
-        transactions = Transaction.objects.filter(store=store, date__year=year, date__month=month).order_by("created_at")
-        if day:
-            transactions = transactions.filter(date__day=day)
+        transactions = Transaction.objects.filter(store=store).order_by("created_at")
 
-        print(f"📌 [DEBUG] SQL Query: {transactions.query}")  
-        print(f"📌 [DEBUG] 필터링된 거래 개수: {transactions.count()}")  
+        # 🔹 cursor 페이지네이션을 쓰는 경우에만 year/month 생략 가능 (전체 기간 조회)
+        if year or month or not paginated:
+            try:
+                year = int(year)
+                month = int(month)
+                day = int(day) if day else None
+                filters = date_filter(year, month, day)  # ✅ 인덱스를 탈 수 있는 날짜 범위 조건
+            except (TypeError, ValueError):
+                return Response({"error": "year, month, day는 숫자여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+            transactions = transactions.filter(**filters)
+
+        if paginated:
+            page, next_cursor = paginate_keyset(request, transactions)
+            serializer = TransactionSerializer(page, many=True)
+            return Response(paginated_data(serializer.data, next_cursor), status=status.HTTP_200_OK)
 
         serializer = TransactionSerializer(transactions, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -72,15 +117,7 @@ class LedgerTransactionListCreateView(APIView):
             try:
                 with transaction.atomic():  # ✅ 트랜잭션 강제 적용
                     transaction_obj = serializer.save()
-
-                    # ✅ DB에 즉시 반영 확인
-                    transaction_obj.refresh_from_db()
-                    print(f"📌 [DEBUG] 저장된 Transaction - ID: {transaction_obj.id}, 날짜: {transaction_obj.date}")
-
-                    # ✅ 저장 후 즉시 DB에서 다시 조회
-                    db_check = Transaction.objects.filter(id=transaction_obj.id).exists()
-                    if not db_check:
-                        print(f"⚠️ [ERROR] `ledger_transaction` 테이블이 아니라 다른 테이블에 저장되었을 가능성 있음!")
+                    # 🔹 refresh_from_db / exists() 재조회는 캐시된 category 관계까지 다시 읽게 만들어 제거
 
                 return Response(TransactionSerializer(transaction_obj).data, status=status.HTTP_201_CREATED)
 
@@ -91,7 +128,187 @@ class LedgerTransactionListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# ✅ 거래 내역 일괄 등록 (CSV / JSON)
+class LedgerTransactionImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = (JSONParser, MultiPartParser, FormParser)
 
+    @swagger_auto_schema(
+        operation_summary="거래 내역 일괄 등록 (CSV / JSON)",
+        operation_description=(
+            f"multipart `file` 로 CSV(UTF-8, {', '.join(IMPORT_COLUMNS)} 헤더) 업로드 또는 "
+            "JSON 배열 `[{\"date\": \"2025-01-31\", \"type\": \"income\", \"category\": \"매출\", \"detail\": \"\", \"cost\": 10000}]` 전송. "
+            f"최대 {MAX_IMPORT_ROWS}행 (JSON 은 요청 크기 제한이 있으므로 대량 등록은 CSV 권장), "
+            "오류가 있으면 전체 미저장, 이미 등록된 거래와 내용이 같은 행은 기존 개수만큼 중복으로 건너뜀."
+        ),
+        responses={201: "등록 결과 (created, duplicates, errors)", 400: "행별 오류"}
+    )
+    def post(self, request, store_id):
+        """ ✅ 거래 내역 여러 건을 한 번에 등록 """
+        store = get_object_or_404(Store, id=store_id, user=request.user)
+
+        try:
+            if "file" in request.FILES:
+                rows = read_csv_rows(request.FILES["file"])
+            elif isinstance(request.data, list):
+                rows = request.data
+            else:
+                rows = request.data.get("transactions")
+                if not isinstance(rows, list):
+                    raise ValueError("CSV 파일(file) 또는 거래 내역 JSON 배열이 필요합니다.")
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(rows) > MAX_IMPORT_ROWS:
+            return Response({"error": f"한 번에 최대 {MAX_IMPORT_ROWS}행까지 등록할 수 있습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = import_transactions(request.user, store, rows)
+        if result["errors"]:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED if result["created"] else status.HTTP_200_OK)
+
+
+# ✅ 기간 리포트 (일/주/월/년 구간별 수입·지출)
+class LedgerReportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="기간 리포트 조회 (일/주/월/년)",
+        operation_description="기간 내 구간별 수입/지출 합계와 카테고리별 합계를 한 번의 GROUP BY 쿼리로 집계",
+        manual_parameters=[
+            openapi.Parameter("start", openapi.IN_QUERY, description="시작일 YYYY-MM-DD (포함)", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter("end", openapi.IN_QUERY, description="종료일 YYYY-MM-DD (포함)", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter("granularity", openapi.IN_QUERY, description="집계 단위 (기본값 month)", type=openapi.TYPE_STRING, enum=list(REPORT_TRUNCS)),
+        ],
+        responses={200: "구간별 리포트 데이터 반환", 400: "잘못된 파라미터"}
+    )
+    @cache_store_response("ledger_report", extra_versions=[LEDGER_CATEGORY_VERSION])
+    def get(self, request, store_id):
+        """ ✅ 기간 리포트 조회 """
+        store = get_object_or_404(Store, id=store_id, user=request.user)
+
+        granularity = request.GET.get("granularity", "month")
+        if granularity not in REPORT_TRUNCS:
+            return Response({"error": "granularity는 day, week, month, year 중 하나여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start = date.fromisoformat(request.GET.get("start", ""))
+            end = date.fromisoformat(request.GET.get("end", ""))
+        except ValueError:
+            return Response({"error": "start, end는 YYYY-MM-DD 형식의 필수 값입니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if start > end:
+            return Response({"error": "start는 end보다 늦을 수 없습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            report = get_period_report(store, start, end, granularity)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report, status=status.HTTP_200_OK)
+
+
+# ✅ 일별 누적 잔액 (현금 흐름)
+class LedgerBalanceView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="일별 누적 잔액 조회",
+        operation_description="가게 시작 잔액(opening_balance)부터 이어지는 기간 내 일별 수입/지출/순증감과 누적 잔액",
+        manual_parameters=[
+            openapi.Parameter("start", openapi.IN_QUERY, description="시작일 YYYY-MM-DD (포함)", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter("end", openapi.IN_QUERY, description="종료일 YYYY-MM-DD (포함)", type=openapi.TYPE_STRING, required=True),
+        ],
+        responses={200: "일별 잔액 데이터 반환", 400: "잘못된 파라미터"}
+    )
+    @cache_store_response("ledger_balance")
+    def get(self, request, store_id):
+        """ ✅ 일별 누적 잔액 조회 """
+        store = get_object_or_404(Store, id=store_id, user=request.user)
+
+        try:
+            start = date.fromisoformat(request.GET.get("start", ""))
+            end = date.fromisoformat(request.GET.get("end", ""))
+        except ValueError:
+            return Response({"error": "start, end는 YYYY-MM-DD 형식의 필수 값입니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if start > end:
+            return Response({"error": "start는 end보다 늦을 수 없습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(get_running_balance(store, start, end), status=status.HTTP_200_OK)
+
+
+# ✅ 거래 내역 내보내기 (CSV / NDJSON 스트리밍)
+class LedgerTransactionExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="거래 내역 내보내기 (CSV / NDJSON)",
+        operation_description="기간 내 거래 내역 전체를 스트리밍으로 내려받기 (행 수와 상관없이 일정한 메모리 사용)",
+        manual_parameters=[
+            openapi.Parameter("start", openapi.IN_QUERY, description="시작일 YYYY-MM-DD (포함, 생략 시 처음부터)", type=openapi.TYPE_STRING),
+            openapi.Parameter("end", openapi.IN_QUERY, description="종료일 YYYY-MM-DD (포함, 생략 시 끝까지)", type=openapi.TYPE_STRING),
+            openapi.Parameter("file_format", openapi.IN_QUERY, description="csv (기본값) 또는 ndjson", type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS)),
+        ],
+        responses={200: "CSV / NDJSON 파일", 400: "잘못된 파라미터"}
+    )
+    def get(self, request, store_id):
+        """ ✅ 거래 내역 스트리밍 내보내기 """
+        store = get_object_or_404(Store, id=store_id, user=request.user)
+
+        export_format = request.GET.get("file_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": "file_format은 csv 또는 ndjson 이어야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start = date.fromisoformat(request.GET["start"]) if request.GET.get("start") else None
+            end = date.fromisoformat(request.GET["end"]) if request.GET.get("end") else None
+        except ValueError:
+            return Response({"error": "start, end는 YYYY-MM-DD 형식이어야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            stream_export(store, export_format, start, end),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        filename = f"ledger_{start or 'all'}_{end or 'all'}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+# ✅ 거래 내역 검색 (내용 / 카테고리 이름)
+class LedgerTransactionSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="거래 내역 검색",
+        operation_description="내용(detail)과 카테고리 이름에서 검색어(공백 구분, 모두 포함)를 찾아 관련도 순으로 반환 (3글자 미만 검색어는 최신순)",
+        manual_parameters=[
+            openapi.Parameter("q", openapi.IN_QUERY, description="검색어", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter("start", openapi.IN_QUERY, description="시작일 YYYY-MM-DD (포함, 생략 시 처음부터)", type=openapi.TYPE_STRING),
+            openapi.Parameter("end", openapi.IN_QUERY, description="종료일 YYYY-MM-DD (포함, 생략 시 끝까지)", type=openapi.TYPE_STRING),
+        ] + PAGINATION_PARAMETERS,
+        responses={200: TransactionSearchSerializer(many=True), 400: "잘못된 파라미터"}
+    )
+    def get(self, request, store_id):
+        """ ✅ 거래 내역 검색 (항상 cursor 페이지네이션) """
+        store = get_object_or_404(Store, id=store_id, user=request.user)
+
+        query = request.GET.get("q", "").strip()
+        if not query:
+            return Response({"error": "q(검색어)는 필수입니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start = date.fromisoformat(request.GET["start"]) if request.GET.get("start") else None
+            end = date.fromisoformat(request.GET["end"]) if request.GET.get("end") else None
+        except ValueError:
+            return Response({"error": "start, end는 YYYY-MM-DD 형식이어야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit, offset = get_offset_page(request)
+        results = search_transactions(store, query, start, end, limit=limit + 1, offset=offset)
+        page, next_cursor = offset_page(results, limit, offset)
+
+        serializer = TransactionSearchSerializer(page, many=True)
+        return Response(paginated_data(serializer.data, next_cursor), status=status.HTTP_200_OK)
 
 
 # ✅ 2️⃣ 특정 거래 내역 조회, 수정, 삭제
@@ -124,20 +341,8 @@ class LedgerTransactionDetailView(APIView):
         store = get_object_or_404(Store, id=store_id, user=request.user)
         transaction = get_object_or_404(Transaction, id=transaction_id, store=store)
 
-        # 🔥 요청 데이터 복사 후 category 처리
+        # 🔥 category (ID 또는 이름) 변환은 serializer.validate_category 에서 한 번만 처리
         data = request.data.copy()
-        
-        category_input = data.get("category")  # ✅ category 값 확인
-
-        if category_input:
-            if category_input.isdigit():  
-                # ✅ 숫자이면 기존 Category ID로 조회
-                category = get_object_or_404(Category, id=int(category_input))
-            else:
-                # ✅ 문자열이면 카테고리명으로 조회 or 생성
-                category, _ = Category.objects.get_or_create(name=category_input)
-
-            data["category"] = category.id  # ✅ ForeignKey에는 ID 저장
 
         serializer = TransactionSerializer(transaction, data=data, partial=True, context={"request": request})
         
@@ -165,17 +370,20 @@ class CategoryListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_summary="특정 월의 거래 내역 조회",
-        manual_parameters=[
-            openapi.Parameter("year", openapi.IN_QUERY, description="조회할 연도", type=openapi.TYPE_INTEGER, required=True),
-            openapi.Parameter("month", openapi.IN_QUERY, description="조회할 월", type=openapi.TYPE_INTEGER, required=True)
-        ],
-        responses={200: "캘린더 및 차트 데이터 반환"}
+        operation_summary="모든 카테고리 목록 조회",
+        manual_parameters=PAGINATION_PARAMETERS,
+        responses={200: CategorySerializer(many=True)}
     )
 
     def get(self, request):
         """ ✅ 모든 카테고리 목록 조회 """
         categories = Category.objects.all()
+
+        if is_paginated(request):
+            page, next_cursor = paginate_keyset(request, categories, ordering=("id",))
+            serializer = CategorySerializer(page, many=True)
+            return Response(paginated_data(serializer.data, next_cursor), status=status.HTTP_200_OK)
+
         serializer = CategorySerializer(categories, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -250,16 +458,13 @@ class LedgerCalendarView(APIView):
         ],
         responses={200: "달력 & 차트 데이터 반환"}
     )
-
+    @conditional_get(ledger_month_etag)
+    @cache_store_response("ledger_calendar", extra_versions=[LEDGER_CATEGORY_VERSION])
     def get(self, request, store_id):
-        print("🚀🚀🚀 GET 요청이 들어왔습니다!") 
-        
         year = request.GET.get("year")
         month = request.GET.get("month")
         day = request.GET.get("day")  # ✅ day 추가
 
-        print(f"📌 [DEBUG] 요청된 파라미터 - year: {year}, month: {month}, day: {day}")  # ✅ 입력값 확인
-
         if not year or not month:
             return Response({"error": "year와 month 쿼리 파라미터가 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -273,16 +478,13 @@ class LedgerCalendarView(APIView):
         # ✅ 상점 확인
         store = get_object_or_404(Store, id=store_id, user=request.user)
 
-        # ✅ 거래 필터링
-        filters = {"store": store, "date__year": year, "date__month": month}
-        if day:
-            filters["date__day"] = day  # ✅ day 필터 추가
-
-        transactions = Transaction.objects.filter(**filters)
+        # ✅ 거래 필터링 (date__year/month/day 대신 (store, date) 인덱스를 타는 범위 조건)
+        try:
+            filters = date_filter(year, month, int(day) if day else None)
+        except ValueError:
+            return Response({"error": "올바른 날짜가 아닙니다."}, status=status.HTTP_400_BAD_REQUEST)
 
-        print(f"📌 [DEBUG] SQL Query: {transactions.query}")  # ✅ 실제 SQL 확인
-        print(f"📌 [DEBUG] 필터링된 거래 개수: {transactions.count()}")  # ✅ 데이터 개수 확인
-        print(f"📌 [DEBUG] 필터링된 거래 목록: {list(transactions.values('date', 'amount', 'transaction_type'))}")  # ✅ 실제 데이터 확인
+        transactions = Transaction.objects.filter(store=store, **filters)
 
         if day:
             # ✅ 특정 날짜의 거래 내역 응답
@@ -297,51 +499,13 @@ class LedgerCalendarView(APIView):
                 for t in transactions
             ]
         else:
-            # ✅ 특정 월의 달력 & 차트 데이터 응답
-            day_summary = {}
-            for t in transactions:
-                trans_day = t.date.day
-                if trans_day not in day_summary:
-                    day_summary[trans_day] = {"hasIncome": False, "hasExpense": False}
-
-                if t.transaction_type == "income":
-                    day_summary[trans_day]["hasIncome"] = True
-                else:
-                    day_summary[trans_day]["hasExpense"] = True
-
-            days_list = [{"day": d, **summary} for d, summary in day_summary.items()]
-
-            income_summary = transactions.filter(transaction_type="income").values("category__name").annotate(
-                total=Sum("amount")
-            ).order_by("-total")[:5]
-
-            expense_summary = transactions.filter(transaction_type="expense").values("category__name").annotate(
-                total=Sum("amount")
-            ).order_by("-total")[:5]
-
-            category_data = [
-                {
-                    "type": "income",
-                    "category": c["category__name"] if c["category__name"] else "미분류",
-                    "cost": float(c["total"])
-                }
-                for c in income_summary
-            ] + [
-                {
-                    "type": "expense",
-                    "category": c["category__name"] if c["category__name"] else "미분류",
-                    "cost": float(c["total"])
-                }
-                for c in expense_summary
-            ]
+            # ✅ 특정 월의 달력 & 차트 데이터 응답 (거래 내역을 불러오지 않고 비트맵 1행으로 달력 구성)
+            days_list = MonthlyDayActivity.get_days(store, year, month)
 
             response_data = {
                 "days": days_list,
-                "chart": {
-                    "totalIncome": transactions.filter(transaction_type="income").aggregate(Sum("amount"))["amount__sum"] or 0,
-                    "totalExpense": transactions.filter(transaction_type="expense").aggregate(Sum("amount"))["amount__sum"] or 0,
-                    "categories": category_data,
-                }
+                # ✅ 차트는 거래 내역 대신 월별 카테고리 집계 테이블에서 조회
+                "chart": MonthlyCategorySummary.get_month_chart(store, year, month),
             }
 
         return Response(response_data, status=status.HTTP_200_OK)
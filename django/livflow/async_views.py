@@ -0,0 +1,52 @@
+# livflow/async_views.py
+
+import json
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+OUTBOUND_TIMEOUT = 5  # 🔹 외부 HTTP 호출 기본 타임아웃 (초)
+
+
+def parse_request_data(request):
+    """ ✅ JSON / form 요청 본문 → dict (DRF request.data 와 같은 용도) """
+    if request.content_type == "application/json":
+        return json.loads(request.body or b"{}")
+    return request.POST
+
+
+class AsyncAPIView(View):
+    """
+    외부 HTTP 응답을 기다리는 엔드포인트용 async 뷰 (DRF APIView 는 async 핸들러를 지원하지 않음).
+    ASGI(uvicorn 워커)에서는 외부 응답을 기다리는 동안 같은 워커가 다른 요청을 처리한다.
+    WSGI 로 실행해도 Django 가 async_to_sync 로 감싸서 그대로 동작한다.
+
+    - authentication_required: DRF 기본 설정(JWTAuthentication + IsAuthenticated)과 같은 JWT 인증 적용
+    - request.data: JSON / form 본문
+    """
+    authentication_required = True
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))  # 🔹 APIView 와 동일하게 CSRF 제외 (JWT 인증)
+
+    async def dispatch(self, request, *args, **kwargs):
+        if self.authentication_required:
+            try:
+                result = await sync_to_async(JWTAuthentication().authenticate)(request)
+            except AuthenticationFailed as e:
+                detail = e.detail if isinstance(e.detail, dict) else {"detail": e.detail}
+                return JsonResponse(detail, status=401)
+            if result is None:
+                return JsonResponse({"detail": str(NotAuthenticated.default_detail)}, status=401)
+            request.user = result[0]
+
+        try:
+            request.data = parse_request_data(request)
+        except ValueError:
+            return JsonResponse({"detail": "JSON 형식이 올바르지 않습니다."}, status=400)
+
+        return await super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,117 @@
+# livflow/fixedpoint.py
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import ExpressionWrapper
+from rest_framework import serializers
+
+# 🔹 수량(g / ml / ea)은 1/1000 단위, 금액(원)은 1/100 단위 정수로 저장
+#    모델 / 원가 / 재고 계산은 모두 정수, 실수(Decimal) 변환은 API 경계(요청 파싱 / 응답)에서 한 번만
+QUANTITY_SCALE = 1000
+MONEY_SCALE = 100
+
+FIXED_POINT_MAX_DIGITS = 15  # 🔹 API 값 자릿수 제한 (× scale 후에도 BIGINT 범위 안)
+
+# 🔹 원가 계산은 SQL 에서 사용량 × 구매가 × 2 를 정수로 계산하므로 입력값 상한을 둔다
+#    (1,000,000 × 1000) × (10,000,000 × 100) × 2 = 2e18 < BIGINT 최대값(9.2e18)
+MAX_MONEY = 10_000_000  # 원
+MAX_QUANTITY = 1_000_000  # g / ml / ea
+
+
+def decimal_places(scale):
+    return len(str(scale)) - 1
+
+
+def to_fixed(value, scale):
+    """ ✅ API 값(str / int / float / Decimal) → 정수 (소수 자릿수 초과분은 반올림, 빈 값은 None) """
+    if value is None or value == "":
+        return None
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"🚨 숫자가 아닙니다: {value!r}")
+    if not number.is_finite():
+        raise ValueError(f"🚨 숫자가 아닙니다: {value!r}")
+    return int((number * scale).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_fixed(value, scale):
+    """ ✅ 정수 → 응답용 Decimal (소수 자릿수 고정, None 은 None) """
+    if value is None:
+        return None
+    return (Decimal(value) / scale).quantize(Decimal(1).scaleb(-decimal_places(scale)))
+
+
+def div_round(numerator, denominator):
+    """ ✅ 정수 나눗셈 반올림 (0.5 는 올림, 분모 0 이면 0). 값은 0 이상 (SQL 의 div_round_expression 과 같은 결과) """
+    if not denominator:
+        return 0
+    return (numerator * 2 + denominator) // (denominator * 2)
+
+
+def div_round_expression(numerator, denominator):
+    """
+    ✅ SQL 정수 나눗셈 반올림 (2n + d) / 2d — SQLite / PostgreSQL 모두 정수 / 정수 = 정수 나눗셈.
+    분모가 0 인 경우는 호출하는 쪽에서 Case 로 처리.
+    """
+    return ExpressionWrapper((numerator * 2 + denominator) / (denominator * 2), output_field=models.BigIntegerField())
+
+
+class FixedPointField(models.BigIntegerField):
+    """ 고정 소수점 값 컬럼 (실제 값 × scale 을 BIGINT 로 저장, 파이썬 값도 int) """
+
+    def __init__(self, *args, scale=QUANTITY_SCALE, **kwargs):
+        self.scale = scale
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["scale"] = self.scale
+        return name, path, args, kwargs
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"form_class": FixedPointFormField, "scale": self.scale, **kwargs})
+
+
+class FixedPointFormField(forms.DecimalField):
+    """ ✅ 관리자 화면 입력 / 표시는 실제 값, 저장은 정수 """
+
+    def __init__(self, *, scale, **kwargs):
+        self.scale = scale
+        kwargs.pop("min_value", None)  # 🔹 BIGINT 범위(정수 단위)는 실제 값 입력 검사에 맞지 않음
+        kwargs.pop("max_value", None)
+        kwargs.setdefault("max_digits", FIXED_POINT_MAX_DIGITS)
+        super().__init__(decimal_places=decimal_places(scale), **kwargs)
+
+    def prepare_value(self, value):
+        return from_fixed(value, self.scale) if isinstance(value, int) else value
+
+    def clean(self, value):
+        return to_fixed(super().clean(value), self.scale)
+
+    def has_changed(self, initial, data):
+        try:
+            return to_fixed(self.to_python(data), self.scale) != initial
+        except ValidationError:
+            return True
+
+
+class FixedPointSerializerField(serializers.DecimalField):
+    """ ✅ API 경계 변환: 요청 숫자 → 정수 (× scale), 정수 → 응답 숫자 """
+
+    def __init__(self, scale, **kwargs):
+        self.scale = scale
+        kwargs.setdefault("max_digits", FIXED_POINT_MAX_DIGITS)
+        super().__init__(decimal_places=decimal_places(scale), **kwargs)
+
+    def to_internal_value(self, data):
+        return to_fixed(super().to_internal_value(data), self.scale)
+
+    def run_validators(self, value):
+        # 🔹 max_value / min_value 는 실제 값 기준 (정수로 바꾸기 전 값으로 검사)
+        super().run_validators(from_fixed(value, self.scale) if isinstance(value, int) else value)
+
+    def to_representation(self, value):
+        return super().to_representation(from_fixed(value, self.scale))
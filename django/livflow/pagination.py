@@ -0,0 +1,107 @@
+# livflow/pagination.py
+
+import base64
+import json
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from drf_yasg import openapi
+from rest_framework.exceptions import ValidationError
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# ✅ swagger 문서용 공통 파라미터
+PAGINATION_PARAMETERS = [
+    openapi.Parameter("limit", openapi.IN_QUERY, description=f"페이지 크기 (최대 {MAX_PAGE_SIZE}, 지정 시 cursor 페이지네이션 적용)", type=openapi.TYPE_INTEGER),
+    openapi.Parameter("cursor", openapi.IN_QUERY, description="이전 응답의 next_cursor", type=openapi.TYPE_STRING),
+]
+
+
+def is_paginated(request):
+    """ ✅ limit 또는 cursor 파라미터가 있을 때만 페이지네이션 적용 (기존 응답 형식 유지) """
+    return "limit" in request.query_params or "cursor" in request.query_params
+
+
+def encode_cursor(values):
+    raw = json.dumps([str(value) for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(model, ordering, cursor):
+    """ ✅ 불투명(opaque) cursor → 정렬 필드 값 목록 """
+    try:
+        raw_values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if len(raw_values) != len(ordering):
+            raise ValueError
+        return [model._meta.get_field(field).to_python(value) for field, value in zip(ordering, raw_values)]
+    except (ValueError, TypeError, DjangoValidationError):
+        raise ValidationError({"cursor": "올바르지 않은 cursor 입니다."})
+
+
+def get_page_size(request):
+    try:
+        limit = int(request.query_params.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValidationError({"limit": "limit은 숫자여야 합니다."})
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def paginate_keyset(request, queryset, ordering=("created_at", "id")):
+    """
+    (created_at, id) 등 정렬 필드 기준 keyset(cursor) 페이지네이션.
+    OFFSET 없이 "마지막으로 본 행 이후" 조건으로 인덱스 범위만 읽는다.
+    반환값: (현재 페이지 객체 목록, next_cursor 또는 None)
+    """
+    limit = get_page_size(request)
+    queryset = queryset.order_by(*ordering)
+
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        values = decode_cursor(queryset.model, ordering, cursor)
+
+        # 🔹 (a, b) > (va, vb)  →  a > va OR (a = va AND b > vb)
+        after = Q()
+        for i, field in enumerate(ordering):
+            condition = Q(**{f"{field}__gt": values[i]})
+            for prev_field, prev_value in zip(ordering[:i], values[:i]):
+                condition &= Q(**{prev_field: prev_value})
+            after |= condition
+        queryset = queryset.filter(after)
+
+    items = list(queryset[:limit + 1])
+    if len(items) <= limit:
+        return items, None
+
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor([getattr(last, field) for field in ordering])
+
+
+def paginated_data(results, next_cursor):
+    return {"results": results, "next_cursor": next_cursor}
+
+
+def get_offset_page(request):
+    """
+    관련도 순 검색 결과처럼 keyset 으로 이어갈 수 없는 정렬용 (limit, offset).
+    cursor 형식은 keyset 과 같은 불투명 문자열.
+    """
+    limit = get_page_size(request)
+    cursor = request.query_params.get("cursor")
+    if not cursor:
+        return limit, 0
+
+    try:
+        offset = int(json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())[0])
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise ValidationError({"cursor": "올바르지 않은 cursor 입니다."})
+    if offset < 0:
+        raise ValidationError({"cursor": "올바르지 않은 cursor 입니다."})
+    return limit, offset
+
+
+def offset_page(items, limit, offset):
+    """ ✅ limit + 1 개 조회 결과 → (현재 페이지, next_cursor 또는 None) """
+    if len(items) <= limit:
+        return items, None
+    return items[:limit], encode_cursor([offset + limit])
@@ -85,6 +85,16 @@ REDIS_HOST = os.getenv("REDIS_HOST", "redis")  # Docker 컨테이너에서는 "r
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))  # 기본 DB 인덱스
 
+# 가게 단위 읽기 API 응답 캐시 (store/cache.py)
+STORE_CACHE_ENABLED = os.getenv("STORE_CACHE_ENABLED", "true").lower() == "true"
+STORE_CACHE_TIMEOUT = int(os.getenv("STORE_CACHE_TIMEOUT", 60 * 60 * 24))
+# 예: STORE_CACHE_DISABLED_ENDPOINTS=recipes,ledger_calendar
+STORE_CACHE_DISABLED_ENDPOINTS = [e for e in os.getenv("STORE_CACHE_DISABLED_ENDPOINTS", "").split(",") if e]
+
+# 가계부 카테고리 이름 → id 프로세스 내 캐시 (ledger/utils.py)
+LEDGER_CATEGORY_CACHE_SIZE = int(os.getenv("LEDGER_CATEGORY_CACHE_SIZE", 1024))
+LEDGER_CATEGORY_CACHE_TTL = int(os.getenv("LEDGER_CATEGORY_CACHE_TTL", 300))
+
 
 # Static files
 STATIC_URL = '/static/'
@@ -0,0 +1,218 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db.models import Value
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import CustomUser
+from store.models import Store
+from ingredients.models import Ingredient
+from ledger.models import Category, Transaction
+from livflow.fixedpoint import (
+    MAX_MONEY, MONEY_SCALE, QUANTITY_SCALE, FixedPointSerializerField, div_round, div_round_expression, from_fixed, to_fixed,
+)
+from livflow.pagination import encode_cursor
+
+
+class FixedPointConversionTests(SimpleTestCase):
+    """ ✅ 실수 ↔ 고정 소수점 정수 변환 (0.5 는 올림) """
+
+    def test_to_fixed_rounds_half_up(self):
+        self.assertEqual(to_fixed("0.0005", QUANTITY_SCALE), 1)
+        self.assertEqual(to_fixed("0.0004", QUANTITY_SCALE), 0)
+        self.assertEqual(to_fixed("1.2345", QUANTITY_SCALE), 1235)
+        self.assertEqual(to_fixed("0.005", MONEY_SCALE), 1)
+        self.assertEqual(to_fixed(2.675, MONEY_SCALE), 268)  # 🔹 float 도 str 로 바꿔서 2.675 그대로 반올림
+        self.assertEqual(to_fixed(Decimal("3000"), MONEY_SCALE), 300000)
+
+    def test_to_fixed_empty_and_invalid(self):
+        self.assertIsNone(to_fixed(None, MONEY_SCALE))
+        self.assertIsNone(to_fixed("", MONEY_SCALE))
+        for value in ("abc", "NaN", "Infinity"):
+            with self.assertRaises(ValueError):
+                to_fixed(value, MONEY_SCALE)
+
+    def test_from_fixed_keeps_decimal_places(self):
+        self.assertEqual(str(from_fixed(1, QUANTITY_SCALE)), "0.001")
+        self.assertEqual(str(from_fixed(300000, MONEY_SCALE)), "3000.00")
+        self.assertIsNone(from_fixed(None, MONEY_SCALE))
+
+    def test_round_trip(self):
+        for value in ("0.001", "1.5", "999999.999"):
+            self.assertEqual(from_fixed(to_fixed(value, QUANTITY_SCALE), QUANTITY_SCALE), Decimal(value))
+
+    def test_div_round_half_up(self):
+        self.assertEqual(div_round(1, 2), 1)
+        self.assertEqual(div_round(3, 2), 2)
+        self.assertEqual(div_round(4, 3), 1)
+        self.assertEqual(div_round(5, 3), 2)
+        self.assertEqual(div_round(7, 0), 0)
+
+
+class FixedPointSerializerFieldTests(SimpleTestCase):
+    """ ✅ API 경계 변환 (요청 숫자 → 정수, 정수 → 응답 숫자) """
+
+    def test_round_trip(self):
+        field = FixedPointSerializerField(scale=MONEY_SCALE)
+        for value, expected in (("12.5", "12.50"), (3000, "3000.00"), ("0.01", "0.01")):
+            internal = field.run_validation(value)
+            self.assertIsInstance(internal, int)
+            self.assertEqual(field.to_representation(internal), expected)
+
+    def test_quantity_scale(self):
+        field = FixedPointSerializerField(scale=QUANTITY_SCALE)
+
+        self.assertEqual(field.run_validation("1.234"), 1234)
+        self.assertEqual(field.to_representation(1234), "1.234")
+
+    def test_too_many_decimal_places_is_rejected(self):
+        with self.assertRaises(serializers.ValidationError):
+            FixedPointSerializerField(scale=MONEY_SCALE).run_validation("1.005")
+
+    def test_max_value_is_checked_against_real_value(self):
+        field = FixedPointSerializerField(scale=MONEY_SCALE, max_value=MAX_MONEY)
+
+        self.assertEqual(field.run_validation(MAX_MONEY), MAX_MONEY * MONEY_SCALE)
+        with self.assertRaises(serializers.ValidationError):
+            field.run_validation(MAX_MONEY + 1)
+
+
+class DivRoundExpressionTests(TestCase):
+    """ ✅ SQL 반올림 나눗셈(div_round_expression)이 파이썬 div_round 와 같은 결과 """
+
+    CASES = [(0, 3), (1, 2), (3, 2), (5, 2), (4, 3), (5, 3), (999, 1000), (1500, 1000), (2 * 10**17 + 1, 4 * 10**8)]
+
+    def test_matches_python(self):
+        user = CustomUser.objects.create_user(email="owner@test.com", password="password")
+        row = CustomUser.objects.filter(pk=user.pk).annotate(**{
+            f"case_{index}": div_round_expression(Value(numerator), Value(denominator))
+            for index, (numerator, denominator) in enumerate(self.CASES)
+        }).values(*(f"case_{index}" for index in range(len(self.CASES)))).get()
+
+        for index, (numerator, denominator) in enumerate(self.CASES):
+            self.assertEqual(row[f"case_{index}"], div_round(numerator, denominator), (numerator, denominator))
+
+
+class AsyncAPIViewDispatchTests(TestCase):
+    """ ✅ AsyncAPIView 의 JWT 인증 / 요청 본문 파싱 (외부 호출 전에 끝나는 경로만) """
+
+    PREDICT_URL = "/api/salesforecast/predict/"
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="owner@test.com", password="password")
+        self.token = str(AccessToken.for_user(self.user))
+
+    def post(self, url, body, token=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        return self.client.post(url, body, content_type="application/json", **headers)
+
+    def test_missing_token_is_401(self):
+        response = self.post(self.PREDICT_URL, {"district": "a"})
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("detail", response.json())
+
+    def test_invalid_token_is_401(self):
+        response = self.post(self.PREDICT_URL, {"district": "a"}, token="not-a-jwt")
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_malformed_json_is_400(self):
+        response = self.post(self.PREDICT_URL, "{not json", token=self.token)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("detail", response.json())
+
+    def test_authenticated_request_reaches_handler(self):
+        response = self.post(self.PREDICT_URL, {"district": "a"}, token=self.token)
+
+        self.assertEqual(response.status_code, 400)  # 🔹 핸들러의 필수 값 검사까지 도달
+        self.assertIn("필수", response.json()["error"])
+
+    def test_oauth_callbacks_do_not_require_token(self):
+        for provider in ("google", "kakao", "naver"):
+            with self.subTest(provider=provider):
+                response = self.post(f"/api/users/{provider}/login/callback/", {})
+
+                self.assertEqual(response.status_code, 400)  # 🔹 401 이 아니라 code 누락 오류
+                self.assertIn("error", response.json())
+
+
+class KeysetPaginationTests(TestCase):
+    """ ✅ limit / cursor 페이지네이션 (같은 created_at 행도 빠짐 / 중복 없이), 잘못된 cursor, 기존 응답 형식 """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="owner@test.com", password="password")
+        self.store = Store.objects.create(user=self.user, name="테스트 가게")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        created_at = timezone.now()
+        Ingredient.objects.bulk_create([
+            Ingredient(
+                store=self.store, name=f"재료{i}", purchase_price=1000, purchase_quantity=1000, unit="g",
+                created_at=created_at + timedelta(seconds=i // 3),  # 🔹 3개씩 같은 시각
+            )
+            for i in range(8)
+        ])
+        category = Category.objects.create(name="식자재")
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, store=self.store, category=category,
+                transaction_type="expense", amount=1000, date=date(2025, 3, 1 + i),
+            )
+            for i in range(7)
+        ])
+        Transaction.objects.filter(store=self.store).update(created_at=created_at)  # 🔹 전부 같은 시각
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def collect(self, url, key, limit, **params):
+        """ 🔹 next_cursor 를 따라 전체 페이지를 읽어 id 목록 반환 """
+        ids, cursor, pages = [], None, 0
+        while True:
+            data = self.get(url, limit=limit, **({"cursor": cursor} if cursor else {}), **params)
+            self.assertLessEqual(len(data["results"]), limit)
+            ids += [row[key] for row in data["results"]]
+            pages += 1
+            cursor = data["next_cursor"]
+            if cursor is None:
+                return ids, pages
+
+    def test_every_ingredient_once(self):
+        ids, pages = self.collect(f"/api/ingredients/{self.store.id}/", "ingredient_id", limit=3)
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertCountEqual(ids, [str(pk) for pk in Ingredient.objects.filter(store=self.store).values_list("id", flat=True)])
+
+    def test_every_transaction_once_with_equal_created_at(self):
+        ids, pages = self.collect(f"/api/ledger/{self.store.id}/transactions/", "transaction_id", limit=2)
+
+        self.assertEqual(pages, 4)
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertCountEqual(ids, [str(pk) for pk in Transaction.objects.filter(store=self.store).values_list("id", flat=True)])
+
+    def test_tampered_cursor_is_400(self):
+        url = f"/api/ingredients/{self.store.id}/"
+        for cursor in ("not-a-cursor", encode_cursor(["2025-01-01"]), encode_cursor(["어제", "not-a-uuid"])):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(url, {"limit": 2, "cursor": cursor})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("cursor", response.json())
+
+    def test_without_limit_or_cursor_keeps_list_shape(self):
+        data = self.get(f"/api/ingredients/{self.store.id}/")
+
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 8)
+
+        data = self.get(f"/api/ledger/{self.store.id}/transactions/", year=2025, month=3)
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 7)
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from uuid import uuid4
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import CustomUser
+from livflow.async_views import OUTBOUND_TIMEOUT
+
+PROJECT_DIR = Path(__file__).resolve().parents[3]  # 🔹 manage.py / gunicorn.conf.py 위치
+
+
+def start_stub_upstream(port, delay):
+    """ ✅ 모든 POST 에 delay 초 뒤 {"prediction": 1} 로 응답하는 가짜 FastAPI 서버 (요청마다 스레드 1개) """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            time.sleep(delay)
+            body = json.dumps({"prediction": 1}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def wait_for_port(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise CommandError(f"🚨 {timeout}초 안에 gunicorn 이 {port} 포트에서 응답하지 않습니다.")
+
+
+async def send_concurrent(url, token, count, timeout):
+    """ ✅ 같은 요청 count 개를 동시에 보내고 (상태 코드 목록, 전체 소요 시간) 반환 """
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        started = time.monotonic()
+        responses = await asyncio.gather(*[
+            client.get(url, headers={"Authorization": f"Bearer {token}"}) for _ in range(count)
+        ])
+        return [response.status_code for response in responses], time.monotonic() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "외부 API 응답을 기다리는 async 뷰 벤치마크: 느린 가짜 예측 서버를 띄우고 gunicorn 을 "
+        "SERVER_MODE=wsgi / asgi 로 각각 실행해 market-predict 동시 요청의 전체 소요 시간을 비교합니다. "
+        "(gunicorn / uvicorn 필요, 같은 DB 에 임시 사용자를 만들었다가 지웁니다)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=10, help="동시 요청 수")
+        parser.add_argument("--delay", type=float, default=2.0, help=f"가짜 예측 서버 응답 지연 (초, {OUTBOUND_TIMEOUT}초 미만)")
+        parser.add_argument("--workers", type=int, default=1, help="gunicorn 워커 수")
+        parser.add_argument("--port", type=int, default=8100, help="gunicorn 포트")
+        parser.add_argument("--stub-port", type=int, default=9100, help="가짜 예측 서버 포트")
+        parser.add_argument("--modes", nargs="+", choices=["wsgi", "asgi"], default=["wsgi", "asgi"])
+
+    def handle(self, *args, **options):
+        if options["delay"] >= OUTBOUND_TIMEOUT:
+            raise CommandError(f"🚨 --delay 는 외부 호출 타임아웃({OUTBOUND_TIMEOUT}초)보다 짧아야 합니다.")
+
+        stub = start_stub_upstream(options["stub_port"], options["delay"])
+        user = CustomUser.objects.create_user(email=f"bench-{uuid4().hex}@livflow.local")
+        token = str(AccessToken.for_user(user))
+        url = (
+            f"http://127.0.0.1:{options['port']}/api/salesforecast/market-predict/"
+            "?district=bench&category=bench&year=2025&month=1"
+        )
+        timeout = options["requests"] * options["delay"] + 30  # 🔹 sync 워커는 요청을 하나씩 처리
+
+        self.stdout.write(
+            f"🔹 동시 요청 {options['requests']}개 / 예측 서버 지연 {options['delay']}초 / gunicorn 워커 {options['workers']}개"
+        )
+        try:
+            for mode in options["modes"]:
+                env = {
+                    **os.environ,
+                    "SERVER_MODE": mode,
+                    "GUNICORN_BIND": f"127.0.0.1:{options['port']}",
+                    "GUNICORN_WORKERS": str(options["workers"]),
+                    "GUNICORN_TIMEOUT": str(int(timeout)),
+                    "FASTAPI_BASE_URL": f"http://127.0.0.1:{options['stub_port']}",
+                }
+                server = subprocess.Popen(
+                    [sys.executable, "-m", "gunicorn", "--log-level", "warning"], cwd=PROJECT_DIR, env=env,
+                )
+                try:
+                    wait_for_port(options["port"])
+                    statuses, elapsed = asyncio.run(send_concurrent(url, token, options["requests"], timeout))
+                finally:
+                    server.terminate()
+                    server.wait()
+
+                failed = sum(1 for code in statuses if code != 200)
+                self.stdout.write(f"   {mode:4} : {elapsed:6.1f}초 (실패 {failed}개)")
+        finally:
+            stub.shutdown()
+            user.delete()
+
+        self.stdout.write(self.style.SUCCESS("✅ 벤치마크 완료"))
@@ -1,58 +1,55 @@
-import requests
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status
+import os
+import httpx
+from django.http import JsonResponse
+from livflow.async_views import AsyncAPIView, OUTBOUND_TIMEOUT
 
 
-FASTAPI_BASE_URL = "http://172.30.1.65:8000"  # 로컬 FastAPI 서버 주소로 바꿔줘
+FASTAPI_BASE_URL = os.getenv("FASTAPI_BASE_URL", "http://172.30.1.65:8000")  # 로컬 FastAPI 서버 주소로 바꿔줘
 
-class SalesPredictAPIView(APIView):
-    def post(self, request):
+
+async def post_to_fastapi(path, payload):
+    """ ✅ FastAPI 예측 서버 호출 (async, 응답 대기 중 워커가 다른 요청 처리) """
+    try:
+        async with httpx.AsyncClient(timeout=OUTBOUND_TIMEOUT) as client:
+            response = await client.post(f"{FASTAPI_BASE_URL}{path}", json=payload)
+        if response.status_code == 200:
+            return JsonResponse(response.json(), status=200, safe=False)
+        return JsonResponse({"error": "FastAPI 서버 오류", "detail": response.text}, status=500)
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+class SalesPredictAPIView(AsyncAPIView):
+    async def post(self, request):
         district = request.data.get("district")
         menu = request.data.get("menu")
         date = request.data.get("date")  # yyyy-mm-dd
 
         if not all([district, menu, date]):
-            return Response({"error": "district, menu, date는 필수입니다."}, status=status.HTTP_400_BAD_REQUEST)
-
-        try:
-            response = requests.post(
-                f"{FASTAPI_BASE_URL}/predict",
-                json={"district": district, "menu": menu, "date_str": date},
-                timeout=5
-            )
-            if response.status_code == 200:
-                return Response(response.json(), status=200)
-            return Response({"error": "FastAPI 서버 오류", "detail": response.text}, status=500)
+            return JsonResponse({"error": "district, menu, date는 필수입니다."}, status=400)
 
-        except Exception as e:
-            return Response({"error": str(e)}, status=500)
+        return await post_to_fastapi("/predict", {"district": district, "menu": menu, "date_str": date})
 
 
-class MarketForecastAPIView(APIView):
-    def get(self, request):
+class MarketForecastAPIView(AsyncAPIView):
+    async def get(self, request):
         district = request.GET.get("district")
         category = request.GET.get("category")
         year = request.GET.get("year")
         month = request.GET.get("month")
 
         if not all([district, category, year, month]):
-            return Response({"error": "district, category, year, month는 필수입니다."}, status=400)
+            return JsonResponse({"error": "district, category, year, month는 필수입니다."}, status=400)
 
         try:
-            response = requests.post(
-                f"{FASTAPI_BASE_URL}/market-predict",
-                json={
-                    "district": district,
-                    "category": category,
-                    "year": int(year),
-                    "month": int(month)
-                },
-                timeout=5
-            )
-            if response.status_code == 200:
-                return Response(response.json(), status=200)
-            return Response({"error": "FastAPI 서버 오류", "detail": response.text}, status=500)
-
-        except Exception as e:
-            return Response({"error": str(e)}, status=500)
+            payload = {
+                "district": district,
+                "category": category,
+                "year": int(year),
+                "month": int(month)
+            }
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=500)
+
+        return await post_to_fastapi("/market-predict", payload)
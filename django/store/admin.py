@@ -1,5 +1,5 @@
 from django.contrib import admin
-from store.models import Store, Category as StoreCategory  # ✅ 업종 카테고리
+from store.models import Store, StorePurgeJob, Category as StoreCategory  # ✅ 업종 카테고리
 
 @admin.register(StoreCategory)
 class StoreCategoryAdmin(admin.ModelAdmin):
@@ -8,7 +8,17 @@ class StoreCategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Store)
 class StoreAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'user', 'address', 'created_at')
+    list_display = ('id', 'name', 'user', 'address', 'is_deleted', 'created_at')
     search_fields = ('name', 'user__email', 'address')
-    list_filter = ('created_at',)
+    list_filter = ('is_deleted', 'created_at')
+    raw_id_fields = ('user',)
+
+    def get_queryset(self, request):
+        return Store.all_objects.all()  # ✅ 삭제 요청된 가게도 표시
+
+@admin.register(StorePurgeJob)
+class StorePurgeJobAdmin(admin.ModelAdmin):
+    list_display = ('store_id', 'user', 'status', 'step', 'deleted_rows', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('store_id', 'user__email')
     raw_id_fields = ('user',)
@@ -0,0 +1,189 @@
+# store/cache.py
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from functools import wraps
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from redis.exceptions import RedisError
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from users.utils import redis_client
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "cache_version:{name}"
+RESPONSE_KEY = "store_cache:{endpoint}:{digest}"
+STATS_KEY = "store_cache_stats"
+
+LEDGER_CATEGORY_VERSION = "ledger_category"  # 🔹 가계부 카테고리는 전체 가게가 공유
+
+
+def store_version_name(store_id):
+    return f"store:{store_id}"
+
+
+def is_cache_enabled(endpoint):
+    """ ✅ 전체/엔드포인트별 캐시 사용 여부 (settings 로 끄기 가능) """
+    if not getattr(settings, "STORE_CACHE_ENABLED", True):
+        return False
+    return endpoint not in getattr(settings, "STORE_CACHE_DISABLED_ENDPOINTS", ())
+
+
+def get_versions(names):
+    """
+    버전 카운터 조회. 값이 없으면 현재 시각(ms)으로 시작해서
+    Redis 가 비워진 뒤에도 예전 버전 번호(=예전 캐시 키)가 재사용되지 않도록 한다.
+    """
+    keys = [VERSION_KEY.format(name=name) for name in names]
+    if not keys:
+        return []
+
+    versions = redis_client.mget(keys)
+    missing = [key for key, version in zip(keys, versions) if version is None]
+    if missing:
+        start = int(time.time() * 1000)
+        pipe = redis_client.pipeline()
+        for key in missing:
+            pipe.set(key, start, nx=True)
+        pipe.execute()
+        versions = redis_client.mget(keys)
+    return versions
+
+
+def bump_version(name):
+    """ ✅ 버전 카운터 증가 → 이전 버전으로 만들어진 캐시 키는 더 이상 조회되지 않음 """
+    key = VERSION_KEY.format(name=name)
+    try:
+        pipe = redis_client.pipeline()
+        pipe.set(key, int(time.time() * 1000), nx=True)
+        pipe.incr(key)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"⚠️ 캐시 버전 증가 실패 ({name}): {e}")
+
+
+_pending = threading.local()  # 🔹 스레드별 {connection alias: 이번 커밋에서 증가한 대상 이름}
+
+
+def schedule_version_bump(name):
+    """
+    DB 커밋 이후에 버전 증가 (커밋 전 데이터가 새 버전으로 캐시되는 것 방지).
+    같은 트랜잭션 안에서 같은 대상은 커밋 후 한 번만 증가한다.
+    콜백은 매번 등록하므로 롤백된 (savepoint) 구간의 예약이 버려져도 증가가 빠지지 않는다.
+    """
+    batches = getattr(_pending, "batches", None)
+    if batches is None:
+        batches = _pending.batches = {}
+    alias = connection.alias
+    bumped = batches.setdefault(alias, set())
+
+    def callback():
+        # 🔹 커밋되면 묶음을 비워서 다음 트랜잭션은 새로 예약
+        if batches.get(alias) is bumped:
+            del batches[alias]
+        if name not in bumped:
+            bumped.add(name)
+            bump_version(name)
+
+    transaction.on_commit(callback)
+
+
+def schedule_store_version_bump(store_id):
+    if store_id:
+        schedule_version_bump(store_version_name(store_id))
+
+
+def _record(endpoint, result):
+    try:
+        redis_client.hincrby(STATS_KEY, f"{endpoint}:{result}", 1)
+    except RedisError:
+        pass
+
+
+def get_cache_stats():
+    """ ✅ 엔드포인트별 hit/miss 카운터 {endpoint: {"hit": n, "miss": n}} """
+    stats = {}
+    for field, count in redis_client.hgetall(STATS_KEY).items():
+        endpoint, result = field.rsplit(":", 1)
+        stats.setdefault(endpoint, {"hit": 0, "miss": 0})[result] = int(count)
+    return stats
+
+
+def reset_cache_stats():
+    redis_client.delete(STATS_KEY)
+
+
+def make_etag(*parts):
+    """ ✅ 검증값(마지막 수정 시각, 행 수, 쿼리 파라미터 등)으로 ETag 생성 """
+    return hashlib.md5(json.dumps(parts, cls=JSONEncoder).encode()).hexdigest()
+
+
+def conditional_get(etag_func):
+    """
+    APIView GET 메서드용 ETag / If-None-Match 데코레이터.
+    etag_func(request, **kwargs) 가 None 을 반환하면 조건부 응답 없이 그대로 처리한다.
+    """
+    return method_decorator(condition(etag_func=etag_func))
+
+
+def cache_store_response(endpoint, store_ids=None, extra_versions=(), key_extra=None):
+    """
+    가게 단위 버전 카운터를 키에 포함하는 APIView GET 응답 캐시 데코레이터.
+
+    - store_ids: (request, **kwargs) -> 가게 ID 목록. 기본값은 URL 의 store_id
+    - extra_versions: 가게와 무관하게 응답에 영향을 주는 전역 버전 이름 목록
+    - key_extra: (request, **kwargs) -> 키에 추가할 값 (예: 현재 월)
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not is_cache_enabled(endpoint):
+                return view_method(self, request, *args, **kwargs)
+
+            try:
+                ids = store_ids(request, **kwargs) if store_ids else [kwargs["store_id"]]
+                names = [store_version_name(store_id) for store_id in ids] + list(extra_versions)
+                versions = get_versions(names)
+
+                raw_key = json.dumps([
+                    request.user.pk,
+                    [str(store_id) for store_id in ids],
+                    versions,
+                    sorted(request.query_params.lists()),
+                    key_extra(request, **kwargs) if key_extra else None,
+                ], cls=JSONEncoder)
+                cache_key = RESPONSE_KEY.format(endpoint=endpoint, digest=hashlib.sha1(raw_key.encode()).hexdigest())
+
+                cached = redis_client.get(cache_key)
+            except RedisError as e:
+                logger.warning(f"⚠️ 캐시 조회 실패, 캐시 없이 처리 ({endpoint}): {e}")
+                return view_method(self, request, *args, **kwargs)
+
+            if cached is not None:
+                _record(endpoint, "hit")
+                return Response(json.loads(cached), status=200)
+
+            _record(endpoint, "miss")
+            response = view_method(self, request, *args, **kwargs)
+
+            if response.status_code == 200:
+                try:
+                    redis_client.setex(
+                        cache_key,
+                        getattr(settings, "STORE_CACHE_TIMEOUT", 60 * 60 * 24),
+                        json.dumps(response.data, cls=JSONEncoder),
+                    )
+                except RedisError as e:
+                    logger.warning(f"⚠️ 캐시 저장 실패 ({endpoint}): {e}")
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+from store.models import StorePurgeJob
+from store.purge import run_purge_job, PURGE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "삭제 요청된 가게의 하위 데이터를 배치 단위로 삭제합니다. (중단된 작업 재개)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store", action="append", help="특정 가게 ID만 처리 (여러 번 지정 가능)")
+        parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE, help="한 번에 삭제할 행 수")
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="서버 시작 시 실행: 명령 시작 전부터 running 인 작업은 이전 프로세스에서 중단된 것으로 보고 바로 재개",
+        )
+
+    def handle(self, *args, **options):
+        stale_before = now() if options["resume"] else None
+        jobs = StorePurgeJob.objects.exclude(status="done").order_by("created_at")
+        if options["store"]:
+            jobs = jobs.filter(store_id__in=options["store"])
+
+        for job_id in jobs.values_list("id", flat=True):
+            def progress(job):
+                self.stdout.write(f"  {job.store_id} [{job.step}] {job.deleted_rows} rows", ending="\r")
+
+            try:
+                job = run_purge_job(
+                    job_id, batch_size=options["batch_size"], progress=progress, stale_before=stale_before
+                )
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"\n❌ 삭제 실패 (job {job_id}): {e}"))
+                continue
+
+            if job is None:
+                self.stdout.write(f"⏭️ 다른 작업자가 처리 중 (job {job_id})")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"\n✅ {job.store_id}: {job.deleted_rows}개 행 삭제 완료"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from store.cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = "가게 단위 읽기 API 캐시의 엔드포인트별 hit/miss 카운터를 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="출력 후 카운터 초기화")
+
+    def handle(self, *args, **options):
+        for endpoint, counts in sorted(get_cache_stats().items()):
+            total = counts["hit"] + counts["miss"]
+            hit_rate = counts["hit"] / total * 100 if total else 0
+            self.stdout.write(f"{endpoint}: hit={counts['hit']} miss={counts['miss']} ({hit_rate:.1f}%)")
+
+        if options["reset"]:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS("✅ 캐시 카운터 초기화 완료"))
@@ -68,14 +68,26 @@ class Transaction(models.Model):
             for t in transactions
         ]
 
+# 삭제 요청된 가게를 기본 조회에서 제외하는 매니저
+class ActiveStoreManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 # 가게 모델 정의
 class Store(models.Model):
     id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)  # UUID 사용
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)  # 가게 소유자
     name = models.CharField(max_length=100)
     address = models.CharField(max_length=255, blank=True, null=True)  # 선택적 필드
+    opening_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # 가계부 기록 시작 전 보유 현금 (잔액 계산 시작값)
+    is_deleted = models.BooleanField(default=False)  # 삭제 요청됨 (하위 데이터는 store/purge.py 에서 백그라운드 삭제)
+    deleted_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)  # 생성 시간
 
+    objects = ActiveStoreManager()
+    all_objects = models.Manager()  # 🔹 삭제 요청된 가게 포함 (삭제 작업 / 관리자용)
+
     def __str__(self):
         return self.name
 
@@ -95,3 +107,26 @@ class Store(models.Model):
             'income': {item['category__name']: item['total_income'] for item in income},
             'expense': {item['category__name']: item['total_expense'] for item in expense}
         }
+
+
+# 가게 삭제 작업 (하위 데이터를 배치 단위로 삭제, 중단되면 purge_deleted_stores 명령으로 재개)
+class StorePurgeJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    store_id = models.UUIDField(unique=True)  # 가게 행이 삭제된 뒤에도 진행 상황이 남도록 FK 대신 UUID
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='store_purge_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    step = models.CharField(max_length=50, blank=True, default='')  # 현재 삭제 중인 테이블
+    deleted_rows = models.BigIntegerField(default=0)  # 지금까지 삭제한 행 수
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.store_id} ({self.status})"
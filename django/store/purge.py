@@ -0,0 +1,165 @@
+# store/purge.py
+
+import logging
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.timezone import now
+from costcalcul.images import variant_file_names
+from costcalcul.models import Recipe, RecipeItem
+from ingredients.models import Ingredient
+from inventory.models import Inventory
+from ledger.models import Transaction as LedgerTransaction, MonthlyCategorySummary, MonthlyDayActivity
+from store.cache import schedule_store_version_bump
+from store.models import Store, StorePurgeJob, Transaction as StoreTransaction
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = getattr(settings, "STORE_PURGE_BATCH_SIZE", 500)  # 🔹 SQLite 바인딩 변수 제한(999) 이하
+STALE_RUNNING_MINUTES = 10  # 🔹 이 시간 동안 진행이 없는 running 작업은 중단된 것으로 보고 재개
+
+
+def purge_steps(store_id):
+    """ ✅ (단계 이름, 삭제 대상 queryset, 함께 지울 파일 필드 목록) — 자식 테이블부터 순서대로 """
+    return [
+        ("recipe_items", RecipeItem.objects.filter(Q(recipe__store_id=store_id) | Q(ingredient__store_id=store_id)), None),
+        ("inventories", Inventory.objects.filter(ingredient__store_id=store_id), None),
+        ("ingredients", Ingredient.objects.filter(store_id=store_id), None),
+        ("recipes", Recipe.objects.filter(store_id=store_id), ("recipe_img", "recipe_img_variants")),
+        ("ledger_transactions", LedgerTransaction.objects.filter(store_id=store_id), None),
+        ("ledger_monthly_summaries", MonthlyCategorySummary.objects.filter(store_id=store_id), None),
+        ("ledger_day_activities", MonthlyDayActivity.objects.filter(store_id=store_id), None),
+        ("store_transactions", StoreTransaction.objects.filter(store_id=store_id), None),
+    ]
+
+
+def delete_batch(queryset, batch_size, file_fields=None):
+    """
+    queryset 에서 최대 batch_size 행의 pk 만 조회한 뒤 raw DELETE.
+    Django Collector 처럼 객체를 메모리에 올리거나 시그널을 보내지 않는다.
+    file_fields: 파일 경로 컬럼 또는 변형 경로 JSON 컬럼 (recipe_img_variants)
+    """
+    model = queryset.model
+    pk_field = model._meta.pk
+
+    if file_fields:
+        rows = list(queryset.values_list("pk", *file_fields)[:batch_size])
+        ids = [row[0] for row in rows]
+        files = []
+        for row in rows:
+            for value in row[1:]:
+                if isinstance(value, dict):
+                    files.extend(variant_file_names(value))
+                elif value:
+                    files.append(value)
+    else:
+        ids = list(queryset.values_list("pk", flat=True)[:batch_size])
+        files = []
+    if not ids:
+        return 0
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(pk_field.column)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE {column} IN ({placeholders})",
+            [pk_field.get_db_prep_value(pk, connection) for pk in ids],
+        )
+        deleted = cursor.rowcount
+
+    # 🔹 raw DELETE 는 django-cleanup 시그널이 없으므로 이미지 파일 직접 삭제
+    storage = model._meta.get_field(file_fields[0]).storage if file_fields else None
+    for name in files:
+        try:
+            storage.delete(name)
+        except Exception as e:
+            logger.warning(f"⚠️ 가게 삭제 중 파일 삭제 실패 ({name}): {e}")
+
+    return deleted
+
+
+def claim_job(job_id, stale_before=None):
+    """
+    ✅ 다른 실행자(스레드 / 관리 명령)가 처리 중이 아닐 때만 작업을 running 으로 가져옴
+    stale_before: 이 시각 이전부터 진행이 없는 running 작업은 중단된 것으로 보고 재개
+    (기본값: STALE_RUNNING_MINUTES 전, 서버 시작 시에는 시작 시각 — 이전 프로세스의 스레드는 이미 죽었으므로)
+    """
+    stale = stale_before or now() - timedelta(minutes=STALE_RUNNING_MINUTES)
+    return StorePurgeJob.objects.filter(pk=job_id).filter(
+        Q(status__in=["pending", "failed"]) | Q(status="running", updated_at__lt=stale)
+    ).update(status="running", error="", updated_at=now()) == 1
+
+
+def run_purge_job(job_id, batch_size=PURGE_BATCH_SIZE, progress=None, stale_before=None):
+    """
+    가게 하위 데이터를 배치 단위로 삭제하고 마지막에 가게 행 삭제.
+    각 배치는 개별 커밋이며 남은 행만 다시 지우므로, 중간에 죽어도 처음부터 다시 실행하면 이어서 진행된다.
+    progress: 배치마다 호출되는 콜백 (job)
+    """
+    if not claim_job(job_id, stale_before=stale_before):
+        return None
+
+    job = StorePurgeJob.objects.get(pk=job_id)
+    try:
+        for step, queryset, file_fields in purge_steps(job.store_id):
+            job.step = step
+            job.save(update_fields=["step", "updated_at"])
+            while True:
+                deleted = delete_batch(queryset, batch_size, file_fields)
+                if not deleted:
+                    break
+                job.deleted_rows += deleted
+                job.save(update_fields=["deleted_rows", "updated_at"])
+                if progress:
+                    progress(job)
+
+        # ✅ 하위 데이터가 모두 지워졌으므로 가게 행 삭제는 가벼움
+        Store.all_objects.filter(pk=job.store_id).delete()
+        job.status = "done"
+        job.step = ""
+        job.finished_at = now()
+        job.save(update_fields=["status", "step", "finished_at", "updated_at"])
+        logger.info(f"✅ 가게 삭제 완료: {job.store_id} ({job.deleted_rows} rows)")
+
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        job.save(update_fields=["status", "error", "updated_at"])
+        logger.error(f"❌ 가게 삭제 실패 ({job.store_id}, step={job.step}): {e}")
+        raise
+
+    return job
+
+
+def _run_in_thread(job_id):
+    try:
+        run_purge_job(job_id)
+    except Exception:
+        pass  # 🔹 실패 내용은 작업(StorePurgeJob)에 기록됨, 서버 시작 시 purge_deleted_stores 가 재시도
+    finally:
+        connection.close()
+
+
+def request_store_deletion(store):
+    """
+    가게를 즉시 삭제 상태로 표시(목록/조회에서 숨김)하고 삭제 작업 등록.
+    커밋 후 백그라운드 스레드에서 하위 데이터를 삭제한다.
+    스레드가 서버 재시작 등으로 중단되면 다음 시작 시 purge_deleted_stores --resume 가 이어서 처리한다.
+    """
+    with transaction.atomic():
+        Store.all_objects.filter(pk=store.pk).update(is_deleted=True, deleted_at=now())
+        job, _ = StorePurgeJob.objects.update_or_create(
+            store_id=store.pk,
+            defaults={"user_id": store.user_id, "status": "pending", "error": ""},
+        )
+        schedule_store_version_bump(store.pk)
+
+        if getattr(settings, "STORE_PURGE_IN_BACKGROUND", True):
+            transaction.on_commit(
+                lambda: threading.Thread(target=_run_in_thread, args=(job.pk,), daemon=True).start()
+            )
+
+    return job
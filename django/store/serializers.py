@@ -7,7 +7,7 @@ class StoreSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Store
-        fields = ['store_id', 'name', 'address']
+        fields = ['store_id', 'name', 'address', 'opening_balance']
 
 class TransactionSerializer(serializers.ModelSerializer):
     transaction_id = serializers.UUIDField(source='id', read_only=True)
@@ -0,0 +1,45 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from costcalcul.models import Recipe, RecipeItem
+from ingredients.models import Ingredient
+from inventory.models import Inventory
+from ledger.models import Category as LedgerCategory, Transaction as LedgerTransaction
+from store.models import Store
+from store.cache import LEDGER_CATEGORY_VERSION, schedule_store_version_bump, schedule_version_bump
+
+
+# ✅ 가게 단위 읽기 API 캐시 무효화: 데이터가 바뀌면 해당 가게의 버전 카운터를 올림
+
+def _related_store_id(instance, field_name, model, lookup):
+    """ ✅ 연관 객체가 이미 로드되어 있으면 재사용하고, 아니면 store_id 만 조회 """
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        related = getattr(instance, field_name)
+        return related.store_id if related else None
+
+    related_id = getattr(instance, field.attname)
+    return model.objects.filter(pk=related_id).values_list(lookup, flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Store)
+@receiver([post_save, post_delete], sender=Recipe)
+@receiver([post_save, post_delete], sender=Ingredient)
+@receiver([post_save, post_delete], sender=LedgerTransaction)
+def bump_store_cache(sender, instance, **kwargs):
+    store_id = instance.pk if sender is Store else instance.store_id
+    schedule_store_version_bump(store_id)
+
+
+@receiver([post_save, post_delete], sender=RecipeItem)
+def bump_store_cache_for_recipe_item(sender, instance, **kwargs):
+    schedule_store_version_bump(_related_store_id(instance, "recipe", Recipe, "store_id"))
+
+
+@receiver([post_save, post_delete], sender=Inventory)
+def bump_store_cache_for_inventory(sender, instance, **kwargs):
+    schedule_store_version_bump(_related_store_id(instance, "ingredient", Ingredient, "store_id"))
+
+
+@receiver([post_save, post_delete], sender=LedgerCategory)
+def bump_ledger_category_cache(sender, instance, **kwargs):
+    schedule_version_bump(LEDGER_CATEGORY_VERSION)
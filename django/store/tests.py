@@ -1,3 +1,261 @@
-from django.test import TestCase
+from datetime import date
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from redis.exceptions import RedisError
+from rest_framework.test import APIClient
+from users.models import CustomUser
+from users.utils import redis_client
+from costcalcul.models import Recipe
+from ingredients.models import Ingredient
+from inventory.models import Inventory
+from ledger.models import Category, Transaction
+from store.cache import get_cache_stats, schedule_version_bump
+from store.models import Store, StorePurgeJob
+from store.purge import request_store_deletion, run_purge_job
 
-# Create your tests here.
+
+class ScheduleVersionBumpTests(TestCase):
+    """ ✅ 커밋 후 캐시 버전 증가 예약 """
+
+    def test_bumps_each_name_once_per_commit(self):
+        with mock.patch("store.cache.bump_version") as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(3):
+                    schedule_version_bump("store:a")
+                schedule_version_bump("store:b")
+
+        self.assertEqual([call.args[0] for call in bump.call_args_list], ["store:a", "store:b"])
+
+    def test_next_transaction_bumps_again(self):
+        with mock.patch("store.cache.bump_version") as bump:
+            for _ in range(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    schedule_version_bump("store:a")
+
+        self.assertEqual(bump.call_count, 2)
+
+    def test_rolled_back_savepoint_does_not_drop_bump(self):
+        with mock.patch("store.cache.bump_version") as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        schedule_version_bump("store:a")
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                schedule_version_bump("store:a")
+
+        bump.assert_called_once_with("store:a")
+
+
+@override_settings(STORE_PURGE_IN_BACKGROUND=False)
+class StorePurgeRecoveryTests(TestCase):
+    """ ✅ 백그라운드 스레드가 중단된 가게 삭제 작업의 재개 """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="owner@test.com", password="password")
+        self.store = Store.objects.create(user=self.user, name="테스트 가게")
+        self.job = request_store_deletion(self.store)
+        StorePurgeJob.objects.filter(pk=self.job.pk).update(status="running")  # 🔹 스레드가 도중에 죽은 상태
+
+    def test_recent_running_job_is_not_claimed(self):
+        self.assertIsNone(run_purge_job(self.job.pk))
+
+    def test_resume_on_start_claims_interrupted_job(self):
+        call_command("purge_deleted_stores", "--resume", stdout=StringIO())
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, "done")
+        self.assertFalse(Store.all_objects.filter(pk=self.store.pk).exists())
+
+
+class StoreResponseCacheTests(TestCase):
+    """ ✅ 가게 단위 GET 응답 캐시: 두 번째 조회는 캐시, 가게 데이터 / 카테고리가 바뀌면 새 응답 """
+
+    REPORT_PARAMS = {"start": "2025-03-01", "end": "2025-03-31", "granularity": "month"}
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="owner@test.com", password="password")
+        self.store = Store.objects.create(user=self.user, name="테스트 가게")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.ingredient = Ingredient.objects.create(
+            store=self.store, name="우유", purchase_price=300000, purchase_quantity=1000000, unit="ml"
+        )
+        self.inventory = Inventory.objects.create(ingredient=self.ingredient, remaining_stock=1000000)
+        self.category = Category.objects.create(name="식자재")
+        self.add_transaction(date(2025, 3, 1))
+
+    def add_transaction(self, day):
+        return Transaction.objects.create(
+            user=self.user, store=self.store, category=self.category,
+            transaction_type="expense", amount=1000, date=day,
+        )
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def hits(self, endpoint):
+        return get_cache_stats().get(endpoint, {}).get("hit", 0)
+
+    def assertCachedUntilWrite(self, endpoint, url, write, params=None):
+        before = self.get(url, params)
+        hits = self.hits(endpoint)
+
+        self.assertEqual(self.get(url, params), before)
+        self.assertEqual(self.hits(endpoint), hits + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+
+        self.assertNotEqual(self.get(url, params), before)
+        self.assertEqual(self.hits(endpoint), hits + 1)  # 🔹 버전이 바뀌어 캐시 miss
+
+    def test_recipe_write(self):
+        self.assertCachedUntilWrite(
+            "recipes", f"/api/costcalcul/{self.store.id}/",
+            lambda: Recipe.objects.create(store=self.store, name="라떼"),
+        )
+
+    def test_ingredient_write(self):
+        def write():
+            self.ingredient.name = "저지방 우유"
+            self.ingredient.save()
+
+        self.assertCachedUntilWrite("ingredients", f"/api/ingredients/{self.store.id}/", write)
+
+    def test_inventory_write(self):
+        def write():
+            self.inventory.remaining_stock = 500000
+            self.inventory.save()
+
+        self.assertCachedUntilWrite("inventory", f"/api/inventory/{self.store.id}/", write)
+
+    def test_ledger_transaction_write(self):
+        self.assertCachedUntilWrite(
+            "ledger_report", f"/api/ledger/{self.store.id}/report/",
+            lambda: self.add_transaction(date(2025, 3, 2)), self.REPORT_PARAMS,
+        )
+
+    def test_ledger_category_write(self):
+        def write():
+            self.category.name = "원재료"
+            self.category.save()
+
+        self.assertCachedUntilWrite("ledger_report", f"/api/ledger/{self.store.id}/report/", write, self.REPORT_PARAMS)
+
+    def test_other_store_write_keeps_cache(self):
+        other_store = Store.objects.create(user=self.user, name="다른 가게")
+        url = f"/api/costcalcul/{self.store.id}/"
+        self.get(url)
+        hits = self.hits("recipes")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe.objects.create(store=other_store, name="라떼")
+
+        self.get(url)
+        self.assertEqual(self.hits("recipes"), hits + 1)
+
+    def test_redis_error_falls_back_to_view(self):
+        url = f"/api/ledger/{self.store.id}/report/"
+        self.get(url, self.REPORT_PARAMS)
+
+        with mock.patch.object(redis_client, "mget", side_effect=RedisError("down")):
+            self.add_transaction(date(2025, 3, 2))  # 🔹 버전 증가 없이도 최신 데이터
+            data = self.get(url, self.REPORT_PARAMS)
+
+        self.assertEqual(data["totalExpense"], 2000)
+
+
+class ConditionalGetTests(TestCase):
+    """ ✅ ETag / If-None-Match: 바뀌지 않았으면 304, 수정 후 새 ETag, 다른 사용자의 가게는 ETag 없음 """
+
+    LEDGER_PARAMS = {"year": 2025, "month": 3}
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="owner@test.com", password="password")
+        self.store = Store.objects.create(user=self.user, name="테스트 가게")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name="식자재")
+        self.march = self.add_transaction(date(2025, 3, 1))
+        self.april = self.add_transaction(date(2025, 4, 1))
+        self.recipe = Recipe.objects.create(store=self.store, name="라떼")
+        self.ingredient = Ingredient.objects.create(
+            store=self.store, name="우유", purchase_price=300000, purchase_quantity=1000000, unit="ml"
+        )
+        self.intruder = APIClient()
+        self.intruder.force_authenticate(CustomUser.objects.create_user(email="other@test.com", password="password"))
+
+    def add_transaction(self, day):
+        return Transaction.objects.create(
+            user=self.user, store=self.store, category=self.category,
+            transaction_type="expense", amount=1000, date=day,
+        )
+
+    def etag(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(response.has_header("ETag"))
+        return response["ETag"]
+
+    def get_if_none_match(self, url, etag, params=None, client=None):
+        return (client or self.client).get(url, params or {}, HTTP_IF_NONE_MATCH=etag)
+
+    def assertNotModifiedUntilEdit(self, url, edit, params=None):
+        etag = self.etag(url, params)
+        self.assertEqual(self.get_if_none_match(url, etag, params).status_code, 304)
+
+        edit()
+
+        response = self.get_if_none_match(url, etag, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def assertNoEtagForOtherUser(self, url, params=None):
+        etag = self.etag(url, params)
+
+        response = self.get_if_none_match(url, etag, params, client=self.intruder)
+
+        self.assertNotEqual(response.status_code, 304)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_ledger_month_edit(self):
+        def edit():
+            self.march.amount = 2000
+            self.march.save()
+
+        self.assertNotModifiedUntilEdit(f"/api/ledger/{self.store.id}/transactions/", edit, self.LEDGER_PARAMS)
+
+    def test_ledger_edit_in_another_month_keeps_etag(self):
+        url = f"/api/ledger/{self.store.id}/transactions/"
+        etag = self.etag(url, self.LEDGER_PARAMS)
+
+        self.april.amount = 2000
+        self.april.save()
+
+        self.assertEqual(self.get_if_none_match(url, etag, self.LEDGER_PARAMS).status_code, 304)
+
+    def test_recipe_list_edit(self):
+        def edit():
+            self.recipe.name = "바닐라 라떼"
+            self.recipe.save()
+
+        self.assertNotModifiedUntilEdit(f"/api/costcalcul/{self.store.id}/", edit)
+
+    def test_ingredient_list_edit(self):
+        def edit():
+            self.ingredient.name = "저지방 우유"
+            self.ingredient.save()
+
+        self.assertNotModifiedUntilEdit(f"/api/ingredients/{self.store.id}/", edit)
+
+    def test_other_users_store(self):
+        self.assertNoEtagForOtherUser(f"/api/ledger/{self.store.id}/transactions/", self.LEDGER_PARAMS)
+        self.assertNoEtagForOtherUser(f"/api/costcalcul/{self.store.id}/")
+        self.assertNoEtagForOtherUser(f"/api/ingredients/{self.store.id}/")
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import StoreListView, StoreDetailView
+from .views import StoreListView, StoreDetailView, StorePurgeStatusView
 
 
 urlpatterns = [
     path('', StoreListView.as_view(), name='store-list-create'),
     path('<uuid:id>/', StoreDetailView.as_view(), name='store-detail'),
+    path('<uuid:id>/deletion/', StorePurgeStatusView.as_view(), name='store-deletion-status'),
 ]
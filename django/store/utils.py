@@ -0,0 +1,60 @@
+# store/utils.py
+
+from collections import defaultdict
+from django.db import connection
+from django.db.models import F, Sum, Window
+from django.db.models.functions import RowNumber
+from ledger.models import MonthlyCategorySummary
+
+
+CHART_TRANSACTION_TYPES = ("income", "expense")
+
+
+def get_store_charts(store_ids, year, month, limit=5):
+    """
+    여러 가게의 월별 수입/지출 상위 카테고리를 한 번의 쿼리로 집계하는 함수.
+    가게 수와 상관없이 쿼리 1번으로 {store_id: chart_data} 를 반환한다.
+    거래 내역 대신 월별 카테고리 집계(MonthlyCategorySummary)를 읽는다.
+    """
+    store_ids = list(store_ids)
+    charts = {store_id: [] for store_id in store_ids}
+    if not store_ids:
+        return charts
+
+    rows = MonthlyCategorySummary.objects.filter(
+        store_id__in=store_ids, year=year, month=month,
+    ).values("store_id", "transaction_type", "category__name").annotate(
+        total=Sum("total_amount")
+    )
+
+    if connection.features.supports_over_clause:
+        # ✅ (가게, 수입/지출) 별로 ROW_NUMBER 를 매겨 상위 N개만 DB에서 잘라냄
+        rows = rows.annotate(
+            rank=Window(
+                expression=RowNumber(),
+                partition_by=[F("store_id"), F("transaction_type")],
+                order_by=[F("total").desc(), F("category__name").asc()],
+            )
+        ).filter(rank__lte=limit)
+    # ✅ 윈도우 함수를 지원하지 않는 SQLite 는 GROUP BY 결과를 파이썬에서 상위 N개로 자름
+
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[(row["store_id"], row["transaction_type"])].append(row)
+
+    for store_id in store_ids:
+        for transaction_type in CHART_TRANSACTION_TYPES:
+            top_rows = sorted(
+                grouped.get((store_id, transaction_type), []),
+                key=lambda r: (-r["total"], r["category__name"] or ""),
+            )[:limit]
+            charts[store_id].extend(
+                {
+                    "type": transaction_type,
+                    "category": r["category__name"] or "미분류",
+                    "cost": float(r["total"]),
+                }
+                for r in top_rows
+            )
+
+    return charts
@@ -6,12 +6,13 @@ from django.shortcuts import get_object_or_404
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.contrib.auth import get_user_model
-from .models import Store  
-from ledger.models import Transaction 
+from .models import Store, StorePurgeJob
 from .serializers import StoreSerializer
+from .utils import get_store_charts
+from .cache import cache_store_response, LEDGER_CATEGORY_VERSION
+from .purge import request_store_deletion
 from rest_framework_simplejwt.tokens import RefreshToken
 from datetime import datetime
-from django.db.models import Sum
 
 class StoreListView(APIView):
     permission_classes = [IsAuthenticated]
@@ -21,53 +22,34 @@ class StoreListView(APIView):
         operation_description="사용자가 소유한 모든 가게와 해당 가게의 월별 차트 데이터를 반환합니다.",
         responses={200: "가게 목록과 차트 정보"}
     )    
-    
+    @cache_store_response(
+        "stores",
+        store_ids=lambda request: list(Store.objects.filter(user=request.user).order_by("created_at").values_list("id", flat=True)),
+        extra_versions=[LEDGER_CATEGORY_VERSION],
+        key_extra=lambda request: datetime.now().strftime("%Y-%m"),  # 🔹 현재 월 기준 차트
+    )
     def get(self, request):
         """ ✅ 현재 로그인한 사용자의 모든 가게 목록 + 현재 월의 Ledger 차트 정보 포함 """
         stores = Store.objects.filter(user=request.user).order_by("created_at")
-        response_data = []
 
         # 현재 연/월 기준
         now = datetime.now()
         target_year = now.year
         target_month = now.month
 
-        for store in stores:
-            # 🔹 수입(income) 상위 3개 카테고리
-            income_transactions = Transaction.objects.filter(
-                store=store, transaction_type="income",
-                date__year=target_year, date__month=target_month
-            ).values("transaction_type", "category__name").annotate(
-                total=Sum("amount")
-            ).order_by("-total")[:5]
-
-            # 🔹 지출(expense) 상위 3개 카테고리
-            expense_transactions = Transaction.objects.filter(
-                store=store, transaction_type="expense",
-                date__year=target_year, date__month=target_month
-            ).values("transaction_type", "category__name").annotate(
-                total=Sum("amount")
-            ).order_by("-total")[:5]
-
-            # 🔹 수입/지출 합쳐서 chart 데이터 생성
-            transactions = list(income_transactions) + list(expense_transactions)
-
-            chart_data = [
-                {
-                    "type": t["transaction_type"],
-                    "category": t["category__name"] or "미분류",
-                    "cost": float(t["total"])
-                }
-                for t in transactions
-            ]
-
-            # 🔹 최종 응답 데이터 구성
-            response_data.append({
+        # 🔹 모든 가게의 수입/지출 상위 5개 카테고리를 한 번의 쿼리로 집계
+        charts = get_store_charts([store.id for store in stores], target_year, target_month)
+
+        # 🔹 최종 응답 데이터 구성
+        response_data = [
+            {
                 "store_id": str(store.id),
                 "name": store.name,
                 "address": store.address,
-                "chart": chart_data  # 현재 월 기준 차트
-            })
+                "chart": charts[store.id]  # 현재 월 기준 차트
+            }
+            for store in stores
+        ]
 
         return Response({"stores": response_data}, status=status.HTTP_200_OK)
 
@@ -138,7 +120,28 @@ class StoreDetailView(APIView):
     )
     def delete(self, request, id):
         store = get_object_or_404(Store, id=id, user=request.user)
-        store.delete()
+        # 🔥 즉시 삭제 상태로 표시하고, 재료/레시피/가계부 등 하위 데이터는 백그라운드에서 배치 삭제
+        request_store_deletion(store)
         return Response({"message": "가게가 삭제되었습니다."}, status=status.HTTP_204_NO_CONTENT)
 
 
+class StorePurgeStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="가게 삭제 진행 상황 조회",
+        operation_description="삭제 요청한 가게의 하위 데이터 삭제 진행 상황을 반환합니다.",
+        responses={200: "삭제 작업 상태", 404: "삭제 작업을 찾을 수 없습니다."}
+    )
+    def get(self, request, id):
+        job = get_object_or_404(StorePurgeJob, store_id=id, user=request.user)
+        return Response({
+            "store_id": str(job.store_id),
+            "status": job.status,
+            "step": job.step,
+            "deleted_rows": job.deleted_rows,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+        })
+
+
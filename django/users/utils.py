@@ -1,6 +1,9 @@
 import redis
 import hashlib
+from datetime import datetime
 from django.conf import settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
 
 # Redis 클라이언트 설정
 redis_client = redis.StrictRedis(
@@ -36,3 +39,33 @@ def verify_refresh_token(user_id, provided_token):
     """Redis에 저장된 해시와 비교하여 검증"""
     stored_hashed_token = get_refresh_token(user_id)
     return stored_hashed_token == hash_token(provided_token)
+
+
+# ✅ 소셜 로그인 공통: JWT 발급 + Redis 리프레시 토큰 저장 + OutstandingToken 등록
+def issue_login_tokens(user):
+    """동기 함수 (async 뷰에서는 sync_to_async 로 호출)"""
+    refresh = RefreshToken.for_user(user)
+    access_token_obj = refresh.access_token
+    access_token = str(access_token_obj)
+    refresh_token = str(refresh)
+
+    # ✅ Redis에 Refresh Token 저장
+    expires_in = int(access_token_obj['exp'])
+    expires_at = datetime.fromtimestamp(expires_in)
+    store_refresh_token(user.id, refresh_token, expires_in)
+
+    # ✅ AccessToken 블랙리스트에 등록하기 위한 OutstandingToken 저장
+    OutstandingToken.objects.get_or_create(
+        jti=access_token_obj['jti'],
+        defaults={
+            'user': user,
+            'token': access_token,
+            'expires_at': expires_at,
+        }
+    )
+
+    # ✅ 응답 데이터 구성 (Bearer 방식)
+    return {
+        "access": access_token,
+        "refresh": refresh_token
+    }
@@ -1,33 +1,25 @@
 import os
-import requests
+import httpx
 import logging
-from rest_framework.permissions import AllowAny
-from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.conf import settings
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from django.utils.decorators import method_decorator
-from users.utils import store_refresh_token  
-from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
-from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
-from datetime import datetime
+from livflow.async_views import AsyncAPIView
+from users.utils import issue_login_tokens
 
+OAUTH_TIMEOUT = 10  # 🔹 네이버 API 응답 대기 시간 (초)
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
-@method_decorator(csrf_exempt, name='dispatch')
-class NaverExchangeCodeForToken(APIView):
-    authentication_classes = []
-    permission_classes = [AllowAny]
+class NaverExchangeCodeForToken(AsyncAPIView):
+    authentication_required = False
 
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         logger.info("🔍 Naver OAuth 요청 시작")
-        
+
         code = request.data.get("code")
         state = request.data.get("state")
         logger.info(f"📌 받은 Authorization Code: {code}, State: {state}")
@@ -46,26 +38,27 @@ class NaverExchangeCodeForToken(APIView):
         }
 
         try:
-            # ✅ Naver에서 액세스 토큰 요청
-            response = requests.post(token_endpoint, data=data)
-            logger.info(f"📌 Naver OAuth 응답 상태 코드: {response.status_code}")
-
-            response.raise_for_status()
-            token_data = response.json()
-            logger.info(f"📌 Naver OAuth Token Response: {token_data}")
-
-            access_token = token_data.get("access_token")
-            if not access_token:
-                logger.error("❌ Naver에서 Access Token을 가져오지 못했습니다.")
-                return JsonResponse({"error": "Failed to obtain access token"}, status=400)
-
-            # ✅ Naver에서 유저 정보 가져오기
-            userinfo_endpoint = "https://openapi.naver.com/v1/nid/me"
-            headers = {"Authorization": f"Bearer {access_token}"}
-            user_info_response = requests.get(userinfo_endpoint, headers=headers)
-            user_info_response.raise_for_status()
-            user_info = user_info_response.json().get("response", {})
-            logger.info(f"📌 Naver User Info Response: {user_info}")
+            async with httpx.AsyncClient(timeout=OAUTH_TIMEOUT) as client:
+                # ✅ Naver에서 액세스 토큰 요청 (응답 대기 중 워커가 다른 요청 처리)
+                response = await client.post(token_endpoint, data=data)
+                logger.info(f"📌 Naver OAuth 응답 상태 코드: {response.status_code}")
+
+                response.raise_for_status()
+                token_data = response.json()
+                logger.info(f"📌 Naver OAuth Token Response: {token_data}")
+
+                access_token = token_data.get("access_token")
+                if not access_token:
+                    logger.error("❌ Naver에서 Access Token을 가져오지 못했습니다.")
+                    return JsonResponse({"error": "Failed to obtain access token"}, status=400)
+
+                # ✅ Naver에서 유저 정보 가져오기
+                userinfo_endpoint = "https://openapi.naver.com/v1/nid/me"
+                headers = {"Authorization": f"Bearer {access_token}"}
+                user_info_response = await client.get(userinfo_endpoint, headers=headers)
+                user_info_response.raise_for_status()
+                user_info = user_info_response.json().get("response", {})
+                logger.info(f"📌 Naver User Info Response: {user_info}")
 
             email = user_info.get("email")
             full_name = user_info.get("name", "").strip()
@@ -75,46 +68,18 @@ class NaverExchangeCodeForToken(APIView):
                 return JsonResponse({"error": "Email not found in user info"}, status=400)
 
             # ✅ 이메일 기준으로 사용자 생성 또는 가져오기
-            user, created = User.objects.get_or_create(
+            user, created = await User.objects.aget_or_create(
                 email=email,
                 defaults={"first_name": full_name}
             )
             logger.info(f"✅ User 정보: {user} (Created: {created})")
 
-            # ✅ JWT 토큰 생성
-            refresh = RefreshToken.for_user(user)
-            access_token_obj = refresh.access_token
-            access_token = str(access_token_obj)
-            refresh_token = str(refresh)
-            print("✅ JWT 토큰 생성 완료")
-
-            # ✅ Redis에 Refresh Token 저장
-            expires_in = int(access_token_obj['exp'])
-            expires_at = datetime.fromtimestamp(expires_in)
-            store_refresh_token(user.id, refresh_token, expires_in)
-            print(f"✅ Redis에 Refresh Token 저장 완료 (Expires in: {expires_in}s)")
-            
-            # ✅ AccessToken 블랙리스트에 등록하기 위한 OutstandingToken 저장
-            OutstandingToken.objects.get_or_create(
-                jti=access_token_obj['jti'],
-                defaults={
-                    'user': user,
-                    'token': access_token,
-                    'expires_at': expires_at,
-                }
-            )
-
-            
-
-            # ✅ 응답 데이터 구성 (Bearer 방식)
-            response_data = {
-                "access": access_token,
-                "refresh": refresh_token
-            }
+            # ✅ JWT 토큰 생성 + Redis / OutstandingToken 저장
+            response_data = await sync_to_async(issue_login_tokens)(user)
             return JsonResponse(response_data)
 
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"❌ Naver OAuth 요청 실패: {str(e)}")
             return JsonResponse({"error": f"Naver OAuth Request Failed: {str(e)}"}, status=500)
 